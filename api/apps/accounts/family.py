@@ -0,0 +1,188 @@
+"""
+Visão geral da família/turma para responsáveis.
+
+As métricas de todas as crianças vinculadas são calculadas com consultas
+agrupadas por criança (o número de consultas não depende de quantas crianças
+existem) e guardadas em cache por responsável.
+
+A chave da visão geral inclui os tokens de progresso das crianças
+(apps.progress.tokens), então nenhuma alteração precisa descobrir quais
+responsáveis estão vinculados a ela.
+"""
+import hashlib
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from apps.progress.tokens import get_progress_tokens
+from .models import ParentChildRelationship
+
+FAMILY_OVERVIEW_TIMEOUT = 60 * 10
+
+# Quantidade de conquistas recentes exibidas por criança
+RECENT_ACHIEVEMENTS_LIMIT = 3
+
+
+def _overview_key(parent_id, relationships):
+    tokens = get_progress_tokens([rel.child_id for rel in relationships])
+    # Dados do relacionamento e da criança já carregados entram no carimbo
+    stamp = '|'.join(
+        f'{rel.child_id}:{rel.relationship_type}:{rel.can_monitor_progress}:'
+        f'{rel.child.first_name}:{rel.child.last_name}:{rel.child.avatar}:'
+        f'{tokens[rel.child_id]}'
+        for rel in relationships
+    )
+    digest = hashlib.md5(stamp.encode('utf-8')).hexdigest()
+    return f'family:overview:{parent_id}:{timezone.now().date()}:{digest}'
+
+
+def get_family_overview(parent):
+    """Visão geral das crianças vinculadas ao responsável, em cache"""
+    relationships = list(
+        ParentChildRelationship.objects.filter(parent=parent).select_related(
+            'child'
+        ).order_by('child__first_name', 'child__pk')
+    )
+    key = _overview_key(parent.pk, relationships)
+    overview = cache.get(key)
+    if overview is None:
+        overview = build_family_overview(relationships)
+        cache.set(key, overview, FAMILY_OVERVIEW_TIMEOUT)
+    return overview
+
+
+def build_family_overview(relationships):
+    """
+    Monta a visão geral com cinco consultas agrupadas por criança: caminhos,
+    lições, sequências, metas do dia e conquistas recentes
+    """
+    from apps.progress.models import (
+        DailyGoal, LearningPathProgress, LessonProgress, StudyStreak, UserAchievement
+    )
+
+    monitored = [rel.child_id for rel in relationships if rel.can_monitor_progress]
+    completed = Q(status='completed')
+    today = timezone.now().date()
+
+    paths = {}
+    lessons = {}
+    streaks = {}
+    goals = {}
+    achievements = defaultdict(list)
+    if monitored:
+        paths = {
+            row['user_id']: row
+            for row in LearningPathProgress.objects.filter(user_id__in=monitored).values(
+                'user_id'
+            ).annotate(
+                total=Count('pk'),
+                completed=Count('pk', filter=completed),
+                in_progress=Count('pk', filter=Q(status='in_progress'))
+            ).order_by()
+        }
+        lessons = {
+            row['user_id']: row
+            for row in LessonProgress.objects.filter(user_id__in=monitored).values(
+                'user_id'
+            ).annotate(
+                total=Count('pk'),
+                completed=Count('pk', filter=completed)
+            ).order_by()
+        }
+        streaks = {
+            user_id: (current, longest)
+            for user_id, current, longest in StudyStreak.objects.filter(
+                user_id__in=monitored
+            ).values_list('user_id', 'current_streak', 'longest_streak')
+        }
+        goals = {
+            row['user_id']: row
+            for row in DailyGoal.objects.filter(user_id__in=monitored, date=today).values(
+                'user_id', 'goal_minutes', 'completed_minutes', 'achieved'
+            )
+        }
+        # Últimas conquistas de cada criança em uma consulta (ROW_NUMBER por criança)
+        for row in UserAchievement.objects.filter(user_id__in=monitored).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=F('earned_at').desc()
+            )
+        ).filter(position__lte=RECENT_ACHIEVEMENTS_LIMIT).values(
+            'user_id', 'earned_at', 'achievement_id',
+            'achievement__name', 'achievement__slug', 'achievement__icon',
+            'achievement__badge_color'
+        ).order_by('user_id', '-earned_at'):
+            achievements[row['user_id']].append({
+                'id': row['achievement_id'],
+                'name': row['achievement__name'],
+                'slug': row['achievement__slug'],
+                'icon': row['achievement__icon'],
+                'badge_color': row['achievement__badge_color'],
+                'earned_at': row['earned_at'],
+            })
+
+    children = []
+    for rel in relationships:
+        child = rel.child
+        entry = {
+            'id': child.pk,
+            'first_name': child.first_name,
+            'last_name': child.last_name,
+            'avatar': child.avatar.url if child.avatar else None,
+            'relationship_type': rel.relationship_type,
+            'can_monitor_progress': rel.can_monitor_progress,
+        }
+        if rel.can_monitor_progress:
+            entry.update(_child_progress(
+                paths.get(child.pk),
+                lessons.get(child.pk),
+                streaks.get(child.pk, (0, 0)),
+                goals.get(child.pk),
+                achievements.get(child.pk, [])
+            ))
+        children.append(entry)
+
+    return {
+        'children': children,
+        'total_children': len(children),
+        'active_children': sum(
+            1 for child in children if child.get('learning_paths', {}).get('in_progress')
+        ),
+    }
+
+
+def _child_progress(paths, lessons, streak, goal, achievements):
+    paths = paths or {'total': 0, 'completed': 0, 'in_progress': 0}
+    lessons = lessons or {'total': 0, 'completed': 0}
+    if goal and goal['goal_minutes']:
+        daily_goal = {
+            'achieved': goal['achieved'],
+            'progress_percent': min(100, goal['completed_minutes'] / goal['goal_minutes'] * 100),
+        }
+    else:
+        daily_goal = {'achieved': False, 'progress_percent': 0}
+
+    return {
+        'learning_paths': {
+            'total': paths['total'],
+            'completed': paths['completed'],
+            'in_progress': paths['in_progress'],
+        },
+        'lessons': {
+            'total': lessons['total'],
+            'completed': lessons['completed'],
+            'completion_rate': (
+                lessons['completed'] / lessons['total'] * 100 if lessons['total'] > 0 else 0
+            ),
+        },
+        'streak': {
+            'current': streak[0],
+            'longest': streak[1],
+        },
+        'daily_goal': daily_goal,
+        'recent_achievements': achievements,
+    }
@@ -138,20 +138,24 @@ class ChildrenListSerializer(serializers.ModelSerializer):
     def get_relationship_info(self, obj):
         request = self.context.get('request')
         if request and request.user:
-            try:
-                relationship = ParentChildRelationship.objects.get(
+            # ChildrenListView pré-carrega o relacionamento com o responsável
+            if hasattr(obj, 'relationships_with_parent'):
+                relationship = next(iter(obj.relationships_with_parent), None)
+            else:
+                relationship = ParentChildRelationship.objects.filter(
                     parent=request.user,
                     child=obj
-                )
-                return {
-                    'relationship_type': relationship.relationship_type,
-                    'can_monitor_progress': relationship.can_monitor_progress,
-                    'can_assign_activities': relationship.can_assign_activities,
-                    'can_modify_settings': relationship.can_modify_settings,
-                    'is_primary': relationship.is_primary
-                }
-            except ParentChildRelationship.DoesNotExist:
+                ).first()
+            
+            if relationship is None:
                 return None
+            return {
+                'relationship_type': relationship.relationship_type,
+                'can_monitor_progress': relationship.can_monitor_progress,
+                'can_assign_activities': relationship.can_assign_activities,
+                'can_modify_settings': relationship.can_modify_settings,
+                'is_primary': relationship.is_primary
+            }
         return None
 
 
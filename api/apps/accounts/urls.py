@@ -22,5 +22,6 @@ urlpatterns = [
     path('relationships/', views.ParentChildRelationshipListCreateView.as_view(), name='relationships_list'),
     path('relationships/<int:pk>/', views.ParentChildRelationshipDetailView.as_view(), name='relationships_detail'),
     path('children/', views.ChildrenListView.as_view(), name='children_list'),
+    path('children/overview/', views.family_overview, name='family_overview'),
     path('children/<uuid:child_id>/', views.ChildDetailView.as_view(), name='child_detail'),
 ]
\ No newline at end of file
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiParameter
 from drf_spectacular.openapi import OpenApiTypes
@@ -247,13 +248,16 @@ class ChildrenListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsParentUser]
     
     def get_queryset(self):
-        relationships = ParentChildRelationship.objects.filter(
-            parent=self.request.user
-        ).select_related('child')
-        
+        # O relacionamento com o responsável é pré-carregado para o serializer
         return User.objects.filter(
-            id__in=[rel.child.id for rel in relationships]
-        )
+            parent_relationships__parent=self.request.user
+        ).prefetch_related(
+            Prefetch(
+                'parent_relationships',
+                queryset=ParentChildRelationship.objects.filter(parent=self.request.user),
+                to_attr='relationships_with_parent'
+            )
+        ).distinct()
 
 
 class ChildDetailView(generics.RetrieveAPIView):
@@ -334,45 +338,37 @@ def user_dashboard_stats(request):
     user = request.user
     
     if user.user_type == 'child':
-        # Estatísticas para crianças
-        from apps.progress.models import (
-            LearningPathProgress, LessonProgress, 
-            UserAchievement, StudyStreak, DailyGoal
-        )
+        # Estatísticas para crianças (leitura do snapshot materializado)
+        from apps.progress.models import UserStatsSnapshot
+        from apps.progress.time_tracking import get_pending_minutes
         from django.utils import timezone
-        from django.db.models import Count, Avg
+        
+        snapshot = UserStatsSnapshot.get_for(user.pk)
         
         # Progresso dos caminhos
-        total_paths = LearningPathProgress.objects.filter(user=user).count()
-        completed_paths = LearningPathProgress.objects.filter(
-            user=user, status='completed'
-        ).count()
+        total_paths = snapshot.paths_total
+        completed_paths = snapshot.paths_completed
         
         # Progresso das lições
-        total_lessons = LessonProgress.objects.filter(user=user).count()
-        completed_lessons = LessonProgress.objects.filter(
-            user=user, status='completed'
-        ).count()
+        total_lessons = snapshot.lessons_total
+        completed_lessons = snapshot.lessons_completed
         
         # Conquistas
-        total_achievements = UserAchievement.objects.filter(user=user).count()
+        total_achievements = snapshot.achievements_total
         
         # Sequência de estudos
-        try:
-            streak = StudyStreak.objects.get(user=user)
-            current_streak = streak.current_streak
-            longest_streak = streak.longest_streak
-        except StudyStreak.DoesNotExist:
-            current_streak = 0
-            longest_streak = 0
+        current_streak = snapshot.current_streak
+        longest_streak = snapshot.longest_streak
         
         # Meta de hoje
         today = timezone.now().date()
-        try:
-            daily_goal = DailyGoal.objects.get(user=user, date=today)
-            goal_achieved = daily_goal.achieved
-            progress_percent = min(100, (daily_goal.completed_minutes / daily_goal.goal_minutes) * 100)
-        except DailyGoal.DoesNotExist:
+        if snapshot.goal_date == today and snapshot.goal_minutes:
+            goal_achieved = snapshot.goal_achieved
+            completed_minutes = snapshot.goal_completed_minutes + get_pending_minutes(
+                user.pk
+            )['goals'].get(today.isoformat(), 0)
+            progress_percent = min(100, (completed_minutes / snapshot.goal_minutes) * 100)
+        else:
             goal_achieved = False
             progress_percent = 0
         
@@ -403,23 +399,23 @@ def user_dashboard_stats(request):
     
     elif user.user_type in ['parent', 'admin']:
         # Estatísticas para pais/responsáveis
-        children_count = ParentChildRelationship.objects.filter(parent=user).count()
-        
-        # Buscar estatísticas das crianças
         children_ids = ParentChildRelationship.objects.filter(
             parent=user
-        ).values_list('child_id', flat=True)
+        ).values('child_id')
+        children_count = children_ids.count()
         
-        from apps.progress.models import LearningPathProgress, LessonProgress
+        from apps.progress.models import LearningPathProgress
+        from django.db.models import Count, Q
         
-        total_child_paths = LearningPathProgress.objects.filter(
+        # Total de caminhos e crianças ativas em uma única agregação
+        overview = LearningPathProgress.objects.filter(
             user__id__in=children_ids
-        ).count()
-        
-        active_children = LearningPathProgress.objects.filter(
-            user__id__in=children_ids,
-            status='in_progress'
-        ).values('user').distinct().count()
+        ).aggregate(
+            total=Count('pk'),
+            active=Count('user', distinct=True, filter=Q(status='in_progress'))
+        )
+        total_child_paths = overview['total']
+        active_children = overview['active']
         
         return Response({
             'user_type': 'parent',
@@ -435,6 +431,62 @@ def user_dashboard_stats(request):
     return Response({'message': 'Tipo de usuário não suportado'})
 
 
+@extend_schema(
+    tags=['authentication'],
+    summary='Visão geral da família',
+    description='''
+    Retorna, para cada criança vinculada ao responsável (pais ou professores),
+    o progresso nos caminhos e lições, a sequência de estudos, a meta de hoje e
+    as conquistas mais recentes.
+    
+    Crianças cujo relacionamento não permite monitorar o progresso aparecem
+    apenas com os dados de identificação.
+    ''',
+    responses={
+        200: OpenApiExample(
+            'Visão geral da família',
+            value={
+                'children': [
+                    {
+                        'id': '3f2b8c1e-7d4a-4e9b-a6c2-1b5d9e0f4a73',
+                        'first_name': 'Maria',
+                        'last_name': 'Silva',
+                        'avatar': None,
+                        'relationship_type': 'parent',
+                        'can_monitor_progress': True,
+                        'learning_paths': {'total': 3, 'completed': 1, 'in_progress': 2},
+                        'lessons': {'total': 14, 'completed': 10, 'completion_rate': 71.4},
+                        'streak': {'current': 4, 'longest': 9},
+                        'daily_goal': {'achieved': False, 'progress_percent': 60.0},
+                        'recent_achievements': [
+                            {
+                                'id': 1,
+                                'name': 'Primeira Lição',
+                                'slug': 'primeira-licao',
+                                'icon': 'star',
+                                'badge_color': '#fbbf24',
+                                'earned_at': '2024-01-15T10:30:00Z'
+                            }
+                        ]
+                    }
+                ],
+                'total_children': 1,
+                'active_children': 1
+            },
+            response_only=True
+        )
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsParentUser])
+def family_overview(request):
+    """
+    Visão geral das crianças vinculadas ao responsável
+    """
+    from .family import get_family_overview
+    return Response(get_family_overview(request.user))
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_me(request):
@@ -0,0 +1,234 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorValueEncoder(DjangoJSONEncoder):
+    """
+    Preserva os microssegundos das datas (o DjangoJSONEncoder os trunca),
+    necessários para a comparação exata do keyset
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) para listas longas.
+
+    Diferente da PageNumberPagination, não executa COUNT(*) nem OFFSET: o cursor
+    guarda os valores de ordenação da última linha da página e a próxima página
+    é obtida com um filtro lexicográfico sobre esses campos, que pode usar
+    índices. Aceita ordenações com vários campos e direções mistas
+    (ex: ['-is_featured', 'order', '-created_at']) e sempre acrescenta a chave
+    primária como desempate estável.
+
+    Uso opcional por view: `pagination_class = KeysetPagination`. A ordenação
+    vem do parâmetro `ordering` do OrderingFilter, da anotação de relevância
+    de uma busca textual (`relevance_annotation`) ou de `view.ordering`.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido'
+    relevance_annotation = 'search_rank'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request, queryset.model)
+        page_size = self.get_page_size(request)
+
+        reverse = False
+        if self.cursor is not None:
+            reverse = self.cursor['reverse']
+            queryset = queryset.filter(
+                self.build_keyset_filter(self.cursor['values'], reverse)
+            )
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self._invert(field) for field in ordering]
+
+        results = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor de paginação retornado em next/previous',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Quantidade de resultados por página',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        explicit = False
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                explicit = bool(request.query_params.get(backend.ordering_param))
+                break
+        if not explicit and self.relevance_annotation in queryset.query.annotations:
+            ordering = [self.relevance_annotation]
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or queryset.query.order_by
+
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        ordering = list(ordering)
+
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering.append('pk')
+        return ordering
+
+    def build_keyset_filter(self, values, reverse=False):
+        """
+        Monta (a > x) OR (a = x AND b > y) OR ... respeitando a direção de cada campo
+        """
+        keyset = Q()
+        equal_prefix = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            keyset |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        return keyset
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        values = [getattr(instance, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps(
+            {'v': values, 'r': int(reverse)},
+            cls=CursorValueEncoder,
+            separators=(',', ':')
+        )
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = payload['v']
+            reverse = bool(payload.get('r', 0))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {
+            'values': [
+                self._to_python(model, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, values)
+            ],
+            'reverse': reverse,
+        }
+
+    def _to_python(self, model, name, value):
+        """Converte um valor do cursor para o tipo do campo de ordenação"""
+        if value is None or isinstance(value, (dict, list)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            field = self._resolve_field(model, name)
+        except FieldDoesNotExist:
+            # Anotações: apenas valores escalares, sem conversão
+            return value
+        try:
+            return field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _resolve_field(model, name):
+        parts = name.split(LOOKUP_SEP)
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+            if model is None:
+                raise FieldDoesNotExist(name)
+        if parts[-1] == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(parts[-1])
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
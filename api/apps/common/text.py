@@ -0,0 +1,7 @@
+import unicodedata
+
+
+def fold(text):
+    """Normaliza o texto para comparação: minúsculas e sem acentos"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
@@ -0,0 +1,326 @@
+"""
+Base dos acumuladores write-behind: tempo de estudo (apps.progress.time_tracking)
+e contadores de conteúdo (apps.content.counters).
+
+Os incrementos são somados em um buffer, por grupo (o usuário, o tipo de
+conteúdo...) e campo: hashes no Redis (HINCRBY), ou memória do processo
+quando o cache não é Redis. O flush periódico move os grupos pendentes para
+um lote identificado (`<name>:batch:<id>:*`), aplica o lote no banco junto
+com um registro no modelo de lotes aplicados (`ledger_model`) na mesma
+transação e só então apaga o lote. Se o worker morrer no meio, o próximo
+flush encontra o lote pendente e o aplica (ou apenas o finaliza, se o
+registro já existir), sem perder nem duplicar incrementos. Uma falha na
+aplicação desfaz o registro e deixa o lote para o flush seguinte.
+
+As subclasses definem apenas como o lote vira alterações no banco
+(prepare) e como aplicá-las (apply).
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+
+
+class RedisBuffer:
+    """Buffer compartilhado entre processos, com lotes duráveis no Redis"""
+
+    def __init__(self, connection, prefix):
+        self.redis = connection
+        self.pending_key = prefix + ':pending:{group}'
+        self.dirty_key = f'{prefix}:dirty'
+        self.inflight_key = f'{prefix}:inflight'
+        self.batch_groups_key = prefix + ':batch:{batch_id}:groups'
+        self.batch_key = prefix + ':batch:{batch_id}:{group}'
+
+    def add(self, group, increments):
+        pipe = self.redis.pipeline()
+        key = self.pending_key.format(group=group)
+        for field, amount in increments.items():
+            pipe.hincrby(key, field, amount)
+        pipe.sadd(self.dirty_key, group)
+        pipe.execute()
+
+    def pending(self, group, fields=None):
+        if fields is not None and not fields:
+            return {}
+        keys = [self.pending_key.format(group=group)] + [
+            self.batch_key.format(batch_id=batch_id, group=group)
+            for batch_id in self.recover_batches()
+        ]
+        pipe = self.redis.pipeline()
+        for key in keys:
+            if fields is None:
+                pipe.hgetall(key)
+            else:
+                pipe.hmget(key, fields)
+
+        totals = defaultdict(int)
+        for values in pipe.execute():
+            if fields is not None:
+                values = {field: value for field, value in zip(fields, values) if value is not None}
+            for field, amount in values.items():
+                totals[_decode(field)] += int(amount)
+        return dict(totals)
+
+    def open_batch(self):
+        """Move os hashes pendentes para um novo lote e retorna seu id"""
+        if not self.redis.exists(self.dirty_key):
+            return None
+
+        batch_id = uuid.uuid4().hex
+        groups_key = self.batch_groups_key.format(batch_id=batch_id)
+        # O lote é registrado como em andamento antes de qualquer movimentação
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.sadd(self.inflight_key, batch_id)
+        pipe.rename(self.dirty_key, groups_key)
+        pipe.execute(raise_on_error=False)
+        self._collect_groups(batch_id)
+        return batch_id
+
+    def _collect_groups(self, batch_id):
+        groups = self.redis.smembers(self.batch_groups_key.format(batch_id=batch_id))
+        pipe = self.redis.pipeline()
+        for group in groups:
+            group = _decode(group)
+            pipe.renamenx(
+                self.pending_key.format(group=group),
+                self.batch_key.format(batch_id=batch_id, group=group)
+            )
+        pipe.execute(raise_on_error=False)
+
+    def read_batch(self, batch_id):
+        groups = [
+            _decode(group)
+            for group in self.redis.smembers(self.batch_groups_key.format(batch_id=batch_id))
+        ]
+        pipe = self.redis.pipeline()
+        for group in groups:
+            pipe.hgetall(self.batch_key.format(batch_id=batch_id, group=group))
+
+        deltas = {}
+        for group, values in zip(groups, pipe.execute()):
+            if values:
+                deltas[group] = {_decode(field): int(amount) for field, amount in values.items()}
+        return groups, deltas
+
+    def close_batch(self, batch_id, groups, remainders):
+        """Devolve as sobras ao buffer e apaga o lote em uma única transação"""
+        pipe = self.redis.pipeline(transaction=True)
+        for group, fields in remainders.items():
+            key = self.pending_key.format(group=group)
+            for field, amount in fields.items():
+                pipe.hincrby(key, field, amount)
+            pipe.sadd(self.dirty_key, group)
+        for group in groups:
+            pipe.delete(self.batch_key.format(batch_id=batch_id, group=group))
+        pipe.delete(self.batch_groups_key.format(batch_id=batch_id))
+        pipe.srem(self.inflight_key, batch_id)
+        pipe.execute()
+
+    def recover_batches(self):
+        """Lotes deixados por um flush interrompido"""
+        return [_decode(batch_id) for batch_id in self.redis.smembers(self.inflight_key)]
+
+
+class LocalBuffer:
+    """
+    Buffer em memória do processo (desenvolvimento e testes, sem Redis).
+    Não sobrevive a reinícios. O worker do Celery não enxerga a memória deste
+    processo, então o flush periódico roda em uma thread de fundo iniciada no
+    primeiro incremento, nunca na requisição.
+    """
+
+    def __init__(self, owner):
+        self.owner = owner
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: defaultdict(int))
+        self._batches = {}
+        self._flusher = None
+
+    def add(self, group, increments):
+        with self._lock:
+            fields = self._pending[group]
+            for field, amount in increments.items():
+                fields[field] += amount
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_periodically, name=f'{self.owner.name}-flush', daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.owner.flush_interval)
+            if self.owner._buffer is not self:
+                return
+            try:
+                self.owner.flush()
+            except Exception:
+                logger.exception('Falha ao gravar os incrementos pendentes (%s)', self.owner.name)
+            finally:
+                connections.close_all()
+
+    def pending(self, group, fields=None):
+        wanted = None if fields is None else set(fields)
+        totals = defaultdict(int)
+        with self._lock:
+            sources = [self._pending.get(group, {})] + [
+                batch.get(group, {}) for batch in self._batches.values()
+            ]
+            for source in sources:
+                for field, amount in source.items():
+                    if wanted is None or field in wanted:
+                        totals[field] += amount
+        return {field: amount for field, amount in totals.items() if amount}
+
+    def open_batch(self):
+        with self._lock:
+            if not self._pending:
+                return None
+            batch_id = uuid.uuid4().hex
+            self._batches[batch_id] = {
+                group: dict(fields) for group, fields in self._pending.items()
+            }
+            self._pending = defaultdict(lambda: defaultdict(int))
+        return batch_id
+
+    def read_batch(self, batch_id):
+        with self._lock:
+            batch = self._batches.get(batch_id, {})
+            return list(batch), {group: dict(fields) for group, fields in batch.items()}
+
+    def close_batch(self, batch_id, groups, remainders):
+        with self._lock:
+            for group, fields in remainders.items():
+                for field, amount in fields.items():
+                    self._pending[group][field] += amount
+            self._batches.pop(batch_id, None)
+
+    def recover_batches(self):
+        with self._lock:
+            return list(self._batches)
+
+
+class WriteBehind:
+    """
+    Acumulador write-behind. As subclasses definem `name` (prefixo das chaves
+    e nome da thread de flush), `flush_interval_setting`, o modelo de lotes
+    aplicados (`ledger_model`, com `batch_id` único e `flushed_at`) e o campo
+    com o total do lote (`ledger_field`), e implementam prepare() e apply()
+    """
+    name = None
+    flush_interval_setting = None
+    ledger_model = None
+    ledger_field = None
+
+    # Registros de lotes aplicados são mantidos por este período
+    ledger_retention = timedelta(days=7)
+
+    def __init__(self):
+        self._buffer = None
+        self._buffer_lock = threading.Lock()
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, self.flush_interval_setting)
+
+    def get_buffer(self):
+        """Redis quando o cache padrão é django-redis; memória do processo caso contrário"""
+        if self._buffer is None:
+            with self._buffer_lock:
+                if self._buffer is None:
+                    backend = settings.CACHES['default']['BACKEND']
+                    if backend.startswith('django_redis'):
+                        from django_redis import get_redis_connection
+                        self._buffer = RedisBuffer(get_redis_connection('default'), self.name)
+                    else:
+                        self._buffer = LocalBuffer(self)
+        return self._buffer
+
+    def reset_buffer(self):
+        """Descarta o buffer; o próximo uso o escolhe de novo pelo backend de cache"""
+        self._buffer = None
+
+    def add(self, group, increments):
+        """Soma `increments` ({campo: quantidade}) aos campos pendentes do grupo"""
+        self.get_buffer().add(str(group), increments)
+
+    def pending(self, group, fields=None):
+        """Quantidades ainda não gravadas no banco do grupo (todos os campos ou `fields`)"""
+        return self.get_buffer().pending(str(group), fields)
+
+    def flush(self):
+        """
+        Aplica no banco tudo o que foi acumulado. Primeiro conclui lotes de
+        flushes interrompidos, depois abre e aplica um novo lote. Retorna a
+        soma dos totais dos lotes aplicados.
+        """
+        # Evita dois flushes simultâneos (execuções do beat que se sobrepõem)
+        lock_key = f'{self.name}:flush_lock'
+        if not cache.add(lock_key, 1, timeout=self.flush_interval * 5):
+            return 0
+
+        try:
+            buffer = self.get_buffer()
+            flushed = 0
+            for batch_id in buffer.recover_batches():
+                flushed += self._apply_batch(buffer, batch_id)
+
+            batch_id = buffer.open_batch()
+            if batch_id is not None:
+                flushed += self._apply_batch(buffer, batch_id)
+            return flushed
+        finally:
+            cache.delete(lock_key)
+
+    def _apply_batch(self, buffer, batch_id):
+        ledger = apps.get_model(self.ledger_model)
+        groups, deltas = buffer.read_batch(batch_id)
+        changes, total, remainders = self.prepare(deltas)
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    ledger.objects.create(batch_id=batch_id, **{self.ledger_field: total})
+            except IntegrityError:
+                # Lote já aplicado por um flush anterior; só falta finalizá-lo.
+                # Falhas na aplicação propagam e deixam o lote para o próximo flush.
+                total = 0
+            else:
+                self.apply(changes)
+
+        buffer.close_batch(batch_id, groups, remainders)
+        ledger.objects.filter(
+            flushed_at__lt=timezone.now() - self.ledger_retention
+        ).delete()
+        self.after_flush(changes)
+        return total
+
+    def prepare(self, deltas):
+        """
+        Converte o lote ({grupo: {campo: quantidade}}) em (alterações, total
+        gravado no registro do lote, sobras {grupo: {campo: quantidade}} que
+        voltam ao buffer)
+        """
+        raise NotImplementedError
+
+    def apply(self, changes):
+        """Grava as alterações no banco, dentro da transação do registro do lote"""
+        raise NotImplementedError
+
+    def after_flush(self, changes):
+        """Chamado depois que o lote é finalizado (também quando já estava aplicado)"""
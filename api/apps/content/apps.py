@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ContentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.content'
-    verbose_name = 'Conteúdo'
\ No newline at end of file
+    verbose_name = 'Conteúdo'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,28 @@
+"""
+Cache por objeto dos detalhes de conteúdo (histórias, orações, cânticos e
+atividades).
+
+Cada payload é guardado pelo tipo de conteúdo e pelo identificador usado na
+URL (slug, ou id nas orações) e apagado pelos signals quando o objeto ou suas
+referências bíblicas mudam, por isso o timeout pode ser longo.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+
+def detail_cache_key(kind, lookup):
+    return f'content:{kind}:{lookup}'
+
+
+def get_cached_detail(kind, lookup, build):
+    """Payload em cache ou montado por `build()` (exceções não são guardadas)"""
+    key = detail_cache_key(kind, lookup)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.CONTENT_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_details(kind, lookups):
+    cache.delete_many([detail_cache_key(kind, lookup) for lookup in lookups if lookup])
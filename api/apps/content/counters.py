@@ -0,0 +1,106 @@
+"""
+Contadores write-behind de reproduções (Song.play_count) e usos
+(Prayer.usage_count).
+
+Cada reprodução soma 1 em um buffer (hash por tipo de conteúdo no Redis com
+HINCRBY, ou em memória quando o cache não é Redis) em vez de atualizar a
+linha, o que evitaria disputas de lock nos conteúdos mais populares. A task
+flush_content_counters (Celery beat) aplica periodicamente os totais com um
+UPDATE com F() por valor distinto de incremento.
+
+Os lotes, o registro em ContentCounterFlush e a recuperação de flushes
+interrompidos ficam na base apps.common.write_behind.
+
+Leituras somam os incrementos pendentes (get_pending_counts/merge_pending_counts).
+"""
+from collections import defaultdict
+
+from django.apps import apps
+from django.db.models import F
+
+from apps.common.write_behind import WriteBehind
+
+# tipo -> (modelo, campo do contador, campo usado na URL do detalhe)
+COUNTERS = {
+    'song': ('content.Song', 'play_count', 'slug'),
+    'prayer': ('content.Prayer', 'usage_count', 'pk'),
+}
+
+
+class ContentCounters(WriteBehind):
+    """Incrementos agrupados por tipo de conteúdo, um campo por objeto"""
+    name = 'content_counters'
+    flush_interval_setting = 'CONTENT_COUNTERS_FLUSH_INTERVAL'
+    ledger_model = 'content.ContentCounterFlush'
+    ledger_field = 'increments'
+
+    def prepare(self, deltas):
+        changes = defaultdict(lambda: defaultdict(list))
+        total = 0
+        for kind, counts in deltas.items():
+            if kind not in COUNTERS:
+                continue
+            for object_id, amount in counts.items():
+                if amount:
+                    changes[kind][amount].append(object_id)
+                    total += amount
+        return changes, total, {}
+
+    def apply(self, changes):
+        for kind, by_amount in changes.items():
+            model_label, target, _ = COUNTERS[kind]
+            model = apps.get_model(model_label)
+            for amount, object_ids in by_amount.items():
+                model.objects.filter(pk__in=object_ids).update(**{target: F(target) + amount})
+
+    def after_flush(self, changes):
+        from .cache import invalidate_details
+
+        # Os UPDATEs não disparam sinais: os detalhes em cache trazem o contador antigo
+        for kind, by_amount in changes.items():
+            model_label, _, lookup_field = COUNTERS[kind]
+            object_ids = [object_id for ids in by_amount.values() for object_id in ids]
+            if lookup_field == 'pk':
+                lookups = object_ids
+            else:
+                lookups = apps.get_model(model_label).objects.filter(
+                    pk__in=object_ids
+                ).values_list(lookup_field, flat=True)
+            invalidate_details(kind, lookups)
+
+
+content_counters = ContentCounters()
+
+
+def get_counter_buffer():
+    return content_counters.get_buffer()
+
+
+def increment(kind, object_id, amount=1):
+    """Acumula `amount` no contador de um objeto (reprodução ou uso)"""
+    content_counters.add(kind, {str(object_id): amount})
+
+
+def get_pending_counts(kind, object_ids):
+    """Incrementos ainda não gravados no banco: {id (str): quantidade}"""
+    return content_counters.pending(kind, [str(object_id) for object_id in object_ids])
+
+
+def merge_pending_counts(kind, items):
+    """Soma os incrementos pendentes ao contador de itens já serializados"""
+    target = COUNTERS[kind][1]
+    pending = get_pending_counts(kind, [item['id'] for item in items])
+    if not pending:
+        return items
+    return [
+        dict(item, **{target: item[target] + pending.get(str(item['id']), 0)})
+        for item in items
+    ]
+
+
+def flush_content_counters():
+    """
+    Aplica no banco os incrementos acumulados (ver WriteBehind.flush). Retorna
+    o total de incrementos gravados.
+    """
+    return content_counters.flush()
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
+from apps.learning.models import Tag
 import uuid
 
 User = get_user_model()
@@ -113,6 +114,13 @@ class Story(models.Model):
         help_text='Tags separadas por vírgula',
         verbose_name='Tags'
     )
+    normalized_tags = models.ManyToManyField(
+        Tag,
+        through='StoryTag',
+        blank=True,
+        related_name='stories',
+        verbose_name='Tags normalizadas'
+    )
     is_featured = models.BooleanField(default=False, verbose_name='Destacada')
     is_published = models.BooleanField(default=False, verbose_name='Publicada')
     created_by = models.ForeignKey(
@@ -145,6 +153,36 @@ class Story(models.Model):
         super().save(*args, **kwargs)
 
 
+class StoryTag(models.Model):
+    """
+    Associação entre histórias e tags normalizadas
+    """
+    story = models.ForeignKey(
+        Story,
+        on_delete=models.CASCADE,
+        related_name='tag_links',
+        verbose_name='História'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='story_links',
+        verbose_name='Tag'
+    )
+    
+    class Meta:
+        verbose_name = 'Tag da História'
+        verbose_name_plural = 'Tags das Histórias'
+        db_table = 'story_tags'
+        unique_together = ['story', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'story']),
+        ]
+    
+    def __str__(self):
+        return f"{self.story.title} - {self.tag.name}"
+
+
 class Prayer(models.Model):
     """
     Orações para diferentes ocasiões
@@ -431,4 +469,25 @@ class Activity(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ContentCounterFlush(models.Model):
+    """
+    Registro dos lotes de reproduções e usos já aplicados pelo write-behind
+    (apps.content.counters), usado para não reaplicar um lote após falhas
+    """
+    batch_id = models.CharField(max_length=32, unique=True, verbose_name='Lote')
+    increments = models.PositiveIntegerField(default=0, verbose_name='Incrementos gravados')
+    flushed_at = models.DateTimeField(auto_now_add=True, verbose_name='Gravado em')
+    
+    class Meta:
+        verbose_name = 'Gravação de Contadores'
+        verbose_name_plural = 'Gravações de Contadores'
+        db_table = 'content_counter_flushes'
+        indexes = [
+            models.Index(fields=['flushed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.batch_id} ({self.increments} incrementos)"
@@ -0,0 +1,85 @@
+from rest_framework import serializers
+from .models import BibleVerse, Story, Prayer, Song, Activity
+
+
+class BibleReferenceSerializer(serializers.ModelSerializer):
+    reference = serializers.ReadOnlyField()
+    book = serializers.ReadOnlyField(source='book.abbreviation')
+    
+    class Meta:
+        model = BibleVerse
+        fields = ['id', 'reference', 'book', 'chapter', 'verse', 'version']
+
+
+class BibleVerseSerializer(BibleReferenceSerializer):
+    class Meta(BibleReferenceSerializer.Meta):
+        fields = BibleReferenceSerializer.Meta.fields + ['text']
+
+
+class StoryListSerializer(serializers.ModelSerializer):
+    bible_references = BibleReferenceSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Story
+        fields = [
+            'id', 'title', 'slug', 'summary', 'age_group', 'cover_image',
+            'is_featured', 'bible_references', 'created_at'
+        ]
+
+
+class StoryDetailSerializer(StoryListSerializer):
+    bible_references = BibleVerseSerializer(many=True, read_only=True)
+    
+    class Meta(StoryListSerializer.Meta):
+        fields = StoryListSerializer.Meta.fields + ['content', 'moral_lesson', 'tags']
+
+
+class PrayerListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Prayer
+        fields = [
+            'id', 'title', 'prayer_type', 'age_group', 'audio_file',
+            'is_favorite', 'usage_count'
+        ]
+
+
+class PrayerDetailSerializer(PrayerListSerializer):
+    class Meta(PrayerListSerializer.Meta):
+        fields = PrayerListSerializer.Meta.fields + ['text', 'created_at']
+
+
+class SongListSerializer(serializers.ModelSerializer):
+    bible_references = BibleReferenceSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Song
+        fields = [
+            'id', 'title', 'slug', 'artist', 'song_type', 'age_group',
+            'audio_file', 'video_url', 'is_featured', 'play_count', 'bible_references'
+        ]
+
+
+class SongDetailSerializer(SongListSerializer):
+    bible_references = BibleVerseSerializer(many=True, read_only=True)
+    
+    class Meta(SongListSerializer.Meta):
+        fields = SongListSerializer.Meta.fields + [
+            'lyrics', 'chord_chart', 'teaching_notes', 'sheet_music', 'created_at'
+        ]
+
+
+class ActivityListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Activity
+        fields = [
+            'id', 'title', 'slug', 'description', 'activity_type', 'difficulty_level',
+            'age_group', 'estimated_time_minutes', 'cover_image', 'is_featured', 'created_at'
+        ]
+
+
+class ActivityDetailSerializer(ActivityListSerializer):
+    class Meta(ActivityListSerializer.Meta):
+        fields = ActivityListSerializer.Meta.fields + [
+            'instructions', 'materials_needed', 'learning_objectives',
+            'instruction_video', 'template_file', 'bible_connection'
+        ]
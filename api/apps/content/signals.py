@@ -0,0 +1,86 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.learning.models import Tag
+from .cache import invalidate_details
+from .models import Story, Prayer, Song, Activity
+
+# Modelo -> tipo usado nas chaves do cache de detalhes
+CACHED_DETAIL_KINDS = {
+    Story: 'story',
+    Prayer: 'prayer',
+    Song: 'song',
+    Activity: 'activity',
+}
+
+
+@receiver(post_save, sender=Story)
+def sync_story_tags(sender, instance, raw=False, **kwargs):
+    """Mantém a tabela de tags normalizadas em sincronia com o campo `tags`"""
+    if raw:
+        return
+    
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None or previous['tags'] != instance.tags:
+        Tag.sync_for(instance)
+
+
+def _detail_lookups(instance):
+    """Identificadores de URL do objeto (slug ou id)"""
+    slug = getattr(instance, 'slug', None)
+    return [slug] if slug is not None else [str(instance.pk)]
+
+
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """
+    Guarda o slug atual do banco, para apagar também a chave antiga, e as
+    tags, para sincronizá-las apenas quando mudarem
+    """
+    instance._previous_state = None
+    fields = [field for field in ('slug', 'tags') if hasattr(instance, field)]
+    if raw or instance._state.adding or not fields:
+        return
+    instance._previous_state = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def invalidate_content_detail(sender, instance, **kwargs):
+    lookups = _detail_lookups(instance)
+    previous = getattr(instance, '_previous_state', None)
+    if previous:
+        lookups.append(previous.get('slug'))
+    invalidate_details(CACHED_DETAIL_KINDS[sender], lookups)
+
+
+def invalidate_references_detail(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Referências bíblicas alteradas pelo conteúdo ou pelo versículo"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_details(CACHED_DETAIL_KINDS[type(instance)], _detail_lookups(instance))
+        return
+    
+    # Pelo versículo o post_clear não informa pk_set: os conteúdos afetados
+    # são lidos no pre_clear, antes de a relação ser apagada
+    if action == 'pre_clear':
+        cleared = getattr(instance, '_cleared_references', {})
+        cleared[model] = list(
+            model.objects.filter(bible_references=instance).values_list('slug', flat=True)
+        )
+        instance._cleared_references = cleared
+    elif action == 'post_clear':
+        lookups = getattr(instance, '_cleared_references', {}).pop(model, [])
+        invalidate_details(CACHED_DETAIL_KINDS[model], lookups)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        invalidate_details(
+            CACHED_DETAIL_KINDS[model],
+            model.objects.filter(pk__in=pk_set).values_list('slug', flat=True)
+        )
+
+
+for content_model in CACHED_DETAIL_KINDS:
+    pre_save.connect(remember_previous_state, sender=content_model)
+    post_save.connect(invalidate_content_detail, sender=content_model)
+    post_delete.connect(invalidate_content_detail, sender=content_model)
+
+for content_model in (Story, Song):
+    m2m_changed.connect(
+        invalidate_references_detail, sender=content_model.bible_references.through
+    )
@@ -0,0 +1,8 @@
+from celery import shared_task
+from . import counters
+
+
+@shared_task(ignore_result=True)
+def flush_content_counters():
+    """Grava no banco as reproduções de cânticos e usos de orações acumulados"""
+    return counters.flush_content_counters()
@@ -1,8 +1,24 @@
 from django.urls import path
+from . import views
 
 app_name = 'content'
 
 urlpatterns = [
-    # URLs para conteúdo (histórias, orações, cânticos, atividades)
-    # TODO: Implementar views para o app de conteúdo
+    # Histórias
+    path('stories/', views.StoryListView.as_view(), name='stories_list'),
+    path('stories/<slug:slug>/', views.StoryDetailView.as_view(), name='stories_detail'),
+    
+    # Orações
+    path('prayers/', views.PrayerListView.as_view(), name='prayers_list'),
+    path('prayers/<uuid:pk>/', views.PrayerDetailView.as_view(), name='prayers_detail'),
+    path('prayers/<uuid:pk>/use/', views.PrayerUseView.as_view(), name='prayers_use'),
+    
+    # Cânticos
+    path('songs/', views.SongListView.as_view(), name='songs_list'),
+    path('songs/<slug:slug>/', views.SongDetailView.as_view(), name='songs_detail'),
+    path('songs/<slug:slug>/play/', views.SongPlayView.as_view(), name='songs_play'),
+    
+    # Atividades
+    path('activities/', views.ActivityListView.as_view(), name='activities_list'),
+    path('activities/<slug:slug>/', views.ActivityDetailView.as_view(), name='activities_detail'),
 ]
\ No newline at end of file
@@ -0,0 +1,318 @@
+from rest_framework import generics, permissions, serializers
+from rest_framework.response import Response
+from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.openapi import OpenApiTypes
+from apps.common.pagination import KeysetPagination
+from apps.search.filters import FullTextSearchFilter
+from .cache import get_cached_detail
+from .counters import COUNTERS, get_pending_counts, increment, merge_pending_counts
+from .models import BibleVerse, Story, Prayer, Song, Activity
+from .serializers import (
+    StoryListSerializer, StoryDetailSerializer, PrayerListSerializer, PrayerDetailSerializer,
+    SongListSerializer, SongDetailSerializer, ActivityListSerializer, ActivityDetailSerializer
+)
+
+
+def bible_references_prefetch(with_text=False):
+    """Referências bíblicas com o livro em uma única consulta extra"""
+    fields = ['id', 'book', 'chapter', 'verse', 'version', 'book__name', 'book__abbreviation']
+    if with_text:
+        fields.append('text')
+    return Prefetch(
+        'bible_references',
+        queryset=BibleVerse.objects.select_related('book').only(*fields)
+    )
+
+
+def absolute_file_urls(fields, data, request):
+    """
+    Cópia de `data` com as URLs de arquivo absolutas, descendo pelos
+    serializers aninhados; `fields` são os campos do serializer que gerou
+    os dados
+    """
+    data = dict(data)
+    for name, field in fields.items():
+        value = data.get(name)
+        if not value:
+            continue
+        if isinstance(field, serializers.FileField):
+            data[name] = request.build_absolute_uri(value)
+        elif isinstance(field, serializers.ListSerializer):
+            if isinstance(field.child, serializers.Serializer):
+                data[name] = [
+                    absolute_file_urls(field.child.fields, item, request) for item in value
+                ]
+        elif isinstance(field, serializers.Serializer):
+            data[name] = absolute_file_urls(field.fields, value, request)
+    return data
+
+
+class ContentListView(generics.ListAPIView):
+    """
+    Base das listagens de conteúdo: apenas itens publicados, sem as colunas
+    de texto longo (`heavy_fields`), paginadas por cursor
+    """
+    permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    model = None
+    heavy_fields = []
+    prefetch_references = False
+    counter_kind = None
+    
+    def get_queryset(self):
+        queryset = self.model.objects.filter(is_published=True).defer(*self.heavy_fields)
+        if self.prefetch_references:
+            queryset = queryset.prefetch_related(bible_references_prefetch())
+        return queryset
+    
+    def get_paginated_response(self, data):
+        # Contadores aproximados: valor do banco + incrementos ainda no buffer
+        if self.counter_kind:
+            data = merge_pending_counts(self.counter_kind, data)
+        return super().get_paginated_response(data)
+
+
+class ContentDetailView(generics.RetrieveAPIView):
+    """
+    Base dos detalhes de conteúdo, servidos do cache por objeto
+    (apps.content.cache), invalidado pelos signals ao salvar. O payload em
+    cache traz as URLs relativas dos arquivos; as absolutas são montadas
+    com o host de cada requisição
+    """
+    permission_classes = [permissions.AllowAny]
+    model = None
+    cache_kind = None
+    prefetch_references = False
+    counter_kind = None
+    
+    def get_queryset(self):
+        queryset = self.model.objects.filter(is_published=True)
+        if self.prefetch_references:
+            queryset = queryset.prefetch_related(bible_references_prefetch(with_text=True))
+        return queryset
+    
+    def get_detail_data(self):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        # Sem a requisição no contexto os arquivos são serializados com URLs relativas
+        return get_cached_detail(
+            self.cache_kind,
+            lookup,
+            lambda: self.get_serializer(
+                self.get_object(),
+                context={'format': self.format_kwarg, 'view': self}
+            ).data
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        fields = self.get_serializer_class()().fields
+        data = absolute_file_urls(fields, self.get_detail_data(), request)
+        if self.counter_kind:
+            data = merge_pending_counts(self.counter_kind, [data])[0]
+        return Response(data)
+
+
+class ContentCounterView(ContentDetailView):
+    """
+    Base dos registros de reprodução/uso: o objeto é localizado pelo cache de
+    detalhes e o incremento vai para o buffer de apps.content.counters
+    """
+    http_method_names = ['post', 'options']
+    
+    def post(self, request, *args, **kwargs):
+        data = self.get_detail_data()
+        increment(self.counter_kind, data['id'])
+        target = COUNTERS[self.counter_kind][1]
+        pending = get_pending_counts(self.counter_kind, [data['id']])
+        return Response({target: data[target] + pending.get(str(data['id']), 0)})
+
+
+@extend_schema(
+    tags=['content'],
+    summary='Listar histórias',
+    description='''
+    Lista as histórias bíblicas publicadas, com as referências bíblicas.
+    O texto completo da história é retornado apenas no detalhe.
+    
+    **Paginação:** Por cursor. Siga os links `next`/`previous` da resposta.
+    ''',
+    parameters=[
+        OpenApiParameter('age_group', OpenApiTypes.STR, description='Faixa etária'),
+        OpenApiParameter('is_featured', OpenApiTypes.BOOL, description='Apenas histórias em destaque'),
+    ]
+)
+class StoryListView(ContentListView):
+    """
+    Lista histórias publicadas
+    """
+    model = Story
+    serializer_class = StoryListSerializer
+    filterset_fields = ['age_group', 'is_featured']
+    search_document_kind = 'story'
+    ordering = ['-created_at']
+    heavy_fields = ['content', 'moral_lesson']
+    prefetch_references = True
+
+
+@extend_schema(tags=['content'], summary='Detalhes da história')
+class StoryDetailView(ContentDetailView):
+    """
+    Detalhes de uma história
+    """
+    model = Story
+    serializer_class = StoryDetailSerializer
+    lookup_field = 'slug'
+    cache_kind = 'story'
+    prefetch_references = True
+
+
+@extend_schema(
+    tags=['content'],
+    summary='Listar orações',
+    description='''
+    Lista as orações publicadas. O texto da oração é retornado apenas no detalhe.
+    
+    **Paginação:** Por cursor. Siga os links `next`/`previous` da resposta.
+    ''',
+    parameters=[
+        OpenApiParameter('prayer_type', OpenApiTypes.STR, description='Tipo de oração'),
+        OpenApiParameter('age_group', OpenApiTypes.STR, description='Faixa etária'),
+    ]
+)
+class PrayerListView(ContentListView):
+    """
+    Lista orações publicadas
+    """
+    model = Prayer
+    serializer_class = PrayerListSerializer
+    filterset_fields = ['prayer_type', 'age_group']
+    search_document_kind = 'prayer'
+    ordering = ['prayer_type', 'title']
+    heavy_fields = ['text']
+    counter_kind = 'prayer'
+
+
+@extend_schema(tags=['content'], summary='Detalhes da oração')
+class PrayerDetailView(ContentDetailView):
+    """
+    Detalhes de uma oração
+    """
+    model = Prayer
+    serializer_class = PrayerDetailSerializer
+    cache_kind = 'prayer'
+    counter_kind = 'prayer'
+
+
+@extend_schema(
+    tags=['content'],
+    summary='Listar cânticos',
+    description='''
+    Lista os cânticos publicados, com as referências bíblicas.
+    Letra, cifra e notas de ensino são retornadas apenas no detalhe.
+    
+    **Paginação:** Por cursor. Siga os links `next`/`previous` da resposta.
+    ''',
+    parameters=[
+        OpenApiParameter('song_type', OpenApiTypes.STR, description='Tipo de cântico'),
+        OpenApiParameter('age_group', OpenApiTypes.STR, description='Faixa etária'),
+        OpenApiParameter('is_featured', OpenApiTypes.BOOL, description='Apenas cânticos em destaque'),
+    ]
+)
+class SongListView(ContentListView):
+    """
+    Lista cânticos publicados
+    """
+    model = Song
+    serializer_class = SongListSerializer
+    filterset_fields = ['song_type', 'age_group', 'is_featured']
+    search_document_kind = 'song'
+    ordering = ['song_type', 'title']
+    heavy_fields = ['lyrics', 'chord_chart', 'teaching_notes']
+    prefetch_references = True
+    counter_kind = 'song'
+
+
+@extend_schema(tags=['content'], summary='Detalhes do cântico')
+class SongDetailView(ContentDetailView):
+    """
+    Detalhes de um cântico
+    """
+    model = Song
+    serializer_class = SongDetailSerializer
+    lookup_field = 'slug'
+    cache_kind = 'song'
+    prefetch_references = True
+    counter_kind = 'song'
+
+
+@extend_schema(
+    tags=['content'],
+    summary='Listar atividades',
+    description='''
+    Lista as atividades publicadas. Instruções, materiais e objetivos são
+    retornados apenas no detalhe.
+    
+    **Paginação:** Por cursor. Siga os links `next`/`previous` da resposta.
+    ''',
+    parameters=[
+        OpenApiParameter('activity_type', OpenApiTypes.STR, description='Tipo de atividade'),
+        OpenApiParameter('difficulty_level', OpenApiTypes.STR, description='Nível de dificuldade'),
+        OpenApiParameter('age_group', OpenApiTypes.STR, description='Faixa etária'),
+        OpenApiParameter('is_featured', OpenApiTypes.BOOL, description='Apenas atividades em destaque'),
+    ]
+)
+class ActivityListView(ContentListView):
+    """
+    Lista atividades publicadas
+    """
+    model = Activity
+    serializer_class = ActivityListSerializer
+    filterset_fields = ['activity_type', 'difficulty_level', 'age_group', 'is_featured']
+    search_document_kind = 'activity'
+    ordering = ['-created_at']
+    heavy_fields = [
+        'instructions', 'materials_needed', 'learning_objectives', 'bible_connection'
+    ]
+
+
+@extend_schema(tags=['content'], summary='Detalhes da atividade')
+class ActivityDetailView(ContentDetailView):
+    """
+    Detalhes de uma atividade
+    """
+    model = Activity
+    serializer_class = ActivityDetailSerializer
+    lookup_field = 'slug'
+    cache_kind = 'activity'
+
+
+@extend_schema(
+    tags=['content'],
+    summary='Registrar reprodução do cântico',
+    description='''
+    Registra uma reprodução do cântico e retorna a contagem aproximada.
+    As reproduções são acumuladas e gravadas no banco periodicamente.
+    ''',
+    request=None
+)
+class SongPlayView(ContentCounterView, SongDetailView):
+    """
+    Registra a reprodução de um cântico
+    """
+
+
+@extend_schema(
+    tags=['content'],
+    summary='Registrar uso da oração',
+    description='''
+    Registra um uso da oração e retorna a contagem aproximada.
+    Os usos são acumulados e gravados no banco periodicamente.
+    ''',
+    request=None
+)
+class PrayerUseView(ContentCounterView, PrayerDetailView):
+    """
+    Registra o uso de uma oração
+    """
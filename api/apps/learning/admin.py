@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from .models import (
-    Category, LearningPath, Lesson, Quiz, Question, Answer, Achievement
+    Category, LearningPath, Lesson, Quiz, Question, Answer, Achievement, Tag
 )
 
 
@@ -11,7 +11,7 @@ class CategoryAdmin(admin.ModelAdmin):
     """
     Administração para categorias
     """
-    list_display = ['name', 'slug', 'icon', 'color_display', 'order', 'is_active']
+    list_display = ['name', 'slug', 'icon', 'color_display', 'order', 'published_paths_count', 'is_active']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
@@ -25,6 +25,16 @@ class CategoryAdmin(admin.ModelAdmin):
     color_display.short_description = 'Cor'
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    """
+    Administração para tags normalizadas (geradas a partir do campo de tags)
+    """
+    list_display = ['name', 'slug', 'created_at']
+    search_fields = ['name', 'slug']
+    ordering = ['name']
+
+
 class LessonInline(admin.TabularInline):
     """
     Inline para lições dentro do caminho de aprendizado
@@ -74,7 +84,7 @@ class LearningPathAdmin(admin.ModelAdmin):
     )
     
     def total_lessons(self, obj):
-        return obj.lessons.count()
+        return obj.total_lessons
     total_lessons.short_description = 'Total de Lições'
 
 
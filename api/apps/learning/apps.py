@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class LearningConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.learning'
-    verbose_name = 'Aprendizado'
\ No newline at end of file
+    verbose_name = 'Aprendizado'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
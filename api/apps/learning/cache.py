@@ -0,0 +1,336 @@
+"""
+Cache versionado das respostas públicas do catálogo de aprendizado.
+
+Todas as chaves incluem a "versão do catálogo", que é incrementada sempre que
+uma categoria, caminho, lição, quiz ou conquista é salvo ou removido. Assim
+nenhuma chave precisa ser apagada: as respostas antigas simplesmente deixam de
+ser lidas e expiram pelo timeout.
+"""
+import hashlib
+import random
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from .etags import etag_matches
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_HITS_KEY = 'catalog:stats:hits'
+CATALOG_MISSES_KEY = 'catalog:stats:misses'
+
+# As conquistas obtidas são apagadas explicitamente; o timeout só limita a memória
+EARNED_ACHIEVEMENTS_TIMEOUT = 60 * 60 * 24
+
+# Tipos de pergunta cujas respostas podem ser embaralhadas
+SHUFFLE_ANSWER_TYPES = ('multiple_choice',)
+
+
+def get_catalog_version():
+    """Retorna a versão atual do catálogo, inicializando-a se necessário"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """Invalida todas as respostas do catálogo incrementando a versão"""
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Chave ausente (cache reiniciado): qualquer valor novo invalida o que havia
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        return cache.incr(CATALOG_VERSION_KEY)
+
+
+def catalog_cache_key(name, path, versions=()):
+    """
+    Monta a chave de cache de uma resposta para a versão atual do catálogo e
+    para as versões adicionais informadas (ex: versão da popularidade)
+    """
+    digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+    extra = ''.join(f':{version}' for version in versions)
+    return f'catalog:v{get_catalog_version()}{extra}:{name}:{digest}'
+
+
+def get_lesson_sequence(learning_path_id):
+    """
+    Lições publicadas de um caminho, em ordem, como tuplas (id, título, slug).
+    Guardada por versão do catálogo, que muda a cada alteração em lições.
+    """
+    key = f'catalog:v{get_catalog_version()}:lesson_sequence:{learning_path_id}'
+    sequence = cache.get(key)
+    if sequence is None:
+        from .models import Lesson
+        sequence = list(
+            Lesson.objects.filter(
+                learning_path_id=learning_path_id,
+                is_published=True
+            ).order_by('order', 'pk').values_list('id', 'title', 'slug')
+        )
+        cache.set(key, sequence, settings.CATALOG_CACHE_TIMEOUT)
+    return sequence
+
+
+def get_lesson_path_id(lesson_id):
+    """
+    Caminho de uma lição publicada (ou None), em cache por versão do catálogo.
+    Usado pelos heartbeats do player, que não devem consultar o banco.
+    """
+    key = f'catalog:v{get_catalog_version()}:lesson_path:{lesson_id}'
+    path_id = cache.get(key)
+    if path_id is None:
+        from .models import Lesson
+        path_id = Lesson.objects.filter(
+            pk=lesson_id,
+            is_published=True,
+            learning_path__is_published=True
+        ).values_list('learning_path_id', flat=True).first() or ''
+        cache.set(key, path_id, settings.CATALOG_CACHE_TIMEOUT)
+    return path_id or None
+
+
+def get_lesson_neighbours(lesson):
+    """Retorna (lição anterior, próxima lição) a partir da sequência do caminho"""
+    sequence = get_lesson_sequence(lesson.learning_path_id)
+    ids = [lesson_id for lesson_id, _, _ in sequence]
+    if lesson.pk not in ids:
+        return None, None
+    
+    position = ids.index(lesson.pk)
+    previous_row = sequence[position - 1] if position > 0 else None
+    next_row = sequence[position + 1] if position + 1 < len(sequence) else None
+    return (
+        _lesson_summary(previous_row),
+        _lesson_summary(next_row),
+    )
+
+
+def _lesson_summary(row):
+    if row is None:
+        return None
+    lesson_id, title, slug = row
+    return {'id': lesson_id, 'title': title, 'slug': slug}
+
+
+def _quiz_version_key(quiz_id):
+    return f'quiz:{quiz_id}:version'
+
+
+def get_quiz_version(quiz_id):
+    key = _quiz_version_key(quiz_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_quiz_version(quiz_id):
+    """Invalida o payload compilado de um quiz (perguntas ou respostas alteradas)"""
+    key = _quiz_version_key(quiz_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+        return cache.incr(key)
+
+
+def get_compiled_questions(quiz):
+    """
+    Árvore de perguntas e respostas já serializada de um quiz, guardada por
+    versão do quiz. Montada com duas consultas (perguntas + respostas).
+    """
+    key = f'quiz:{quiz.pk}:v{get_quiz_version(quiz.pk)}:questions'
+    questions = cache.get(key)
+    if questions is None:
+        from .serializers import QuestionSerializer
+        queryset = quiz.questions.prefetch_related('answers').order_by('order')
+        # Sem request no contexto as imagens ficam com URL relativa
+        questions = [
+            dict(question, answers=[dict(answer) for answer in question['answers']])
+            for question in QuestionSerializer(queryset, many=True).data
+        ]
+        cache.set(key, questions, settings.CATALOG_CACHE_TIMEOUT)
+    return questions
+
+
+def get_quiz_answer_key(quiz):
+    """
+    Gabarito do quiz para correção em lote, guardado por versão do quiz:
+    {question_id: {'type', 'points', 'answers': {answer_id: is_correct},
+    'correct_texts': [textos normalizados das respostas corretas]}}
+    """
+    key = f'quiz:{quiz.pk}:v{get_quiz_version(quiz.pk)}:answer_key'
+    answer_key = cache.get(key)
+    if answer_key is None:
+        from apps.common.text import fold
+        from .models import Answer
+        answer_key = {
+            question_id: {
+                'type': question_type,
+                'points': points,
+                'answers': {},
+                'correct_texts': [],
+            }
+            for question_id, question_type, points in quiz.questions.values_list(
+                'id', 'question_type', 'points'
+            )
+        }
+        for question_id, answer_id, is_correct, answer_text in Answer.objects.filter(
+            question__quiz=quiz
+        ).values_list('question_id', 'id', 'is_correct', 'answer_text'):
+            entry = answer_key[question_id]
+            entry['answers'][answer_id] = is_correct
+            if is_correct:
+                entry['correct_texts'].append(' '.join(fold(answer_text).split()))
+        cache.set(key, answer_key, settings.CATALOG_CACHE_TIMEOUT)
+    return answer_key
+
+
+def shuffle_questions(questions, seed):
+    """
+    Embaralha perguntas (e respostas de múltipla escolha) de forma
+    determinística: a mesma semente sempre produz a mesma ordem
+    """
+    rng = random.Random(seed)
+    shuffled = [
+        dict(question, answers=list(question['answers']))
+        for question in questions
+    ]
+    rng.shuffle(shuffled)
+    for question in shuffled:
+        if question['question_type'] in SHUFFLE_ANSWER_TYPES:
+            rng.shuffle(question['answers'])
+    return shuffled
+
+
+def get_achievement_catalog():
+    """Conquistas ativas na ordem da listagem, por versão do catálogo"""
+    key = f'catalog:v{get_catalog_version()}:achievements'
+    catalog = cache.get(key)
+    if catalog is None:
+        from .models import Achievement
+        catalog = list(
+            Achievement.objects.filter(is_active=True).order_by(
+                'achievement_type', 'name'
+            ).values(
+                'id', 'name', 'slug', 'description', 'achievement_type',
+                'icon', 'badge_color', 'points', 'is_hidden'
+            )
+        )
+        cache.set(key, catalog, settings.CATALOG_CACHE_TIMEOUT)
+    return catalog
+
+
+def _earned_achievements_key(user_id):
+    return f'achievements:earned-map:{user_id}'
+
+
+def get_earned_achievements(user_id):
+    """
+    Conquistas obtidas por um usuário: {id: (earned_at, progress_data)}.
+    Indexado pelo id da conquista, o que dispensa invalidá-lo quando o
+    catálogo muda. Apagado a cada nova conquista do usuário.
+    """
+    key = _earned_achievements_key(user_id)
+    earned = cache.get(key)
+    if earned is None:
+        from apps.progress.models import UserAchievement
+        earned = {
+            achievement_id: (earned_at, progress_data)
+            for achievement_id, earned_at, progress_data in UserAchievement.objects.filter(
+                user_id=user_id
+            ).values_list('achievement_id', 'earned_at', 'progress_data')
+        }
+        cache.set(key, earned, EARNED_ACHIEVEMENTS_TIMEOUT)
+    return earned
+
+
+def invalidate_earned_achievements(user_ids):
+    cache.delete_many([_earned_achievements_key(user_id) for user_id in user_ids])
+
+
+def _increment_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_catalog_cache_stats():
+    """Retorna os contadores de acertos e falhas do cache do catálogo"""
+    values = cache.get_many([CATALOG_HITS_KEY, CATALOG_MISSES_KEY])
+    hits = values.get(CATALOG_HITS_KEY, 0)
+    misses = values.get(CATALOG_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'version': get_catalog_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': (hits / total * 100) if total > 0 else 0,
+    }
+
+
+def reset_catalog_cache_stats():
+    cache.delete_many([CATALOG_HITS_KEY, CATALOG_MISSES_KEY])
+
+
+def catalog_cache(name, versions=()):
+    """
+    Decorator que serve requisições anônimas (GET/HEAD) a partir do cache,
+    guardando o JSON já renderizado. Requisições autenticadas passam direto,
+    pois incluem informações de progresso do usuário.
+    
+    `versions` são funções cujos valores entram na chave, para respostas que
+    dependem de dados recalculados fora do catálogo.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if (
+                request.method not in ('GET', 'HEAD')
+                or 'HTTP_AUTHORIZATION' in request.META
+            ):
+                return view_func(request, *args, **kwargs)
+            
+            key = catalog_cache_key(
+                name,
+                request.get_full_path(),
+                [get_version() for get_version in versions]
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                _increment_counter(CATALOG_HITS_KEY)
+                content, etag = cached
+                if etag and etag_matches(request, etag):
+                    response = HttpResponseNotModified()
+                else:
+                    response = HttpResponse(content, content_type='application/json')
+                if etag:
+                    response['ETag'] = etag
+                response['X-Catalog-Cache'] = 'HIT'
+                patch_vary_headers(response, ['Authorization'])
+                return response
+            
+            _increment_counter(CATALOG_MISSES_KEY)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                if hasattr(response, 'render'):
+                    response.render()
+                cache.set(
+                    key,
+                    (response.content, response.get('ETag')),
+                    settings.CATALOG_CACHE_TIMEOUT
+                )
+            response['X-Catalog-Cache'] = 'MISS'
+            patch_vary_headers(response, ['Authorization'])
+            return response
+        
+        return wrapped
+    return decorator
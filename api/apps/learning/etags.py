@@ -0,0 +1,88 @@
+"""
+Suporte a GET condicional (ETag / If-None-Match) para o catálogo.
+
+O ETag é calculado a partir de "marcas d'água" de updated_at do caminho, das
+suas lições e do progresso do usuário, obtidas em uma única consulta com
+subconsultas escalares. Quando o cliente já possui a versão atual, a resposta
+304 é devolvida antes de qualquer serializer ser executado.
+"""
+import hashlib
+
+from django.db.models import F, Func, IntegerField, Subquery
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+
+def max_subquery(queryset, field):
+    """Subconsulta escalar com o MAX de um campo (sem GROUP BY)"""
+    return Subquery(
+        queryset.order_by().values(value=Func(F(field), function='MAX')).values('value')
+    )
+
+
+def count_subquery(queryset):
+    """Subconsulta escalar com a contagem de linhas (sem GROUP BY)"""
+    return Subquery(
+        queryset.order_by().values(
+            value=Func(F('pk'), function='COUNT', output_field=IntegerField())
+        ).values('value')
+    )
+
+
+def compute_etag(*parts):
+    """Gera um ETag forte a partir das marcas d'água informadas"""
+    raw = '|'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+class ConditionalRetrieveMixin:
+    """
+    Mixin para RetrieveAPIView que responde 304 quando o If-None-Match do
+    cliente coincide com o ETag atual. As views implementam
+    get_etag_watermarks(), que deve executar uma única consulta e retornar
+    None quando o objeto não existir.
+    """
+    
+    def get_etag_watermarks(self):
+        raise NotImplementedError
+    
+    def get_etag(self):
+        from .cache import get_catalog_version
+        
+        watermarks = self.get_etag_watermarks()
+        if watermarks is None:
+            return None
+        user = self.request.user
+        user_id = 'anon'
+        if user.is_authenticated:
+            from apps.progress.time_tracking import get_pending_seconds
+            user_id = user.pk
+            # Tempo de estudo ainda no buffer write-behind também altera a resposta
+            watermarks['pending_time'] = sorted(get_pending_seconds(user.pk).items())
+        return compute_etag(
+            get_catalog_version(),
+            user_id,
+            *(watermarks[key] for key in sorted(watermarks))
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        if etag is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from apps.learning.models import PathSimilarity
+from apps.learning.similarity import update_similarity_index
+
+
+class Command(BaseCommand):
+    """
+    Atualiza o índice de similaridade entre caminhos por co-inscrição
+    """
+    help = (
+        'Processa as inscrições desde a última execução (ou todas, com --full) '
+        'e recalcula os vizinhos mais próximos de cada caminho'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recalcula a matriz de co-inscrição a partir de todas as inscrições'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=None,
+            help='Quantidade de vizinhos guardados por caminho'
+        )
+
+    def handle(self, *args, **options):
+        mode = 'completo' if options['full'] else 'incremental'
+        self.stdout.write(f'🔗 Atualizando similaridade entre caminhos ({mode})...')
+
+        run = update_similarity_index(full=options['full'], top_k=options['top_k'])
+        self.stdout.write(f'   ✓ {run.new_enrollments} inscrições processadas')
+        self.stdout.write(f'   ✓ {run.updated_paths} caminhos atualizados')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {PathSimilarity.objects.count()} vizinhos no índice')
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from apps.learning.cache import get_catalog_cache_stats, reset_catalog_cache_stats
+
+
+class Command(BaseCommand):
+    """
+    Exibe os contadores de acertos/falhas do cache público do catálogo
+    """
+    help = 'Exibe (e opcionalmente zera) as estatísticas do cache do catálogo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Zera os contadores após exibi-los'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_catalog_cache_stats()
+        self.stdout.write(f"📦 Versão do catálogo: {stats['version']}")
+        self.stdout.write(f"   ✓ Acertos: {stats['hits']}")
+        self.stdout.write(f"   ✗ Falhas: {stats['misses']}")
+        self.stdout.write(f"   Taxa de acerto: {stats['hit_rate']:.1f}%")
+
+        if options['reset']:
+            reset_catalog_cache_stats()
+            self.stdout.write(self.style.SUCCESS('✅ Contadores zerados'))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.learning.models import LearningPath, Tag
+from apps.content.models import Story
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói as tags normalizadas a partir dos campos `tags` (CSV) existentes
+    """
+    help = (
+        'Converte as tags separadas por vírgula de caminhos e histórias na '
+        'tabela de tags normalizada'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de registros processados por transação'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for model in (LearningPath, Story):
+            self.stdout.write(f'🏷️  Processando {model._meta.verbose_name_plural}...')
+            processed = 0
+            batch = []
+            for instance in model.objects.only('pk', 'tags').iterator(chunk_size=batch_size):
+                batch.append(instance)
+                if len(batch) >= batch_size:
+                    processed += self.sync_batch(batch)
+                    batch = []
+            processed += self.sync_batch(batch)
+            self.stdout.write(f'   ✓ {processed} registros sincronizados')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {Tag.objects.count()} tags no índice')
+        )
+
+    def sync_batch(self, batch):
+        with transaction.atomic():
+            for instance in batch:
+                Tag.sync_for(instance)
+        return len(batch)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from apps.learning.models import Category
+
+
+class Command(BaseCommand):
+    """
+    Recalcula em lote o contador de caminhos publicados de cada categoria
+    """
+    help = (
+        'Recalcula Category.published_paths_count (use após importações ou '
+        'atualizações em massa que não disparam sinais)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category',
+            type=int,
+            action='append',
+            dest='category_ids',
+            help='ID de categoria a recalcular (pode ser repetido)'
+        )
+
+    def handle(self, *args, **options):
+        updated = Category.refresh_published_paths_count(options.get('category_ids'))
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {updated} categorias recalculadas')
+        )
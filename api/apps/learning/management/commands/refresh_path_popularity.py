@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from apps.learning.popularity import get_popularity_rankings, refresh_path_popularity
+
+
+class Command(BaseCommand):
+    """
+    Recalcula as pontuações de popularidade e tendência dos caminhos
+    """
+    help = (
+        'Agrega inscrições e conclusões recentes com decaimento temporal e '
+        'atualiza a tabela de popularidade dos caminhos'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write('📈 Calculando popularidade dos caminhos...')
+        scored = refresh_path_popularity()
+        self.stdout.write(f'   ✓ {scored} caminhos pontuados')
+
+        rankings = get_popularity_rankings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {len(rankings['trending'])} em alta, "
+                f"{len(rankings['popular'])} populares, "
+                f"{len(rankings['featured'])} em destaque"
+            )
+        )
@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
 import uuid
@@ -28,6 +31,12 @@ class Category(models.Model):
     )
     order = models.PositiveIntegerField(default=0, verbose_name='Ordem')
     is_active = models.BooleanField(default=True, verbose_name='Ativo')
+    published_paths_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Mantido automaticamente pelos sinais de LearningPath',
+        verbose_name='Caminhos publicados'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     
@@ -44,6 +53,99 @@ class Category(models.Model):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def refresh_published_paths_count(cls, category_ids=None):
+        """Recalcula o contador de caminhos publicados com um único UPDATE"""
+        published_paths = LearningPath.objects.filter(
+            category=OuterRef('pk'),
+            is_published=True
+        ).order_by().values('category').annotate(total=Count('pk')).values('total')
+        
+        queryset = cls.objects.all()
+        if category_ids is not None:
+            queryset = queryset.filter(pk__in=category_ids)
+        return queryset.update(
+            published_paths_count=Coalesce(Subquery(published_paths), 0)
+        )
+
+
+class Tag(models.Model):
+    """
+    Tags normalizadas compartilhadas por caminhos de aprendizado e histórias
+    """
+    name = models.CharField(max_length=100, verbose_name='Nome')
+    slug = models.SlugField(max_length=100, unique=True, verbose_name='Slug')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    
+    class Meta:
+        verbose_name = 'Tag'
+        verbose_name_plural = 'Tags'
+        db_table = 'tags'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def parse(value):
+        """Converte uma string de tags separadas por vírgula em pares (slug, nome) únicos"""
+        parsed = {}
+        for name in (value or '').split(','):
+            name = name.strip()
+            slug = slugify(name)[:100]
+            if slug and slug not in parsed:
+                parsed[slug] = name[:100]
+        return list(parsed.items())
+    
+    @classmethod
+    def get_or_create_many(cls, value):
+        """Retorna as tags da string informada, criando as que ainda não existem"""
+        parsed = cls.parse(value)
+        if not parsed:
+            return []
+        cls.objects.bulk_create(
+            [cls(slug=slug, name=name) for slug, name in parsed],
+            ignore_conflicts=True
+        )
+        return list(cls.objects.filter(slug__in=[slug for slug, _ in parsed]))
+    
+    @classmethod
+    def sync_for(cls, instance):
+        """Sincroniza as tags normalizadas de um objeto com o seu campo `tags` (CSV)"""
+        instance.normalized_tags.set(cls.get_or_create_many(instance.tags))
+
+
+class LearningPathQuerySet(models.QuerySet):
+    """
+    Consultas reutilizáveis para caminhos de aprendizado
+    """
+    
+    def with_stats(self):
+        """Anota contagem de lições publicadas, minutos estimados e quizzes em uma única agregação"""
+        published = Q(lessons__is_published=True)
+        return self.annotate(
+            published_lessons_count=Count('lessons', filter=published, distinct=True),
+            published_lessons_minutes=Coalesce(
+                Sum('lessons__estimated_duration_minutes', filter=published), 0
+            ),
+            published_quizzes_count=Count('lessons__quiz', filter=published, distinct=True),
+        )
+    
+    def with_published_lessons(self):
+        """
+        Pré-carrega as lições publicadas, em ordem, em `published_lessons`,
+        com a existência do quiz anotada em `quiz_exists`
+        """
+        return self.prefetch_related(
+            Prefetch(
+                'lessons',
+                queryset=Lesson.objects.filter(is_published=True).annotate(
+                    quiz_exists=Exists(Quiz.objects.filter(lesson=OuterRef('pk')))
+                ).order_by('order'),
+                to_attr='published_lessons'
+            )
+        )
 
 
 class LearningPath(models.Model):
@@ -104,6 +206,13 @@ class LearningPath(models.Model):
         help_text='Tags separadas por vírgula',
         verbose_name='Tags'
     )
+    normalized_tags = models.ManyToManyField(
+        Tag,
+        through='LearningPathTag',
+        blank=True,
+        related_name='learning_paths',
+        verbose_name='Tags normalizadas'
+    )
     objectives = models.JSONField(
         default=list,
         help_text='Lista de objetivos de aprendizado',
@@ -124,6 +233,8 @@ class LearningPath(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     
+    objects = LearningPathQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Caminho de Aprendizado'
         verbose_name_plural = 'Caminhos de Aprendizado'
@@ -135,6 +246,10 @@ class LearningPath(models.Model):
             models.Index(fields=['age_group']),
             models.Index(fields=['is_featured']),
             models.Index(fields=['is_published']),
+            models.Index(
+                fields=['-is_featured', 'order', '-created_at', 'id'],
+                name='learning_paths_keyset_idx'
+            ),
         ]
     
     def __str__(self):
@@ -147,7 +262,11 @@ class LearningPath(models.Model):
     
     @property
     def total_lessons(self):
-        return self.lessons.count()
+        """Lições publicadas; usa a anotação de with_stats() quando presente"""
+        annotated = getattr(self, 'published_lessons_count', None)
+        if annotated is not None:
+            return annotated
+        return self.lessons.filter(is_published=True).count()
     
     @property
     def completed_lessons_count(self):
@@ -158,6 +277,36 @@ class LearningPath(models.Model):
         ).count()
 
 
+class LearningPathTag(models.Model):
+    """
+    Associação entre caminhos de aprendizado e tags normalizadas
+    """
+    learning_path = models.ForeignKey(
+        LearningPath,
+        on_delete=models.CASCADE,
+        related_name='tag_links',
+        verbose_name='Caminho de aprendizado'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='learning_path_links',
+        verbose_name='Tag'
+    )
+    
+    class Meta:
+        verbose_name = 'Tag do Caminho'
+        verbose_name_plural = 'Tags dos Caminhos'
+        db_table = 'learning_path_tags'
+        unique_together = ['learning_path', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'learning_path']),
+        ]
+    
+    def __str__(self):
+        return f"{self.learning_path.title} - {self.tag.name}"
+
+
 class Lesson(models.Model):
     """
     Lições dentro de um caminho de aprendizado
@@ -438,7 +587,188 @@ class Achievement(models.Model):
     def __str__(self):
         return self.name
     
+    def clean(self):
+        from apps.progress.achievements import compile_requirements
+        try:
+            compile_requirements(self.requirements)
+        except ValidationError as exc:
+            raise ValidationError({'requirements': exc.messages})
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class PathCoEnrollment(models.Model):
+    """
+    Matriz de co-inscrição entre caminhos: quantos usuários se inscreveram nos
+    dois. Guardada nos dois sentidos e mantida por apps.learning.similarity
+    """
+    learning_path = models.ForeignKey(
+        LearningPath,
+        on_delete=models.CASCADE,
+        related_name='co_enrollments',
+        verbose_name='Caminho de aprendizado'
+    )
+    other_path = models.ForeignKey(
+        LearningPath,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Outro caminho'
+    )
+    count = models.PositiveIntegerField(default=0, verbose_name='Usuários em comum')
+    
+    class Meta:
+        verbose_name = 'Co-inscrição'
+        verbose_name_plural = 'Co-inscrições'
+        db_table = 'path_co_enrollments'
+        unique_together = ['learning_path', 'other_path']
+    
+    def __str__(self):
+        return f"{self.learning_path_id} x {self.other_path_id}: {self.count}"
+
+
+class PathEnrollmentCount(models.Model):
+    """
+    Inscrições contadas em cada caminho (a diagonal da matriz de
+    co-inscrição), usadas na normalização da similaridade
+    """
+    learning_path = models.OneToOneField(
+        LearningPath,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='enrollment_count',
+        verbose_name='Caminho de aprendizado'
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name='Inscrições')
+    
+    class Meta:
+        verbose_name = 'Inscrições do Caminho'
+        verbose_name_plural = 'Inscrições dos Caminhos'
+        db_table = 'path_enrollment_counts'
+    
+    def __str__(self):
+        return f"{self.learning_path_id}: {self.total}"
+
+
+class CountedEnrollment(models.Model):
+    """
+    Inscrições (LearningPathProgress) já somadas à matriz de co-inscrição.
+    O usuário não tem restrição de chave estrangeira para que a linha
+    sobreviva à exclusão do usuário: inscrições excluídas são marcadas como
+    removidas e descontadas na execução seguinte
+    """
+    progress_id = models.UUIDField(primary_key=True, verbose_name='Inscrição')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        verbose_name='Usuário'
+    )
+    learning_path = models.ForeignKey(
+        LearningPath,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Caminho de aprendizado'
+    )
+    removed = models.BooleanField(default=False, verbose_name='Removida')
+    
+    class Meta:
+        verbose_name = 'Inscrição Contada'
+        verbose_name_plural = 'Inscrições Contadas'
+        db_table = 'path_counted_enrollments'
+        indexes = [
+            models.Index(fields=['user']),
+            models.Index(fields=['removed']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} -> {self.learning_path_id}"
+
+
+class PathSimilarity(models.Model):
+    """
+    Vizinhos mais próximos (top-K) de cada caminho por co-inscrição, usados
+    nas recomendações "similares aos concluídos"
+    """
+    learning_path = models.ForeignKey(
+        LearningPath,
+        on_delete=models.CASCADE,
+        related_name='similar_paths',
+        verbose_name='Caminho de aprendizado'
+    )
+    similar_path = models.ForeignKey(
+        LearningPath,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Caminho similar'
+    )
+    score = models.FloatField(verbose_name='Similaridade')
+    co_enrollments = models.PositiveIntegerField(default=0, verbose_name='Usuários em comum')
+    rank = models.PositiveSmallIntegerField(verbose_name='Posição')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Caminho Similar'
+        verbose_name_plural = 'Caminhos Similares'
+        db_table = 'path_similarities'
+        unique_together = ['learning_path', 'similar_path']
+        indexes = [
+            models.Index(fields=['learning_path', 'rank']),
+            models.Index(fields=['similar_path', 'learning_path']),
+        ]
+    
+    def __str__(self):
+        return f"{self.learning_path_id} -> {self.similar_path_id} ({self.score:.3f})"
+
+
+class PathSimilarityRun(models.Model):
+    """
+    Execuções do cálculo de similaridade; a marca d'água da última execução
+    define a partir de quais inscrições a próxima continua
+    """
+    watermark = models.DateTimeField(null=True, blank=True, verbose_name="Marca d'água")
+    full_rebuild = models.BooleanField(default=False, verbose_name='Recálculo completo')
+    new_enrollments = models.PositiveIntegerField(default=0, verbose_name='Inscrições processadas')
+    updated_paths = models.PositiveIntegerField(default=0, verbose_name='Caminhos atualizados')
+    finished_at = models.DateTimeField(auto_now_add=True, verbose_name='Concluído em')
+    
+    class Meta:
+        verbose_name = 'Cálculo de Similaridade'
+        verbose_name_plural = 'Cálculos de Similaridade'
+        db_table = 'path_similarity_runs'
+        ordering = ['-finished_at']
+    
+    def __str__(self):
+        return f"{self.finished_at} ({self.new_enrollments} inscrições)"
+
+
+class PathPopularity(models.Model):
+    """
+    Pontuações de popularidade e tendência de cada caminho, com decaimento
+    temporal. Recalculadas periodicamente por apps.learning.popularity
+    """
+    learning_path = models.OneToOneField(
+        LearningPath,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity_stats',
+        verbose_name='Caminho de aprendizado'
+    )
+    popularity = models.FloatField(default=0, verbose_name='Popularidade')
+    trending = models.FloatField(default=0, verbose_name='Tendência')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Popularidade do Caminho'
+        verbose_name_plural = 'Popularidade dos Caminhos'
+        db_table = 'path_popularity'
+        indexes = [
+            models.Index(fields=['-popularity']),
+            models.Index(fields=['-trending']),
+        ]
+    
+    def __str__(self):
+        return f"{self.learning_path_id}: {self.popularity:.2f} / {self.trending:.2f}"
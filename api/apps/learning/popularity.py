@@ -0,0 +1,137 @@
+"""
+Pontuações de popularidade e tendência dos caminhos de aprendizado.
+
+O job periódico (refresh_path_popularity) agrega por caminho e por dia as
+inscrições e conclusões de caminhos (LearningPathProgress) e as conclusões de
+lições (LessonProgress) dos últimos POPULARITY_HORIZON_DAYS dias, e aplica
+decaimento exponencial pela idade de cada dia:
+
+    pontuação = soma(peso do evento * quantidade * 0,5 ** (idade / meia-vida))
+
+A popularidade usa uma meia-vida longa e a tendência uma curta. Os rankings
+da página inicial são lidos de PathPopularity e guardados em cache pela
+versão da popularidade (incrementada a cada recálculo) e do catálogo.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache import get_catalog_version
+from .models import LearningPath, PathPopularity
+
+START_WEIGHT = 1.0
+COMPLETION_WEIGHT = 3.0
+LESSON_COMPLETION_WEIGHT = 0.5
+
+POPULARITY_HALF_LIFE_DAYS = 30
+TRENDING_HALF_LIFE_DAYS = 3
+POPULARITY_HORIZON_DAYS = 180
+
+# Caminhos em cada lista da página inicial
+RANKING_LIMIT = 6
+
+POPULARITY_VERSION_KEY = 'popularity:version'
+
+
+def get_popularity_version():
+    version = cache.get(POPULARITY_VERSION_KEY)
+    if version is None:
+        cache.add(POPULARITY_VERSION_KEY, 1, timeout=None)
+        version = cache.get(POPULARITY_VERSION_KEY, 1)
+    return version
+
+
+def bump_popularity_version():
+    try:
+        return cache.incr(POPULARITY_VERSION_KEY)
+    except ValueError:
+        cache.add(POPULARITY_VERSION_KEY, 1, timeout=None)
+        return cache.incr(POPULARITY_VERSION_KEY)
+
+
+def _daily_counts(queryset, path_field, date_field, since):
+    """Eventos por (caminho, dia) a partir de `since`"""
+    return queryset.filter(**{f'{date_field}__gte': since}).annotate(
+        day=TruncDate(date_field)
+    ).values(path_field, 'day').annotate(
+        total=Count('pk')
+    ).values_list(path_field, 'day', 'total').order_by()
+
+
+def refresh_path_popularity(now=None):
+    """
+    Recalcula as pontuações de todos os caminhos com atividade no horizonte,
+    com três consultas agrupadas. Retorna a quantidade de caminhos pontuados.
+    """
+    from apps.progress.models import LearningPathProgress, LessonProgress
+
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    since = now - timedelta(days=POPULARITY_HORIZON_DAYS)
+
+    sources = (
+        (LearningPathProgress.objects.all(), 'learning_path', 'created_at', START_WEIGHT),
+        (
+            LearningPathProgress.objects.filter(status='completed'),
+            'learning_path', 'completed_at', COMPLETION_WEIGHT
+        ),
+        (
+            LessonProgress.objects.filter(status='completed'),
+            'lesson__learning_path', 'completed_at', LESSON_COMPLETION_WEIGHT
+        ),
+    )
+    scores = defaultdict(lambda: [0.0, 0.0])
+    for queryset, path_field, date_field, weight in sources:
+        for path_id, day, total in _daily_counts(queryset, path_field, date_field, since):
+            age = max((today - day).days, 0)
+            entry = scores[path_id]
+            entry[0] += weight * total * 0.5 ** (age / POPULARITY_HALF_LIFE_DAYS)
+            entry[1] += weight * total * 0.5 ** (age / TRENDING_HALF_LIFE_DAYS)
+
+    with transaction.atomic():
+        PathPopularity.objects.all().delete()
+        PathPopularity.objects.bulk_create([
+            PathPopularity(learning_path_id=path_id, popularity=popularity, trending=trending)
+            for path_id, (popularity, trending) in scores.items()
+        ], batch_size=1000)
+    bump_popularity_version()
+    return len(scores)
+
+
+def get_popularity_rankings():
+    """
+    Ids dos caminhos em destaque (ordenados pela popularidade), em tendência e
+    populares: {'featured': [...], 'trending': [...], 'popular': [...]}
+    """
+    key = (
+        f'popularity:v{get_popularity_version()}:'
+        f'catalog:v{get_catalog_version()}:rankings'
+    )
+    rankings = cache.get(key)
+    if rankings is None:
+        scored = PathPopularity.objects.filter(learning_path__is_published=True)
+        rankings = {
+            'featured': list(
+                LearningPath.objects.filter(is_published=True, is_featured=True).order_by(
+                    F('popularity_stats__popularity').desc(nulls_last=True), 'order', 'title'
+                ).values_list('pk', flat=True)[:RANKING_LIMIT]
+            ),
+            'trending': list(
+                scored.filter(trending__gt=0).order_by('-trending').values_list(
+                    'learning_path_id', flat=True
+                )[:RANKING_LIMIT]
+            ),
+            'popular': list(
+                scored.filter(popularity__gt=0).order_by('-popularity').values_list(
+                    'learning_path_id', flat=True
+                )[:RANKING_LIMIT]
+            ),
+        }
+        cache.set(key, rankings, settings.CATALOG_CACHE_TIMEOUT)
+    return rankings
@@ -0,0 +1,241 @@
+"""
+Recomendações de caminhos de aprendizado.
+
+Os caminhos candidatos (publicados e ainda não iniciados pelo usuário, por
+anti-join) são pontuados pelo banco em uma única consulta, somando:
+
+- afinidade de categoria: fração dos caminhos concluídos em cada categoria;
+- faixa etária: igual à do usuário ou vizinha;
+- progressão de dificuldade: o nível seguinte ao maior já concluído;
+- popularidade: inscrições no caminho, saturadas em POPULARITY_CAP;
+- similaridade: soma das similaridades por co-inscrição (PathSimilarity,
+  apps.learning.similarity) com os caminhos concluídos.
+
+O resultado é guardado por usuário, com chave ligada à versão do catálogo e
+ao token de progresso do usuário (apps.progress.tokens). O cache não depende
+do host da requisição: as capas ficam como caminhos relativos e as URLs
+absolutas são montadas a cada resposta.
+"""
+from collections import Counter
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case, Count, Exists, F, FloatField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Least
+
+from .cache import get_catalog_version
+from .models import LearningPath, PathSimilarity
+
+AFFINITY_WEIGHT = 3.0
+AGE_WEIGHT = 2.0
+DIFFICULTY_WEIGHT = 1.5
+POPULARITY_WEIGHT = 1.0
+SIMILARITY_WEIGHT = 3.0
+
+# Inscrições a partir das quais o caminho recebe a pontuação máxima de popularidade
+POPULARITY_CAP = 100
+
+# Candidatos pontuados por cálculo; as listas da resposta são recortes deles
+CANDIDATES_LIMIT = 30
+SECTION_LIMIT = 3
+
+AGE_GROUP_ORDER = [code for code, _ in LearningPath.AGE_GROUPS]
+DIFFICULTY_ORDER = [code for code, _ in LearningPath.DIFFICULTY_LEVELS]
+
+
+def age_group_for(birth_date, today=None):
+    """Faixa etária de LearningPath correspondente à data de nascimento"""
+    if not birth_date:
+        return None
+    age = ((today or date.today()) - birth_date).days // 365
+    if age <= 5:
+        return '3-5'
+    elif age <= 8:
+        return '6-8'
+    elif age <= 11:
+        return '9-11'
+    return '12-14'
+
+
+def _neighbours(order, value):
+    position = order.index(value)
+    return [order[i] for i in (position - 1, position + 1) if 0 <= i < len(order)]
+
+
+def _target_difficulty(completed_levels):
+    """Nível seguinte ao maior nível concluído (iniciante sem conclusões)"""
+    if not completed_levels:
+        return DIFFICULTY_ORDER[0]
+    highest = max(DIFFICULTY_ORDER.index(level) for level in completed_levels)
+    return DIFFICULTY_ORDER[min(highest + 1, len(DIFFICULTY_ORDER) - 1)]
+
+
+def score_candidates(user, progress_rows, age_group, limit=CANDIDATES_LIMIT):
+    """
+    Caminhos não iniciados pelo usuário, ordenados pela pontuação, com os
+    componentes anotados (affinity, age_fit, difficulty_fit, popularity,
+    similarity, score)
+    """
+    from apps.progress.models import LearningPathProgress
+
+    completed = [row for row in progress_rows if row.status == 'completed']
+    categories = Counter(row.learning_path.category_id for row in completed)
+    difficulty = _target_difficulty({row.learning_path.difficulty_level for row in completed})
+
+    affinity = Case(
+        *[
+            When(category_id=category_id, then=Value(total / len(completed)))
+            for category_id, total in categories.items()
+        ],
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+    if age_group:
+        age_fit = Case(
+            When(age_group=age_group, then=Value(1.0)),
+            When(age_group__in=_neighbours(AGE_GROUP_ORDER, age_group), then=Value(0.3)),
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    else:
+        age_fit = Value(0.0, output_field=FloatField())
+    difficulty_fit = Case(
+        When(difficulty_level=difficulty, then=Value(1.0)),
+        When(difficulty_level__in=_neighbours(DIFFICULTY_ORDER, difficulty), then=Value(0.3)),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+    enrollments = LearningPathProgress.objects.filter(
+        learning_path=OuterRef('pk')
+    ).order_by().values('learning_path').annotate(total=Count('pk')).values('total')
+    if completed:
+        similarity = Coalesce(
+            Subquery(
+                PathSimilarity.objects.filter(
+                    similar_path=OuterRef('pk'),
+                    learning_path_id__in=[row.learning_path_id for row in completed]
+                ).order_by().values('similar_path').annotate(
+                    total=Sum('score')
+                ).values('total'),
+                output_field=FloatField()
+            ),
+            Value(0.0)
+        )
+    else:
+        similarity = Value(0.0, output_field=FloatField())
+
+    return LearningPath.objects.with_stats().filter(
+        is_published=True
+    ).filter(
+        ~Exists(LearningPathProgress.objects.filter(user=user, learning_path=OuterRef('pk')))
+    ).annotate(
+        affinity=affinity,
+        age_fit=age_fit,
+        difficulty_fit=difficulty_fit,
+        popularity=Cast(
+            Least(Coalesce(Subquery(enrollments), 0), Value(POPULARITY_CAP)),
+            FloatField()
+        ) / POPULARITY_CAP,
+        similarity=similarity
+    ).annotate(
+        score=(
+            F('affinity') * AFFINITY_WEIGHT
+            + F('age_fit') * AGE_WEIGHT
+            + F('difficulty_fit') * DIFFICULTY_WEIGHT
+            + F('popularity') * POPULARITY_WEIGHT
+            + F('similarity') * SIMILARITY_WEIGHT
+        )
+    ).select_related('category').order_by('-score', '-is_featured', 'title')[:limit]
+
+
+def build_recommendations(user):
+    """
+    Monta as recomendações com três consultas, sem a requisição (as capas
+    saem como caminhos relativos)
+    """
+    from apps.progress.models import LearningPathProgress
+    from .serializers import LearningPathListSerializer
+
+    age_group = age_group_for(getattr(user, 'birth_date', None))
+
+    progress_rows = list(
+        LearningPathProgress.objects.filter(user=user).select_related('learning_path')
+    )
+    candidates = list(score_candidates(user, progress_rows, age_group))
+
+    in_progress = [row for row in progress_rows if row.status == 'in_progress'][:SECTION_LIMIT]
+    in_progress_paths = {
+        path.pk: path
+        for path in LearningPath.objects.with_stats().filter(
+            pk__in=[row.learning_path_id for row in in_progress]
+        ).select_related('category')
+    }
+
+    # O progresso já carregado dispensa a consulta em lote do serializer
+    context = {
+        'path_progress': {row.learning_path_id: row for row in progress_rows},
+        'all_path_progress': True,
+    }
+
+    def serialize(paths):
+        return LearningPathListSerializer(paths, many=True, context=context).data
+
+    return {
+        'recommended': serialize(candidates[:SECTION_LIMIT * 2]),
+        'age_based': serialize(
+            [path for path in candidates if path.age_fit == 1.0][:SECTION_LIMIT]
+        ),
+        'in_progress': [{
+            'learning_path': serialize([in_progress_paths[row.learning_path_id]])[0],
+            'progress_percentage': row.progress_percentage
+        } for row in in_progress if row.learning_path_id in in_progress_paths],
+        'similar_to_completed': serialize(_similar_to_completed(candidates)),
+    }
+
+
+def _similar_to_completed(candidates):
+    """Vizinhos por co-inscrição primeiro; completa com afinidade de categoria"""
+    similar = sorted(
+        (path for path in candidates if path.similarity > 0),
+        key=lambda path: -path.similarity
+    )[:SECTION_LIMIT]
+    similar.extend(
+        path for path in candidates if path.affinity > 0 and path not in similar
+    )
+    return similar[:SECTION_LIMIT]
+
+
+def _with_absolute_urls(recommendations, request):
+    """Cópia das recomendações com as capas como URLs absolutas da requisição"""
+    def absolute(path):
+        if path['cover_image']:
+            return dict(path, cover_image=request.build_absolute_uri(path['cover_image']))
+        return path
+
+    return {
+        section: [
+            dict(row, learning_path=absolute(row['learning_path']))
+            if section == 'in_progress' else absolute(row)
+            for row in rows
+        ]
+        for section, rows in recommendations.items()
+    }
+
+
+def get_recommendations(request):
+    """Recomendações do usuário, em cache até o progresso ou o catálogo mudar"""
+    from apps.progress.tokens import get_progress_token
+
+    user = request.user
+    key = (
+        f'recommendations:{user.pk}:v{get_catalog_version()}:'
+        f'{get_progress_token(user.pk)}:{age_group_for(getattr(user, "birth_date", None))}'
+    )
+    recommendations = cache.get(key)
+    if recommendations is None:
+        recommendations = build_recommendations(user)
+        cache.set(key, recommendations, settings.RECOMMENDATIONS_CACHE_TIMEOUT)
+    return _with_absolute_urls(recommendations, request)
@@ -1,3 +1,4 @@
+from django.db import models
 from rest_framework import serializers
 from .models import (
     Category, LearningPath, Lesson, Quiz, Question, Answer, Achievement
@@ -5,7 +6,7 @@ from .models import (
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    learning_paths_count = serializers.SerializerMethodField()
+    learning_paths_count = serializers.ReadOnlyField(source='published_paths_count')
     
     class Meta:
         model = Category
@@ -13,9 +14,38 @@ class CategorySerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'description', 'icon', 'color',
             'order', 'is_active', 'learning_paths_count'
         ]
+
+
+def get_path_progress_map(user, paths):
+    """
+    Carrega o progresso do usuário para um conjunto de caminhos em uma única consulta
+    """
+    from apps.progress.models import LearningPathProgress
+    path_ids = [path.pk for path in paths]
+    if not path_ids:
+        return {}
+    progress_rows = LearningPathProgress.objects.filter(
+        user=user,
+        learning_path_id__in=path_ids
+    )
+    return {progress.learning_path_id: progress for progress in progress_rows}
+
+
+class BatchedLearningPathListSerializer(serializers.ListSerializer):
+    """
+    Serializa uma página de caminhos carregando o progresso do usuário em lote
+    """
     
-    def get_learning_paths_count(self, obj):
-        return obj.learning_paths.filter(is_published=True).count()
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        paths = list(iterable)
+        
+        request = self.context.get('request')
+        # `all_path_progress` indica que o contexto já traz todo o progresso do usuário
+        if request and request.user.is_authenticated and not self.context.get('all_path_progress'):
+            self.context['path_progress'] = get_path_progress_map(request.user, paths)
+        
+        return super().to_representation(paths)
 
 
 class LearningPathListSerializer(serializers.ModelSerializer):
@@ -31,34 +61,35 @@ class LearningPathListSerializer(serializers.ModelSerializer):
             'cover_image', 'is_featured', 'total_lessons', 'progress_info',
             'created_at'
         ]
+        list_serializer_class = BatchedLearningPathListSerializer
     
     def get_progress_info(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            from apps.progress.models import LearningPathProgress
-            try:
-                progress = LearningPathProgress.objects.get(
-                    user=request.user,
-                    learning_path=obj
-                )
-                return {
-                    'status': progress.status,
-                    'progress_percentage': progress.progress_percentage,
-                    'current_lesson_id': progress.current_lesson.id if progress.current_lesson else None,
-                    'started_at': progress.started_at,
-                    'completed_at': progress.completed_at,
-                    'favorite': progress.favorite
-                }
-            except LearningPathProgress.DoesNotExist:
-                return {
-                    'status': 'not_started',
-                    'progress_percentage': 0,
-                    'current_lesson_id': None,
-                    'started_at': None,
-                    'completed_at': None,
-                    'favorite': False
-                }
-        return None
+        # Um `path_progress` no contexto dispensa a requisição (dados em cache)
+        progress_map = self.context.get('path_progress')
+        if progress_map is None:
+            request = self.context.get('request')
+            if not (request and request.user.is_authenticated):
+                return None
+            progress_map = get_path_progress_map(request.user, [obj])
+        
+        progress = progress_map.get(obj.pk)
+        if progress is not None:
+            return {
+                'status': progress.status,
+                'progress_percentage': progress.progress_percentage,
+                'current_lesson_id': progress.current_lesson_id,
+                'started_at': progress.started_at,
+                'completed_at': progress.completed_at,
+                'favorite': progress.favorite
+            }
+        return {
+            'status': 'not_started',
+            'progress_percentage': 0,
+            'current_lesson_id': None,
+            'started_at': None,
+            'completed_at': None,
+            'favorite': False
+        }
 
 
 class LearningPathDetailSerializer(serializers.ModelSerializer):
@@ -78,13 +109,17 @@ class LearningPathDetailSerializer(serializers.ModelSerializer):
         ]
     
     def get_lessons(self, obj):
-        lessons = obj.lessons.filter(is_published=True).order_by('order')
+        # Prefere o prefetch de LearningPath.objects.with_published_lessons()
+        lessons = getattr(obj, 'published_lessons', None)
+        if lessons is None:
+            lessons = obj.lessons.filter(is_published=True).order_by('order')
         return LessonListSerializer(lessons, many=True, context=self.context).data
     
     def get_progress_info(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             from apps.progress.models import LearningPathProgress
+            pending_minutes = get_pending_minutes_for(self.context)['paths'].get(str(obj.pk), 0)
             try:
                 progress = LearningPathProgress.objects.get(
                     user=request.user,
@@ -93,8 +128,8 @@ class LearningPathDetailSerializer(serializers.ModelSerializer):
                 return {
                     'status': progress.status,
                     'progress_percentage': progress.progress_percentage,
-                    'current_lesson_id': progress.current_lesson.id if progress.current_lesson else None,
-                    'total_time_spent_minutes': progress.total_time_spent_minutes,
+                    'current_lesson_id': progress.current_lesson_id,
+                    'total_time_spent_minutes': progress.total_time_spent_minutes + pending_minutes,
                     'started_at': progress.started_at,
                     'completed_at': progress.completed_at,
                     'favorite': progress.favorite
@@ -104,7 +139,7 @@ class LearningPathDetailSerializer(serializers.ModelSerializer):
                     'status': 'not_started',
                     'progress_percentage': 0,
                     'current_lesson_id': None,
-                    'total_time_spent_minutes': 0,
+                    'total_time_spent_minutes': pending_minutes,
                     'started_at': None,
                     'completed_at': None,
                     'favorite': False
@@ -112,6 +147,48 @@ class LearningPathDetailSerializer(serializers.ModelSerializer):
         return None
 
 
+def get_pending_minutes_for(context):
+    """
+    Minutos de estudo do usuário ainda no buffer write-behind, carregados uma
+    vez por requisição e somados aos valores do banco
+    """
+    if 'pending_minutes' not in context:
+        from apps.progress.time_tracking import get_pending_minutes
+        context['pending_minutes'] = get_pending_minutes(context['request'].user.pk)
+    return context['pending_minutes']
+
+
+def get_lesson_progress_map(user, lessons):
+    """
+    Carrega o progresso do usuário para um conjunto de lições em uma única consulta
+    """
+    from apps.progress.models import LessonProgress
+    lesson_ids = [lesson.pk for lesson in lessons]
+    if not lesson_ids:
+        return {}
+    progress_rows = LessonProgress.objects.filter(
+        user=user,
+        lesson_id__in=lesson_ids
+    )
+    return {progress.lesson_id: progress for progress in progress_rows}
+
+
+class BatchedLessonListSerializer(serializers.ListSerializer):
+    """
+    Serializa uma lista de lições carregando o progresso do usuário em lote
+    """
+    
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        lessons = list(iterable)
+        
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            self.context['lesson_progress'] = get_lesson_progress_map(request.user, lessons)
+        
+        return super().to_representation(lessons)
+
+
 class LessonListSerializer(serializers.ModelSerializer):
     progress_info = serializers.SerializerMethodField()
     has_quiz = serializers.SerializerMethodField()
@@ -123,34 +200,39 @@ class LessonListSerializer(serializers.ModelSerializer):
             'order', 'estimated_duration_minutes', 'thumbnail',
             'is_free', 'progress_info', 'has_quiz'
         ]
+        list_serializer_class = BatchedLessonListSerializer
     
     def get_progress_info(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            from apps.progress.models import LessonProgress
-            try:
-                progress = LessonProgress.objects.get(
-                    user=request.user,
-                    lesson=obj
-                )
+            progress_map = self.context.get('lesson_progress')
+            if progress_map is None:
+                progress_map = get_lesson_progress_map(request.user, [obj])
+            pending_minutes = get_pending_minutes_for(self.context)['lessons'].get(str(obj.pk), 0)
+            
+            progress = progress_map.get(obj.pk)
+            if progress is not None:
                 return {
                     'status': progress.status,
                     'progress_percentage': progress.progress_percentage,
                     'score': progress.score,
-                    'time_spent_minutes': progress.time_spent_minutes,
+                    'time_spent_minutes': progress.time_spent_minutes + pending_minutes,
                     'completed_at': progress.completed_at
                 }
-            except LessonProgress.DoesNotExist:
-                return {
-                    'status': 'not_started',
-                    'progress_percentage': 0,
-                    'score': None,
-                    'time_spent_minutes': 0,
-                    'completed_at': None
-                }
+            return {
+                'status': 'not_started',
+                'progress_percentage': 0,
+                'score': None,
+                'time_spent_minutes': pending_minutes,
+                'completed_at': None
+            }
         return None
     
     def get_has_quiz(self, obj):
+        # Prefere a anotação Exists de LearningPath.objects.with_published_lessons()
+        annotated = getattr(obj, 'quiz_exists', None)
+        if annotated is not None:
+            return annotated
         return hasattr(obj, 'quiz')
 
 
@@ -176,6 +258,7 @@ class LessonDetailSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             from apps.progress.models import LessonProgress
+            pending_minutes = get_pending_minutes_for(self.context)['lessons'].get(str(obj.pk), 0)
             try:
                 progress = LessonProgress.objects.get(
                     user=request.user,
@@ -185,7 +268,7 @@ class LessonDetailSerializer(serializers.ModelSerializer):
                     'status': progress.status,
                     'progress_percentage': progress.progress_percentage,
                     'score': progress.score,
-                    'time_spent_minutes': progress.time_spent_minutes,
+                    'time_spent_minutes': progress.time_spent_minutes + pending_minutes,
                     'notes': progress.notes,
                     'started_at': progress.started_at,
                     'completed_at': progress.completed_at
@@ -195,7 +278,7 @@ class LessonDetailSerializer(serializers.ModelSerializer):
                     'status': 'not_started',
                     'progress_percentage': 0,
                     'score': None,
-                    'time_spent_minutes': 0,
+                    'time_spent_minutes': pending_minutes,
                     'notes': '',
                     'started_at': None,
                     'completed_at': None
@@ -208,34 +291,17 @@ class LessonDetailSerializer(serializers.ModelSerializer):
         return None
     
     def get_next_lesson(self, obj):
-        next_lesson = Lesson.objects.filter(
-            learning_path=obj.learning_path,
-            order__gt=obj.order,
-            is_published=True
-        ).order_by('order').first()
-        
-        if next_lesson:
-            return {
-                'id': next_lesson.id,
-                'title': next_lesson.title,
-                'slug': next_lesson.slug
-            }
-        return None
+        return self._get_neighbours(obj)[1]
     
     def get_previous_lesson(self, obj):
-        previous_lesson = Lesson.objects.filter(
-            learning_path=obj.learning_path,
-            order__lt=obj.order,
-            is_published=True
-        ).order_by('-order').first()
-        
-        if previous_lesson:
-            return {
-                'id': previous_lesson.id,
-                'title': previous_lesson.title,
-                'slug': previous_lesson.slug
-            }
-        return None
+        return self._get_neighbours(obj)[0]
+    
+    def _get_neighbours(self, obj):
+        # Vizinhos vêm da sequência de lições do caminho, em cache por versão do catálogo
+        if not hasattr(obj, '_neighbours'):
+            from .cache import get_lesson_neighbours
+            obj._neighbours = get_lesson_neighbours(obj)
+        return obj._neighbours
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -256,8 +322,8 @@ class QuestionSerializer(serializers.ModelSerializer):
 
 
 class QuizSerializer(serializers.ModelSerializer):
-    questions = QuestionSerializer(many=True, read_only=True)
-    total_questions = serializers.ReadOnlyField()
+    questions = serializers.SerializerMethodField()
+    total_questions = serializers.SerializerMethodField()
     user_attempts = serializers.SerializerMethodField()
     
     class Meta:
@@ -269,25 +335,66 @@ class QuizSerializer(serializers.ModelSerializer):
             'user_attempts'
         ]
     
+    def get_questions(self, obj):
+        from .cache import get_compiled_questions, shuffle_questions
+        questions = get_compiled_questions(obj)
+        
+        if obj.randomize_questions:
+            # A ordem é fixa dentro de uma tentativa e muda na tentativa seguinte
+            questions = shuffle_questions(questions, self._get_shuffle_seed(obj))
+        
+        request = self.context.get('request')
+        if request is not None:
+            questions = [
+                dict(question, image=request.build_absolute_uri(question['image']))
+                if question['image'] else question
+                for question in questions
+            ]
+        return questions
+    
+    def get_total_questions(self, obj):
+        from .cache import get_compiled_questions
+        return len(get_compiled_questions(obj))
+    
     def get_user_attempts(self, obj):
+        return [{
+            'id': attempt.id,
+            'attempt_number': attempt.attempt_number,
+            'status': attempt.status,
+            'score': attempt.score,
+            'passed': attempt.passed,
+            'started_at': attempt.started_at,
+            'completed_at': attempt.completed_at
+        } for attempt in self._get_recent_attempts(obj)]
+    
+    def _get_recent_attempts(self, obj):
+        # Últimas 5 tentativas, carregadas uma vez e reaproveitadas na semente
+        if not hasattr(obj, '_recent_attempts'):
+            obj._recent_attempts = []
+            request = self.context.get('request')
+            if request and request.user.is_authenticated:
+                from apps.progress.models import QuizAttempt
+                obj._recent_attempts = list(
+                    QuizAttempt.objects.filter(
+                        user=request.user,
+                        quiz=obj
+                    ).order_by('-attempt_number')[:5]
+                )
+        return obj._recent_attempts
+    
+    def _get_shuffle_seed(self, obj):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            from apps.progress.models import QuizAttempt
-            attempts = QuizAttempt.objects.filter(
-                user=request.user,
-                quiz=obj
-            ).order_by('-attempt_number')[:5]  # Últimas 5 tentativas
-            
-            return [{
-                'id': attempt.id,
-                'attempt_number': attempt.attempt_number,
-                'status': attempt.status,
-                'score': attempt.score,
-                'passed': attempt.passed,
-                'started_at': attempt.started_at,
-                'completed_at': attempt.completed_at
-            } for attempt in attempts]
-        return []
+        if not (request and request.user.is_authenticated):
+            return str(obj.pk)
+        
+        attempts = self._get_recent_attempts(obj)
+        attempt_number = 1
+        if attempts:
+            latest = attempts[0]
+            attempt_number = latest.attempt_number
+            if latest.status != 'started':
+                attempt_number += 1
+        return f'{obj.pk}:{request.user.pk}:{attempt_number}'
 
 
 class AchievementSerializer(serializers.ModelSerializer):
@@ -304,21 +411,22 @@ class AchievementSerializer(serializers.ModelSerializer):
     def get_earned_info(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            from apps.progress.models import UserAchievement
-            try:
-                user_achievement = UserAchievement.objects.get(
-                    user=request.user,
-                    achievement=obj
-                )
+            from .cache import get_earned_achievements
+            if 'earned_achievements' not in self.context:
+                self.context['earned_achievements'] = get_earned_achievements(request.user.pk)
+            earned = self.context['earned_achievements']
+            
+            achievement_id = obj['id'] if isinstance(obj, dict) else obj.pk
+            if achievement_id in earned:
+                earned_at, progress_data = earned[achievement_id]
                 return {
                     'earned': True,
-                    'earned_at': user_achievement.earned_at,
-                    'progress_data': user_achievement.progress_data
-                }
-            except UserAchievement.DoesNotExist:
-                return {
-                    'earned': False,
-                    'earned_at': None,
-                    'progress_data': {}
+                    'earned_at': earned_at,
+                    'progress_data': progress_data
                 }
+            return {
+                'earned': False,
+                'earned_at': None,
+                'progress_data': {}
+            }
         return None
\ No newline at end of file
@@ -0,0 +1,138 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .cache import bump_catalog_version, bump_quiz_version
+from .models import (
+    Achievement, Answer, Category, CountedEnrollment, LearningPath, Lesson, Question, Quiz, Tag
+)
+from .suggestions import KIND_CATEGORY, suggestion_index
+
+
+@receiver(pre_save, sender=LearningPath)
+def remember_previous_category(sender, instance, **kwargs):
+    """Guarda categoria, status e tags anteriores para detectar mudanças"""
+    instance._previous_state = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_state = LearningPath.objects.filter(
+            pk=instance.pk
+        ).values('category_id', 'is_published', 'tags').first()
+
+
+@receiver(post_save, sender=LearningPath)
+def update_category_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    """Atualiza o contador de caminhos publicados quando um caminho é salvo"""
+    if raw:
+        return
+    
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None:
+        if instance.is_published:
+            Category.refresh_published_paths_count([instance.category_id])
+        return
+    
+    if (
+        previous['category_id'] != instance.category_id
+        or previous['is_published'] != instance.is_published
+    ):
+        Category.refresh_published_paths_count(
+            {previous['category_id'], instance.category_id}
+        )
+
+
+@receiver(post_save, sender=LearningPath)
+def sync_learning_path_tags(sender, instance, created, raw=False, **kwargs):
+    """Mantém a tabela de tags normalizadas em sincronia com o campo `tags`"""
+    if raw:
+        return
+    
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None or previous['tags'] != instance.tags:
+        Tag.sync_for(instance)
+
+
+@receiver(post_delete, sender=LearningPath)
+def update_category_counter_on_delete(sender, instance, **kwargs):
+    """Atualiza o contador de caminhos publicados quando um caminho é removido"""
+    if instance.is_published:
+        Category.refresh_published_paths_count([instance.category_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=LearningPath)
+@receiver(post_delete, sender=LearningPath)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Invalida o cache público do catálogo em qualquer alteração de conteúdo"""
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_quiz_payload_on_question(sender, instance, **kwargs):
+    bump_quiz_version(instance.quiz_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_quiz_payload_on_answer(sender, instance, **kwargs):
+    quiz_id = Question.objects.filter(pk=instance.question_id).values_list(
+        'quiz_id', flat=True
+    ).first()
+    if quiz_id is not None:
+        bump_quiz_version(quiz_id)
+
+
+@receiver(post_save, sender=LearningPath)
+def update_suggestion_index_for_path(sender, instance, raw=False, **kwargs):
+    """
+    Atualiza o índice de sugestões de busca deste processo depois do commit,
+    para que um rollback não deixe no índice dados que nunca existiram
+    """
+    if raw:
+        return
+    if instance.is_published:
+        transaction.on_commit(partial(
+            suggestion_index.upsert_path, instance.pk, instance.title, Tag.parse(instance.tags)
+        ))
+    else:
+        transaction.on_commit(partial(suggestion_index.remove_path, instance.pk))
+
+
+@receiver(post_delete, sender=LearningPath)
+def remove_path_from_suggestion_index(sender, instance, **kwargs):
+    transaction.on_commit(partial(suggestion_index.remove_path, instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def update_suggestion_index_for_category(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.is_active:
+        transaction.on_commit(partial(
+            suggestion_index.upsert, KIND_CATEGORY, instance.pk, instance.name
+        ))
+    else:
+        transaction.on_commit(partial(suggestion_index.remove, KIND_CATEGORY, instance.pk))
+
+
+@receiver(post_delete, sender=Category)
+def remove_category_from_suggestion_index(sender, instance, **kwargs):
+    transaction.on_commit(partial(suggestion_index.remove, KIND_CATEGORY, instance.pk))
+
+
+@receiver(post_delete, sender='progress.LearningPathProgress')
+def discount_deleted_enrollment(sender, instance, **kwargs):
+    """Marca a inscrição para ser descontada da matriz de co-inscrição"""
+    CountedEnrollment.objects.filter(progress_id=instance.pk).update(removed=True)
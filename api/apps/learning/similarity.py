@@ -0,0 +1,256 @@
+"""
+Índice de similaridade item-item por co-inscrição.
+
+A matriz de co-inscrição (PathCoEnrollment) é esparsa: só existem os pares de
+caminhos com usuários em comum. A diagonal, as inscrições de cada caminho,
+fica em PathEnrollmentCount. As duas são mantidas incrementalmente a partir
+do registro das inscrições já contadas (CountedEnrollment):
+
+- inscrições novas são as que ainda não estão no registro, procuradas a
+  partir da marca d'água da execução anterior menos uma margem
+  (WATERMARK_OVERLAP) para as transações confirmadas com atraso; cada uma é
+  pareada com as inscrições já contadas do mesmo usuário;
+- inscrições excluídas são marcadas no registro pelo signal de post_delete e
+  descontadas da matriz na execução seguinte.
+
+Assim cada par de inscrições é somado (e descontado) uma única vez, sem reler
+todo o histórico.
+
+A similaridade é o cosseno entre os vetores de usuários de cada caminho,
+co / sqrt(n_a * n_b), e apenas os top-K vizinhos de cada caminho ficam em
+PathSimilarity. Nas execuções incrementais são recalculados os vizinhos dos
+caminhos com inscrições ou pares alterados; a normalização dos demais, e as
+inscrições confirmadas depois da margem, são corrigidas no recálculo
+completo (--full, agendado diariamente pela task rebuild_path_similarity).
+"""
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .models import (
+    CountedEnrollment, PathCoEnrollment, PathEnrollmentCount, PathSimilarity, PathSimilarityRun
+)
+
+# Pares com menos usuários em comum não são considerados vizinhos
+MIN_CO_ENROLLMENTS = 2
+
+# Inscrições criadas antes da marca d'água podem ser confirmadas depois dela
+WATERMARK_OVERLAP = timedelta(minutes=30)
+
+BATCH_SIZE = 1000
+
+
+def update_similarity_index(full=False, top_k=None):
+    """
+    Atualiza a matriz de co-inscrição e os vizinhos dos caminhos afetados.
+    Retorna a execução registrada (PathSimilarityRun).
+    """
+    from apps.progress.models import LearningPathProgress
+
+    top_k = top_k or settings.PATH_SIMILARITY_TOP_K
+    last_run = PathSimilarityRun.objects.filter(watermark__isnull=False).first()
+    since = None if full or last_run is None else last_run.watermark
+
+    with transaction.atomic():
+        counted = defaultdict(list)
+        new_enrollments = LearningPathProgress.objects.all()
+        if since is None:
+            CountedEnrollment.objects.all().delete()
+            PathCoEnrollment.objects.all().delete()
+            PathEnrollmentCount.objects.all().delete()
+            PathSimilarity.objects.all().delete()
+        else:
+            new_enrollments = new_enrollments.filter(
+                created_at__gt=since - WATERMARK_OVERLAP
+            ).filter(
+                ~Exists(CountedEnrollment.objects.filter(progress_id=OuterRef('pk')))
+            )
+            # Inscrições já contadas dos usuários com inscrições novas ou excluídas
+            for user_id, progress_id, path_id, removed in CountedEnrollment.objects.filter(
+                Q(user_id__in=new_enrollments.values('user_id'))
+                | Q(user_id__in=CountedEnrollment.objects.filter(removed=True).values('user_id'))
+            ).values_list('user_id', 'progress_id', 'learning_path_id', 'removed'):
+                counted[user_id].append((progress_id, path_id, removed))
+
+        pairs, totals, watermark, new_count = _count_pairs(
+            new_enrollments.values_list(
+                'user_id', 'pk', 'learning_path_id', 'created_at'
+            ).order_by('user_id', 'created_at', 'pk').iterator(chunk_size=BATCH_SIZE),
+            counted
+        )
+        _apply_pairs(pairs)
+        _apply_totals(totals)
+
+        affected = {path_id for path_id, delta in totals.items() if delta}
+        affected |= {path_id for (path_id, _), delta in pairs.items() if delta}
+        _rebuild_neighbours(affected, top_k)
+
+        if since is not None and (watermark is None or watermark < since):
+            watermark = since
+        return PathSimilarityRun.objects.create(
+            watermark=watermark,
+            full_rebuild=since is None,
+            new_enrollments=new_count,
+            updated_paths=len(affected)
+        )
+
+
+def _count_pairs(rows, counted):
+    """
+    Conta os pares a partir das inscrições novas, ordenadas por usuário, e
+    das já contadas de cada usuário ({usuário: [(inscrição, caminho,
+    removida)]}). As novas entram em CountedEnrollment e as removidas saem.
+    Retorna (Counter {(caminho, outro): variação}, Counter {caminho: variação},
+    maior data de criação lida, quantidade de inscrições novas).
+    """
+    pairs = Counter()
+    totals = Counter()
+    watermark = None
+    new_count = 0
+    removed_ids = []
+    ledger = []
+    for user_id, user_rows in groupby(rows, key=itemgetter(0)):
+        earlier = _discount_removed(counted.pop(user_id, []), pairs, totals, removed_ids)
+        for _, progress_id, path_id, created_at in user_rows:
+            totals[path_id] += 1
+            for other_id in earlier:
+                pairs[(path_id, other_id)] += 1
+                pairs[(other_id, path_id)] += 1
+            earlier.append(path_id)
+            ledger.append(CountedEnrollment(
+                progress_id=progress_id, user_id=user_id, learning_path_id=path_id
+            ))
+            new_count += 1
+            if watermark is None or created_at > watermark:
+                watermark = created_at
+        if len(ledger) >= BATCH_SIZE:
+            CountedEnrollment.objects.bulk_create(ledger)
+            ledger = []
+    CountedEnrollment.objects.bulk_create(ledger)
+
+    # Usuários apenas com inscrições excluídas
+    for rows in counted.values():
+        _discount_removed(rows, pairs, totals, removed_ids)
+    for start in range(0, len(removed_ids), BATCH_SIZE):
+        CountedEnrollment.objects.filter(
+            progress_id__in=removed_ids[start:start + BATCH_SIZE]
+        ).delete()
+    return pairs, totals, watermark, new_count
+
+
+def _discount_removed(rows, pairs, totals, removed_ids):
+    """
+    Desconta as inscrições removidas de um usuário, cada par uma única vez.
+    Retorna os caminhos das inscrições que continuam contadas.
+    """
+    kept = [path_id for _, path_id, removed in rows if not removed]
+    gone = []
+    for progress_id, path_id, removed in rows:
+        if not removed:
+            continue
+        totals[path_id] -= 1
+        for other_id in kept + gone:
+            pairs[(path_id, other_id)] -= 1
+            pairs[(other_id, path_id)] -= 1
+        gone.append(path_id)
+        removed_ids.append(progress_id)
+    return kept
+
+
+def _apply_pairs(pairs):
+    pairs = {pair: delta for pair, delta in pairs.items() if delta}
+    if not pairs:
+        return
+    existing = {
+        (row.learning_path_id, row.other_path_id): row
+        for row in PathCoEnrollment.objects.filter(
+            learning_path_id__in={path_id for path_id, _ in pairs}
+        )
+    }
+    updated = []
+    created = []
+    emptied = []
+    for (path_id, other_id), delta in pairs.items():
+        row = existing.get((path_id, other_id))
+        if row is None:
+            if delta > 0:
+                created.append(PathCoEnrollment(
+                    learning_path_id=path_id, other_path_id=other_id, count=delta
+                ))
+        elif row.count + delta > 0:
+            row.count += delta
+            updated.append(row)
+        else:
+            emptied.append(row.pk)
+    PathCoEnrollment.objects.bulk_update(updated, ['count'], batch_size=BATCH_SIZE)
+    PathCoEnrollment.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    PathCoEnrollment.objects.filter(pk__in=emptied).delete()
+
+
+def _apply_totals(totals):
+    totals = {path_id: delta for path_id, delta in totals.items() if delta}
+    if not totals:
+        return
+    existing = {
+        row.learning_path_id: row
+        for row in PathEnrollmentCount.objects.filter(learning_path_id__in=list(totals))
+    }
+    updated = []
+    created = []
+    emptied = []
+    for path_id, delta in totals.items():
+        row = existing.get(path_id)
+        if row is None:
+            if delta > 0:
+                created.append(PathEnrollmentCount(learning_path_id=path_id, total=delta))
+        elif row.total + delta > 0:
+            row.total += delta
+            updated.append(row)
+        else:
+            emptied.append(path_id)
+    PathEnrollmentCount.objects.bulk_update(updated, ['total'], batch_size=BATCH_SIZE)
+    PathEnrollmentCount.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    PathEnrollmentCount.objects.filter(pk__in=emptied).delete()
+
+
+def _rebuild_neighbours(path_ids, top_k):
+    """Recalcula os top-K vizinhos dos caminhos informados"""
+    if not path_ids:
+        return
+    rows = list(PathCoEnrollment.objects.filter(
+        learning_path_id__in=path_ids,
+        count__gte=MIN_CO_ENROLLMENTS
+    ).values_list('learning_path_id', 'other_path_id', 'count'))
+    involved = {path_id for path_id, _, _ in rows} | {other_id for _, other_id, _ in rows}
+    totals = dict(PathEnrollmentCount.objects.filter(
+        learning_path_id__in=involved
+    ).values_list('learning_path_id', 'total'))
+
+    candidates = defaultdict(list)
+    for path_id, other_id, count in rows:
+        norm = math.sqrt(totals.get(path_id, 0) * totals.get(other_id, 0))
+        if norm:
+            candidates[path_id].append((count / norm, count, other_id))
+
+    neighbours = []
+    for path_id, scored in candidates.items():
+        scored.sort(key=lambda item: (-item[0], -item[1], str(item[2])))
+        neighbours.extend(
+            PathSimilarity(
+                learning_path_id=path_id,
+                similar_path_id=other_id,
+                score=score,
+                co_enrollments=count,
+                rank=rank
+            )
+            for rank, (score, count, other_id) in enumerate(scored[:top_k], start=1)
+        )
+
+    PathSimilarity.objects.filter(learning_path_id__in=path_ids).delete()
+    PathSimilarity.objects.bulk_create(neighbours, batch_size=BATCH_SIZE)
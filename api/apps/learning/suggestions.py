@@ -0,0 +1,327 @@
+"""
+Índice de prefixos em memória para as sugestões de busca (autocomplete).
+
+Títulos de caminhos publicados, nomes de categorias ativas e tags em uso são
+normalizados (minúsculas, sem acentos) e guardados em um array ordenado de
+chaves. Cada palavra do texto gera uma chave, de modo que "noe" encontra
+"A História de Noé". A consulta é uma busca binária (bisect) seguida da
+varredura de todas as chaves com o prefixo, mantendo apenas as mais populares
+de cada tipo (heapq.nsmallest), sem acesso ao banco de dados. Prefixos curtos
+casam com boa parte do índice, então seu resultado é guardado junto da versão
+publicada e calculado uma única vez por versão.
+
+O índice é atualizado incrementalmente pelos sinais de save/delete, depois do
+commit, no processo que fez a alteração e reconstruído por completo a cada
+SEARCH_SUGGESTIONS_INDEX_TTL segundos, o que também atualiza a popularidade
+(matrículas em LearningPathProgress) e propaga alterações feitas por outros
+processos.
+
+A reconstrução roda em uma thread de fundo (aquecida na inicialização pelo
+wsgi/asgi), nunca na requisição: enquanto isso as consultas usam o índice
+anterior. Cada alteração monta uma nova versão do índice e a publica com uma
+única atribuição, de modo que as consultas leem sem lock. Alterações feitas
+enquanto uma reconstrução lê o banco são registradas com um número de geração
+e reaplicadas sobre o índice reconstruído antes de publicá-lo.
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+
+from apps.common.text import fold
+
+KIND_PATH = 'path'
+KIND_CATEGORY = 'category'
+KIND_TAG = 'tag'
+
+# Quantidade máxima de sugestões por tipo, na ordem em que são exibidas
+KIND_LIMITS = [(KIND_PATH, 5), (KIND_CATEGORY, 3), (KIND_TAG, 3)]
+
+# Prefixos com até este tamanho têm o resultado memorizado por versão do índice
+SHORT_PREFIX_LENGTH = 2
+
+logger = logging.getLogger(__name__)
+
+
+def _word_keys(text):
+    """Gera uma chave para cada início de palavra ("a b c" -> "a b c", "b c", "c")"""
+    words = fold(text).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class SuggestionIndex:
+    """
+    Array ordenado de (chave, tipo, id) com os dados de exibição e popularidade
+    de cada entrada em um dicionário à parte, e os caminhos que usam cada tag.
+    As três estruturas formam um snapshot que nunca é alterado depois de
+    publicado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._built_at = None
+        self._refreshing = False
+        # Resultados dos prefixos curtos e o snapshot a que pertencem
+        self._short_results = (None, {})
+        # Geração da última alteração incremental e as alterações registradas
+        # enquanto há reconstruções em andamento
+        self._generation = 0
+        self._rebuilds = 0
+        self._changes = []
+
+    def _ttl(self):
+        return getattr(settings, 'SEARCH_SUGGESTIONS_INDEX_TTL', 300)
+
+    @property
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self._ttl()
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._built_at = None
+
+    def rebuild(self):
+        """Reconstrói o índice inteiro a partir do banco (poucas consultas agregadas)"""
+        with self._lock:
+            self._rebuilds += 1
+            generation = self._generation
+        snapshot = None
+        try:
+            snapshot = self._read_snapshot()
+        finally:
+            self._finish_rebuild(generation, snapshot)
+
+    def _finish_rebuild(self, generation, snapshot):
+        """
+        Publica o snapshot reconstruído (None se a leitura falhou) depois de
+        reaplicar as alterações feitas desde o início da leitura
+        """
+        with self._lock:
+            if snapshot is not None:
+                for changed_at, operation, args in self._changes:
+                    if changed_at > generation:
+                        snapshot = operation(snapshot, *args)
+                self._snapshot = snapshot
+                self._built_at = time.monotonic()
+            self._rebuilds -= 1
+            if not self._rebuilds:
+                self._changes = []
+
+    @staticmethod
+    def _read_snapshot():
+        from apps.progress.models import LearningPathProgress
+        from .models import Category, LearningPath, LearningPathTag
+
+        enrolments = dict(
+            LearningPathProgress.objects.filter(
+                learning_path__is_published=True
+            ).values_list('learning_path_id').annotate(total=Count('id')).order_by()
+        )
+
+        entries = {}
+        category_popularity = defaultdict(int)
+        for path_id, title, category_id in LearningPath.objects.filter(
+            is_published=True
+        ).values_list('id', 'title', 'category_id').order_by():
+            popularity = enrolments.get(path_id, 0)
+            entries[(KIND_PATH, path_id)] = (title, popularity)
+            category_popularity[category_id] += popularity
+
+        for category_id, name in Category.objects.filter(
+            is_active=True
+        ).values_list('id', 'name').order_by():
+            entries[(KIND_CATEGORY, category_id)] = (name, category_popularity[category_id])
+
+        tag_paths = defaultdict(set)
+        for path_id, slug, name in LearningPathTag.objects.filter(
+            learning_path__is_published=True
+        ).values_list('learning_path_id', 'tag__slug', 'tag__name').order_by():
+            _, popularity = entries.get((KIND_TAG, slug), (name, 0))
+            entries[(KIND_TAG, slug)] = (name, popularity + enrolments.get(path_id, 0))
+            tag_paths[slug].add(path_id)
+
+        keys = sorted(
+            (key, kind, ref_id)
+            for (kind, ref_id), (display, _) in entries.items()
+            for key in _word_keys(display)
+        )
+        tag_paths = {slug: frozenset(paths) for slug, paths in tag_paths.items()}
+        return keys, entries, tag_paths
+
+    def refresh_in_background(self):
+        """
+        Reconstrói o índice em uma thread de fundo, se nenhuma reconstrução
+        estiver em andamento. Retorna a thread iniciada (ou None).
+        """
+        with self._lock:
+            if self._refreshing:
+                return None
+            self._refreshing = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('Falha ao reconstruir o índice de sugestões')
+            finally:
+                self._refreshing = False
+                connections.close_all()
+
+        thread = threading.Thread(target=run, name='suggestion-index', daemon=True)
+        thread.start()
+        return thread
+
+    def upsert(self, kind, ref_id, display):
+        """Adiciona ou atualiza uma entrada, preservando a popularidade conhecida"""
+        self._mutate(self._upsert, kind, ref_id, display)
+
+    def remove(self, kind, ref_id):
+        self._mutate(self._remove, kind, ref_id)
+
+    def upsert_path(self, path_id, title, tags):
+        """
+        Adiciona ou atualiza um caminho publicado com suas tags
+        ([(slug, nome)]); tags que ele deixou de usar saem do índice quando
+        nenhum outro caminho as usa
+        """
+        self._mutate(self._upsert_path, path_id, title, tuple(tags))
+
+    def remove_path(self, path_id):
+        """Remove um caminho e as tags que só ele usava"""
+        self._mutate(self._remove_path, path_id)
+
+    def _mutate(self, operation, *args):
+        """Aplica a alteração ao snapshot atual e a registra para reconstruções em andamento"""
+        with self._lock:
+            self._generation += 1
+            if self._rebuilds:
+                self._changes.append((self._generation, operation, args))
+            if self._snapshot is not None:
+                self._snapshot = operation(self._snapshot, *args)
+
+    def _upsert(self, snapshot, kind, ref_id, display):
+        keys, entries, tag_paths = self._copy(snapshot)
+        self._put(keys, entries, kind, ref_id, display)
+        return keys, entries, tag_paths
+
+    def _remove(self, snapshot, kind, ref_id):
+        keys, entries, tag_paths = self._copy(snapshot)
+        self._drop(keys, entries, kind, ref_id)
+        return keys, entries, tag_paths
+
+    def _upsert_path(self, snapshot, path_id, title, tags):
+        keys, entries, tag_paths = self._copy(snapshot)
+        popularity = self._drop_path(keys, entries, tag_paths, path_id)
+        self._put(keys, entries, KIND_PATH, path_id, title, popularity)
+        for slug, name in tags:
+            tag_paths[slug] = tag_paths.get(slug, frozenset()) | {path_id}
+            _, tag_popularity = entries.get((KIND_TAG, slug), (name, 0))
+            self._put(keys, entries, KIND_TAG, slug, name, tag_popularity + popularity)
+        return keys, entries, tag_paths
+
+    def _remove_path(self, snapshot, path_id):
+        keys, entries, tag_paths = self._copy(snapshot)
+        self._drop_path(keys, entries, tag_paths, path_id)
+        return keys, entries, tag_paths
+
+    @staticmethod
+    def _copy(snapshot):
+        keys, entries, tag_paths = snapshot
+        return list(keys), dict(entries), dict(tag_paths)
+
+    def _put(self, keys, entries, kind, ref_id, display, popularity=None):
+        previous = entries.get((kind, ref_id))
+        if popularity is None:
+            popularity = previous[1] if previous else 0
+        if previous:
+            self._remove_keys(keys, kind, ref_id, previous[0])
+        entries[(kind, ref_id)] = (display, popularity)
+        for key in _word_keys(display):
+            insort(keys, (key, kind, ref_id))
+
+    def _drop(self, keys, entries, kind, ref_id):
+        previous = entries.pop((kind, ref_id), None)
+        if previous:
+            self._remove_keys(keys, kind, ref_id, previous[0])
+
+    def _drop_path(self, keys, entries, tag_paths, path_id):
+        """Remove o caminho e desconta sua popularidade das tags; retorna a popularidade"""
+        previous = entries.get((KIND_PATH, path_id))
+        popularity = previous[1] if previous else 0
+        self._drop(keys, entries, KIND_PATH, path_id)
+        for slug in [slug for slug, paths in tag_paths.items() if path_id in paths]:
+            remaining = tag_paths[slug] - {path_id}
+            if remaining:
+                tag_paths[slug] = remaining
+                name, tag_popularity = entries[(KIND_TAG, slug)]
+                entries[(KIND_TAG, slug)] = (name, max(tag_popularity - popularity, 0))
+            else:
+                del tag_paths[slug]
+                self._drop(keys, entries, KIND_TAG, slug)
+        return popularity
+
+    def _remove_keys(self, keys, kind, ref_id, display):
+        for key in _word_keys(display):
+            item = (key, kind, ref_id)
+            position = bisect_left(keys, item)
+            if position < len(keys) and keys[position] == item:
+                del keys[position]
+
+    def lookup(self, query):
+        """
+        Retorna as sugestões para o prefixo informado, ordenadas por
+        popularidade. Nunca consulta o banco: um índice vencido é reconstruído
+        em segundo plano.
+        """
+        if self.is_stale:
+            self.refresh_in_background()
+        prefix = fold(query)
+        snapshot = self._snapshot
+        if not prefix or snapshot is None:
+            return []
+
+        if len(prefix) > SHORT_PREFIX_LENGTH:
+            return self._rank(snapshot, prefix)
+
+        results_snapshot, results = self._short_results
+        if results_snapshot is not snapshot:
+            results = {}
+            self._short_results = (snapshot, results)
+        if prefix not in results:
+            results[prefix] = self._rank(snapshot, prefix)
+        return list(results[prefix])
+
+    @staticmethod
+    def _rank(snapshot, prefix):
+        """Varre as chaves com o prefixo e mantém as mais populares de cada tipo"""
+        keys, entries, _ = snapshot
+        matches = {kind: set() for kind, _ in KIND_LIMITS}
+        position = bisect_left(keys, (prefix,))
+        while position < len(keys):
+            key, kind, ref_id = keys[position]
+            if not key.startswith(prefix):
+                break
+            matches[kind].add(ref_id)
+            position += 1
+
+        suggestions = []
+        for kind, limit in KIND_LIMITS:
+            ranked = heapq.nsmallest(
+                limit,
+                filter(None, (entries.get((kind, ref_id)) for ref_id in matches[kind])),
+                key=lambda entry: (-entry[1], entry[0])
+            )
+            for display, _ in ranked:
+                if display not in suggestions:
+                    suggestions.append(display)
+        return suggestions
+
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,26 @@
+from celery import shared_task
+from . import popularity
+from .similarity import update_similarity_index
+
+
+@shared_task(ignore_result=True)
+def update_path_similarity():
+    """Atualiza o índice de similaridade com as inscrições desde a última execução"""
+    run = update_similarity_index()
+    return run.updated_paths
+
+
+@shared_task(ignore_result=True)
+def rebuild_path_similarity():
+    """
+    Recalcula o índice de similaridade por completo, incluindo as inscrições
+    confirmadas depois da margem da marca d'água
+    """
+    run = update_similarity_index(full=True)
+    return run.updated_paths
+
+
+@shared_task(ignore_result=True)
+def refresh_path_popularity():
+    """Recalcula as pontuações de popularidade e tendência dos caminhos"""
+    return popularity.refresh_path_popularity()
@@ -1,14 +1,27 @@
 from rest_framework import generics, filters, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
+from django.db.models import F, OuterRef
+from django.utils.decorators import method_decorator
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiParameter
 from drf_spectacular.openapi import OpenApiTypes
-from .models import Category, LearningPath, Lesson, Quiz, Achievement
+from apps.common.pagination import KeysetPagination
+from apps.search.filters import FullTextSearchFilter
+from .cache import (
+    catalog_cache, get_achievement_catalog, get_earned_achievements, get_lesson_sequence
+)
+from .etags import ConditionalRetrieveMixin, count_subquery, max_subquery
+from .models import (
+    Category, LearningPath, LearningPathTag, Lesson, Quiz, Achievement, Tag
+)
+from .popularity import get_popularity_rankings, get_popularity_version
+from .recommendations import get_recommendations
+from .suggestions import suggestion_index
 from .serializers import (
     CategorySerializer, LearningPathListSerializer, LearningPathDetailSerializer,
-    LessonDetailSerializer, QuizSerializer, AchievementSerializer
+    LessonDetailSerializer, QuizSerializer, AchievementSerializer, get_path_progress_map
 )
 
 
@@ -54,6 +67,7 @@ from .serializers import (
         )
     }
 )
+@method_decorator(catalog_cache('categories'), name='dispatch')
 class CategoryListView(generics.ListAPIView):
     """
     Lista todas as categorias ativas
@@ -80,6 +94,9 @@ class CategoryListView(generics.ListAPIView):
     
     **Ordenação:** Por data de criação, título ou duração estimada
     
+    **Paginação:** Por cursor. Siga os links `next`/`previous` da resposta;
+    use `page_size` para ajustar a quantidade de itens (máx. 100).
+    
     Para usuários autenticados, inclui informações de progresso individual.
     ''',
     parameters=[
@@ -88,7 +105,7 @@ class CategoryListView(generics.ListAPIView):
         OpenApiParameter('age_group', OpenApiTypes.STR, description='Faixa etária'),
         OpenApiParameter('is_featured', OpenApiTypes.BOOL, description='Apenas caminhos em destaque'),
         OpenApiParameter('tags', OpenApiTypes.STR, description='Tags separadas por vírgula'),
-        OpenApiParameter('search', OpenApiTypes.STR, description='Busca no título e descrição'),
+        OpenApiParameter('search', OpenApiTypes.STR, description='Busca textual no título, descrição, tags e objetivos'),
         OpenApiParameter('ordering', OpenApiTypes.STR, description='Campo para ordenação'),
     ],
     responses={
@@ -101,38 +118,80 @@ class LearningPathListView(generics.ListAPIView):
     """
     serializer_class = LearningPathListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'difficulty_level', 'age_group', 'is_featured']
-    search_fields = ['title', 'description', 'tags']
+    search_document_kind = 'learning_path'
     ordering_fields = ['created_at', 'title', 'estimated_duration_minutes']
     ordering = ['-is_featured', 'order', '-created_at']
     
     def get_queryset(self):
-        queryset = LearningPath.objects.filter(is_published=True).select_related('category')
+        queryset = LearningPath.objects.with_stats().filter(
+            is_published=True
+        ).select_related('category')
         
-        # Filtro por tags
+        # Filtro por tags (semi-join indexado na tabela de tags normalizadas)
         tags = self.request.query_params.get('tags', None)
         if tags:
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            tag_query = Q()
-            for tag in tag_list:
-                tag_query |= Q(tags__icontains=tag)
-            queryset = queryset.filter(tag_query)
+            tag_slugs = [slug for slug, _ in Tag.parse(tags)]
+            queryset = queryset.filter(
+                pk__in=LearningPathTag.objects.filter(
+                    tag__slug__in=tag_slugs
+                ).values('learning_path_id')
+            )
         
         return queryset
 
 
-class LearningPathDetailView(generics.RetrieveAPIView):
+@method_decorator(catalog_cache('path_detail'), name='dispatch')
+class LearningPathDetailView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
     """
     Detalhes de um caminho de aprendizado específico
     """
-    queryset = LearningPath.objects.filter(is_published=True)
+    queryset = LearningPath.objects.with_stats().with_published_lessons().filter(
+        is_published=True
+    ).select_related('category')
     serializer_class = LearningPathDetailSerializer
     lookup_field = 'slug'
     permission_classes = [permissions.AllowAny]
+    
+    def get_etag_watermarks(self):
+        lessons = Lesson.objects.filter(learning_path=OuterRef('pk'))
+        queryset = LearningPath.objects.filter(
+            slug=self.kwargs.get('slug'),
+            is_published=True
+        ).annotate(
+            lessons_updated_at=max_subquery(lessons, 'updated_at'),
+            lessons_count=count_subquery(lessons),
+            quizzes_updated_at=max_subquery(
+                Quiz.objects.filter(lesson__learning_path=OuterRef('pk')), 'updated_at'
+            ),
+        )
+        fields = ['updated_at', 'lessons_updated_at', 'lessons_count', 'quizzes_updated_at']
+        
+        user = self.request.user
+        if user.is_authenticated:
+            from apps.progress.models import LearningPathProgress, LessonProgress
+            queryset = queryset.annotate(
+                path_progress_updated_at=max_subquery(
+                    LearningPathProgress.objects.filter(
+                        user=user, learning_path=OuterRef('pk')
+                    ),
+                    'updated_at'
+                ),
+                lesson_progress_updated_at=max_subquery(
+                    LessonProgress.objects.filter(
+                        user=user, lesson__learning_path=OuterRef('pk')
+                    ),
+                    'updated_at'
+                ),
+            )
+            fields += ['path_progress_updated_at', 'lesson_progress_updated_at']
+        
+        return queryset.values(*fields).first()
 
 
-class LessonDetailView(generics.RetrieveAPIView):
+class LessonDetailView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
     """
     Detalhes de uma lição específica
     """
@@ -145,13 +204,62 @@ class LessonDetailView(generics.RetrieveAPIView):
         path_slug = self.kwargs.get('path_slug')
         lesson_slug = self.kwargs.get('lesson_slug')
         
-        return generics.get_object_or_404(
-            Lesson,
+        lesson = generics.get_object_or_404(
+            Lesson.objects.select_related('learning_path__category', 'quiz'),
             learning_path__slug=path_slug,
             slug=lesson_slug,
             is_published=True,
             learning_path__is_published=True
         )
+        
+        # O total de lições do caminho sai da mesma sequência usada na navegação
+        lesson.learning_path.published_lessons_count = len(
+            get_lesson_sequence(lesson.learning_path_id)
+        )
+        return lesson
+    
+    def get_etag_watermarks(self):
+        path_lessons = Lesson.objects.filter(learning_path=OuterRef('learning_path'))
+        queryset = Lesson.objects.filter(
+            learning_path__slug=self.kwargs.get('path_slug'),
+            slug=self.kwargs.get('lesson_slug'),
+            is_published=True,
+            learning_path__is_published=True
+        ).annotate(
+            path_updated_at=F('learning_path__updated_at'),
+            path_lessons_updated_at=max_subquery(path_lessons, 'updated_at'),
+            path_lessons_count=count_subquery(path_lessons),
+            quiz_updated_at=F('quiz__updated_at'),
+        )
+        fields = [
+            'updated_at', 'path_updated_at', 'path_lessons_updated_at',
+            'path_lessons_count', 'quiz_updated_at'
+        ]
+        
+        user = self.request.user
+        if user.is_authenticated:
+            from apps.progress.models import LearningPathProgress, LessonProgress, QuizAttempt
+            attempts = QuizAttempt.objects.filter(user=user, quiz__lesson=OuterRef('pk'))
+            queryset = queryset.annotate(
+                lesson_progress_updated_at=max_subquery(
+                    LessonProgress.objects.filter(user=user, lesson=OuterRef('pk')),
+                    'updated_at'
+                ),
+                path_progress_updated_at=max_subquery(
+                    LearningPathProgress.objects.filter(
+                        user=user, learning_path=OuterRef('learning_path')
+                    ),
+                    'updated_at'
+                ),
+                attempts_count=count_subquery(attempts),
+                attempts_completed_at=max_subquery(attempts, 'completed_at'),
+            )
+            fields += [
+                'lesson_progress_updated_at', 'path_progress_updated_at',
+                'attempts_count', 'attempts_completed_at'
+            ]
+        
+        return queryset.values(*fields).first()
 
 
 class QuizDetailView(generics.RetrieveAPIView):
@@ -163,43 +271,61 @@ class QuizDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        lesson_id = self.kwargs.get('lesson_id')
-        lesson = generics.get_object_or_404(
-            Lesson,
-            id=lesson_id,
-            is_published=True
+        return generics.get_object_or_404(
+            Quiz,
+            lesson_id=self.kwargs.get('lesson_id'),
+            lesson__is_published=True
         )
-        
-        return generics.get_object_or_404(Quiz, lesson=lesson)
 
 
+@extend_schema(
+    tags=['learning'],
+    summary='Listar conquistas',
+    description='''
+    Lista as conquistas ativas com a informação de obtenção do usuário.
+    Conquistas secretas aparecem apenas depois de obtidas.
+    ''',
+    parameters=[
+        OpenApiParameter('achievement_type', OpenApiTypes.STR, description='Tipo de conquista'),
+    ]
+)
 class AchievementListView(generics.ListAPIView):
     """
-    Lista todas as conquistas disponíveis
+    Lista todas as conquistas disponíveis.
+    
+    Servida a partir do catálogo de conquistas em cache e das conquistas
+    obtidas pelo usuário (também em cache), sem consultas ao banco; o filtro
+    por tipo é aplicado sobre o catálogo.
     """
     serializer_class = AchievementSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['achievement_type']
     
-    def get_queryset(self):
-        # Mostrar conquistas ocultas apenas se já foram obtidas
-        queryset = Achievement.objects.filter(is_active=True)
+    def list(self, request, *args, **kwargs):
+        achievement_type = request.query_params.get('achievement_type')
+        valid_types = dict(Achievement.ACHIEVEMENT_TYPES)
+        if achievement_type and achievement_type not in valid_types:
+            raise ValidationError({
+                'achievement_type': [
+                    f'Faça uma escolha válida. {achievement_type} não é uma das escolhas disponíveis.'
+                ]
+            })
         
-        if self.request.user.is_authenticated:
-            from apps.progress.models import UserAchievement
-            earned_achievements = UserAchievement.objects.filter(
-                user=self.request.user
-            ).values_list('achievement_id', flat=True)
-            
-            # Incluir conquistas visíveis ou já obtidas
-            queryset = queryset.filter(
-                Q(is_hidden=False) | Q(id__in=earned_achievements)
-            )
-        else:
-            queryset = queryset.filter(is_hidden=False)
+        earned = get_earned_achievements(request.user.pk)
+        achievements = [
+            achievement for achievement in get_achievement_catalog()
+            if (not achievement_type or achievement['achievement_type'] == achievement_type)
+            and (not achievement['is_hidden'] or achievement['id'] in earned)
+        ]
         
-        return queryset.order_by('achievement_type', 'name')
+        context = self.get_serializer_context()
+        context['earned_achievements'] = earned
+        page = self.paginate_queryset(achievements)
+        if page is not None:
+            serializer = self.get_serializer_class()(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer_class()(achievements, many=True, context=context)
+        return Response(serializer.data)
 
 
 @extend_schema(
@@ -209,9 +335,13 @@ class AchievementListView(generics.ListAPIView):
     Retorna o conteúdo em destaque para exibição na página inicial.
     
     Inclui:
-    - **Caminhos em destaque**: Até 6 caminhos marcados como featured
+    - **Caminhos em destaque**: Até 6 caminhos marcados como featured, dos mais populares aos menos
+    - **Caminhos em alta**: Caminhos com mais atividade nos últimos dias
+    - **Caminhos populares**: Caminhos com mais inscrições e conclusões nos últimos meses
     - **Categorias populares**: Categorias com maior número de caminhos
     
+    As pontuações são recalculadas periodicamente (decaimento temporal).
+    
     Este endpoint é público e não requer autenticação.
     ''',
     responses={
@@ -237,6 +367,8 @@ class AchievementListView(generics.ListAPIView):
                         'total_lessons': 5
                     }
                 ],
+                'trending_paths': [],
+                'popular_paths': [],
                 'popular_categories': [
                     {
                         'id': 1,
@@ -253,32 +385,47 @@ class AchievementListView(generics.ListAPIView):
         )
     }
 )
+# A resposta muda a cada recálculo de popularidade (apps.learning.popularity)
+@catalog_cache('featured', versions=[get_popularity_version])
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def featured_content(request):
     """
     Conteúdo destacado na página inicial
     """
-    # Caminhos em destaque
-    featured_paths = LearningPath.objects.filter(
-        is_published=True,
-        is_featured=True
-    ).select_related('category')[:6]
+    # Rankings pré-calculados (PathPopularity); os caminhos vêm em uma consulta
+    rankings = get_popularity_rankings()
+    paths = {
+        path.pk: path
+        for path in LearningPath.objects.with_stats().filter(
+            is_published=True,
+            pk__in={path_id for ids in rankings.values() for path_id in ids}
+        ).select_related('category')
+    }
+    
+    # O progresso do usuário é carregado uma vez para as três listas
+    context = {'request': request}
+    if request.user.is_authenticated:
+        context['path_progress'] = get_path_progress_map(request.user, paths.values())
+        context['all_path_progress'] = True
+    
+    def serialize(ids):
+        return LearningPathListSerializer(
+            [paths[path_id] for path_id in ids if path_id in paths],
+            many=True,
+            context=context
+        ).data
     
     # Categorias populares
     popular_categories = Category.objects.filter(
         is_active=True,
-        learning_paths__is_published=True
-    ).annotate(
-        paths_count=Count('learning_paths')
-    ).order_by('-paths_count')[:4]
+        published_paths_count__gt=0
+    ).order_by('-published_paths_count')[:4]
     
     return Response({
-        'featured_paths': LearningPathListSerializer(
-            featured_paths, 
-            many=True, 
-            context={'request': request}
-        ).data,
+        'featured_paths': serialize(rankings['featured']),
+        'trending_paths': serialize(rankings['trending']),
+        'popular_paths': serialize(rankings['popular']),
         'popular_categories': CategorySerializer(
             popular_categories, 
             many=True
@@ -292,69 +439,7 @@ def user_recommendations(request):
     """
     Recomendações personalizadas para o usuário
     """
-    user = request.user
-    
-    # Baseado na faixa etária
-    age_based = []
-    if hasattr(user, 'birth_date') and user.birth_date:
-        from datetime import date
-        age = (date.today() - user.birth_date).days // 365
-        
-        if age <= 5:
-            age_group = '3-5'
-        elif age <= 8:
-            age_group = '6-8'
-        elif age <= 11:
-            age_group = '9-11'
-        else:
-            age_group = '12-14'
-        
-        age_based = LearningPath.objects.filter(
-            is_published=True,
-            age_group=age_group
-        ).select_related('category')[:3]
-    
-    # Baseado no progresso atual
-    from apps.progress.models import LearningPathProgress
-    
-    # Caminhos em progresso
-    in_progress = LearningPathProgress.objects.filter(
-        user=user,
-        status='in_progress'
-    ).select_related('learning_path')[:3]
-    
-    # Caminhos similares aos completados
-    completed_categories = LearningPathProgress.objects.filter(
-        user=user,
-        status='completed'
-    ).values_list('learning_path__category', flat=True).distinct()
-    
-    similar_paths = LearningPath.objects.filter(
-        is_published=True,
-        category__in=completed_categories
-    ).exclude(
-        user_progress__user=user
-    ).select_related('category')[:3]
-    
-    return Response({
-        'age_based': LearningPathListSerializer(
-            age_based, 
-            many=True, 
-            context={'request': request}
-        ).data,
-        'in_progress': [{
-            'learning_path': LearningPathListSerializer(
-                progress.learning_path, 
-                context={'request': request}
-            ).data,
-            'progress_percentage': progress.progress_percentage
-        } for progress in in_progress],
-        'similar_to_completed': LearningPathListSerializer(
-            similar_paths, 
-            many=True, 
-            context={'request': request}
-        ).data
-    })
+    return Response(get_recommendations(request))
 
 
 @api_view(['GET'])
@@ -368,35 +453,8 @@ def search_suggestions(request):
     if len(query) < 2:
         return Response({'suggestions': []})
     
-    # Buscar em títulos de caminhos
-    path_suggestions = LearningPath.objects.filter(
-        is_published=True,
-        title__icontains=query
-    ).values_list('title', flat=True)[:5]
-    
-    # Buscar em categorias
-    category_suggestions = Category.objects.filter(
-        is_active=True,
-        name__icontains=query
-    ).values_list('name', flat=True)[:3]
-    
-    # Buscar em tags
-    tag_suggestions = []
-    paths_with_tags = LearningPath.objects.filter(
-        is_published=True,
-        tags__icontains=query
-    ).values_list('tags', flat=True)
-    
-    for tags_str in paths_with_tags:
-        if tags_str:
-            tags = [tag.strip() for tag in tags_str.split(',')]
-            matching_tags = [tag for tag in tags if query.lower() in tag.lower()]
-            tag_suggestions.extend(matching_tags[:2])
-    
-    # Remover duplicatas
-    tag_suggestions = list(set(tag_suggestions))[:3]
-    
-    all_suggestions = list(path_suggestions) + list(category_suggestions) + tag_suggestions
+    # Índice de prefixos em memória: caminhos, categorias e tags por popularidade
+    all_suggestions = suggestion_index.lookup(query)
     
     return Response({
         'suggestions': all_suggestions[:10]
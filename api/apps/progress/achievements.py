@@ -0,0 +1,358 @@
+"""
+Motor de regras das conquistas.
+
+O campo Achievement.requirements é compilado em predicados tipados e as
+regras são indexadas pelo evento que pode alterá-las. Cada evento avalia só
+as regras afetadas e ainda não obtidas pelo usuário, carregando apenas as
+métricas que essas regras usam.
+
+Formatos aceitos em requirements (condições combinadas com E):
+    {"lessons_completed": 5, "streak_days": 7}
+    {"type": "paths_completed", "target": 1}
+    [{"type": "quiz_score", "target": 100}, {"lessons_completed": 10}]
+
+Condições desconhecidas ou limites inválidos levantam ValidationError
+(Achievement.clean usa a mesma compilação).
+
+Eventos: 'lesson_completed', 'quiz_completed' e 'streak_updated'.
+"""
+import logging
+import threading
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+
+from apps.learning.cache import invalidate_earned_achievements
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_KEY = 'achievements:rules_version'
+
+EVENT_LESSON_COMPLETED = 'lesson_completed'
+EVENT_QUIZ_COMPLETED = 'quiz_completed'
+EVENT_STREAK_UPDATED = 'streak_updated'
+
+
+class Predicate:
+    """Condição "métrica >= limite" sobre um usuário"""
+    metric = None
+    events = ()
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def check(self, metrics):
+        return metrics[self.metric] >= self.threshold
+
+    def qualifying_users(self):
+        """Subconsulta com os ids dos usuários que já satisfazem a condição"""
+        raise NotImplementedError
+
+
+class LessonCountPredicate(Predicate):
+    metric = 'lessons_completed'
+    events = (EVENT_LESSON_COMPLETED,)
+
+    def qualifying_users(self):
+        from .models import LessonProgress
+        return LessonProgress.objects.filter(status='completed').values('user').annotate(
+            total=Count('pk')
+        ).filter(total__gte=self.threshold).values('user')
+
+
+class PathCompletionPredicate(Predicate):
+    metric = 'paths_completed'
+    events = (EVENT_LESSON_COMPLETED,)
+
+    def qualifying_users(self):
+        from .models import LearningPathProgress
+        return LearningPathProgress.objects.filter(status='completed').values('user').annotate(
+            total=Count('pk')
+        ).filter(total__gte=self.threshold).values('user')
+
+
+class StreakPredicate(Predicate):
+    metric = 'streak_days'
+    events = (EVENT_STREAK_UPDATED,)
+
+    def qualifying_users(self):
+        from .models import StudyStreak
+        return StudyStreak.objects.filter(longest_streak__gte=self.threshold).values('user')
+
+
+class QuizScorePredicate(Predicate):
+    metric = 'quiz_score'
+    events = (EVENT_QUIZ_COMPLETED,)
+
+    def qualifying_users(self):
+        from .models import QuizAttempt
+        return QuizAttempt.objects.filter(
+            status='completed',
+            score__gte=self.threshold
+        ).values('user')
+
+
+class PerfectQuizPredicate(Predicate):
+    """Quantidade de quizzes diferentes concluídos com 100%"""
+    metric = 'perfect_quizzes'
+    events = (EVENT_QUIZ_COMPLETED,)
+
+    def qualifying_users(self):
+        from .models import QuizAttempt
+        return QuizAttempt.objects.filter(status='completed', score__gte=100).values(
+            'user'
+        ).annotate(
+            total=Count('quiz', distinct=True)
+        ).filter(total__gte=self.threshold).values('user')
+
+
+# Nome usado em requirements -> (classe do predicado, limite padrão)
+PREDICATE_TYPES = {
+    'lessons_completed': (LessonCountPredicate, 1),
+    'paths_completed': (PathCompletionPredicate, 1),
+    'streak_days': (StreakPredicate, 1),
+    'consecutive_days': (StreakPredicate, 1),
+    'quiz_score': (QuizScorePredicate, 100),
+    'perfect_score': (PerfectQuizPredicate, 1),
+}
+
+
+def compile_requirements(requirements):
+    """
+    Converte requirements em uma lista de predicados (None quando não há
+    condições: a conquista só é concedida manualmente). Levanta
+    ValidationError para condições desconhecidas ou limites inválidos.
+    """
+    items = requirements if isinstance(requirements, list) else [requirements]
+    predicates = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValidationError('Cada requisito deve ser um objeto JSON')
+        if 'type' in item:
+            unknown_keys = set(item) - {'type', 'target'}
+            if unknown_keys:
+                raise ValidationError(
+                    'Chaves desconhecidas no requisito: %(keys)s',
+                    params={'keys': ', '.join(sorted(unknown_keys))}
+                )
+            conditions = {item['type']: item.get('target')}
+        else:
+            conditions = item
+        for name, threshold in conditions.items():
+            if name not in PREDICATE_TYPES:
+                raise ValidationError(
+                    'Condição desconhecida: %(name)s', params={'name': name}
+                )
+            predicate_class, default = PREDICATE_TYPES[name]
+            if threshold is None:
+                threshold = default
+            if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) \
+                    or threshold <= 0:
+                raise ValidationError(
+                    'Limite inválido para %(name)s: %(threshold)s',
+                    params={'name': name, 'threshold': threshold}
+                )
+            predicates.append(predicate_class(threshold))
+    return predicates or None
+
+
+class Rule:
+    def __init__(self, achievement_id, predicates):
+        self.achievement_id = achievement_id
+        self.predicates = predicates
+
+    @property
+    def events(self):
+        return {event for predicate in self.predicates for event in predicate.events}
+
+    def matches(self, metrics):
+        return all(predicate.check(metrics) for predicate in self.predicates)
+
+
+class RuleSet:
+    """Regras das conquistas ativas, indexadas por evento"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.by_event = defaultdict(list)
+        for rule in rules:
+            for event in rule.events:
+                self.by_event[event].append(rule)
+
+    @classmethod
+    def load(cls):
+        from apps.learning.models import Achievement
+
+        rules = []
+        for achievement_id, slug, requirements in Achievement.objects.filter(
+            is_active=True
+        ).values_list('id', 'slug', 'requirements'):
+            try:
+                predicates = compile_requirements(requirements)
+            except ValidationError:
+                logger.warning('Requisitos não reconhecidos na conquista %s', slug)
+                continue
+            if predicates is None:
+                continue
+            rules.append(Rule(achievement_id, predicates))
+        return cls(rules)
+
+    def for_event(self, event):
+        return self.by_event.get(event, [])
+
+
+class UserMetrics:
+    """Métricas de um usuário, carregadas sob demanda (uma consulta cada)"""
+
+    def __init__(self, user_id, streak=None):
+        self.user_id = user_id
+        self.streak = streak
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            self._values[name] = getattr(self, f'load_{name}')()
+        return self._values[name]
+
+    def as_dict(self):
+        return {
+            name: float(value) if value is not None and not isinstance(value, int) else value
+            for name, value in self._values.items()
+        }
+
+    def load_lessons_completed(self):
+        from .models import LessonProgress
+        return LessonProgress.objects.filter(user_id=self.user_id, status='completed').count()
+
+    def load_paths_completed(self):
+        from .models import LearningPathProgress
+        return LearningPathProgress.objects.filter(
+            user_id=self.user_id,
+            status='completed'
+        ).count()
+
+    def load_streak_days(self):
+        if self.streak is not None:
+            return self.streak.longest_streak
+        from .models import StudyStreak
+        return StudyStreak.objects.filter(user_id=self.user_id).values_list(
+            'longest_streak', flat=True
+        ).first() or 0
+
+    def load_quiz_score(self):
+        from .models import QuizAttempt
+        return QuizAttempt.objects.filter(
+            user_id=self.user_id,
+            status='completed'
+        ).aggregate(best=Max('score'))['best'] or 0
+
+    def load_perfect_quizzes(self):
+        from .models import QuizAttempt
+        return QuizAttempt.objects.filter(
+            user_id=self.user_id,
+            status='completed',
+            score__gte=100
+        ).values('quiz').distinct().count()
+
+
+_rule_set = None
+_rule_set_version = None
+_rule_set_lock = threading.Lock()
+
+
+def get_rule_set():
+    """Regras compiladas do processo, recarregadas quando uma conquista muda"""
+    global _rule_set, _rule_set_version
+    version = cache.get(RULES_VERSION_KEY)
+    if version is None:
+        cache.add(RULES_VERSION_KEY, 1, timeout=None)
+        version = cache.get(RULES_VERSION_KEY, 1)
+
+    if _rule_set is None or _rule_set_version != version:
+        with _rule_set_lock:
+            if _rule_set is None or _rule_set_version != version:
+                _rule_set = RuleSet.load()
+                _rule_set_version = version
+    return _rule_set
+
+
+def invalidate_rule_set():
+    try:
+        cache.incr(RULES_VERSION_KEY)
+    except ValueError:
+        cache.add(RULES_VERSION_KEY, 1, timeout=None)
+        cache.incr(RULES_VERSION_KEY)
+
+
+def evaluate_achievements(user_id, event, **context):
+    """
+    Avalia as regras afetadas por um evento e concede as conquistas obtidas.
+    Retorna os ids das conquistas concedidas.
+    """
+    from .models import UserAchievement
+
+    rules = get_rule_set().for_event(event)
+    if not rules:
+        return []
+
+    earned = set(
+        UserAchievement.objects.filter(
+            user_id=user_id,
+            achievement_id__in=[rule.achievement_id for rule in rules]
+        ).values_list('achievement_id', flat=True)
+    )
+    metrics = UserMetrics(user_id, **context)
+    matched = [
+        rule.achievement_id
+        for rule in rules
+        if rule.achievement_id not in earned and rule.matches(metrics)
+    ]
+    if matched:
+        award_achievements([user_id], matched, progress_data=metrics.as_dict())
+    return matched
+
+
+def award_achievements(user_ids, achievement_ids, progress_data=None):
+    """Grava as conquistas em lote, ignorando as que o usuário já possui"""
+    from .models import UserAchievement, UserStatsSnapshot
+
+    UserAchievement.objects.bulk_create([
+        UserAchievement(
+            user_id=user_id,
+            achievement_id=achievement_id,
+            progress_data=progress_data or {}
+        )
+        for user_id in user_ids
+        for achievement_id in achievement_ids
+    ], ignore_conflicts=True)
+    # bulk_create não dispara sinais: atualiza aqui o cache e o snapshot
+    invalidate_earned_achievements(user_ids)
+    UserStatsSnapshot.refresh(user_ids, ['achievements_total'])
+
+
+def backfill_rule(rule, batch_size=1000):
+    """
+    Concede uma conquista a todos os usuários que já satisfazem a regra,
+    com uma consulta por predicado (usado após criar ou alterar conquistas)
+    """
+    from django.contrib.auth import get_user_model
+
+    users = get_user_model().objects.all()
+    for predicate in rule.predicates:
+        users = users.filter(pk__in=predicate.qualifying_users())
+    users = users.exclude(achievements__achievement_id=rule.achievement_id)
+
+    awarded = 0
+    batch = []
+    for user_id in users.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            award_achievements(batch, [rule.achievement_id])
+            awarded += len(batch)
+            batch = []
+    if batch:
+        award_achievements(batch, [rule.achievement_id])
+        awarded += len(batch)
+    return awarded
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ProgressConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.progress'
-    verbose_name = 'Progresso'
\ No newline at end of file
+    verbose_name = 'Progresso'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
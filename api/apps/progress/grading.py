@@ -0,0 +1,117 @@
+"""
+Correção em lote das tentativas de quiz.
+
+Todas as respostas de uma tentativa chegam em um único payload, são corrigidas
+em memória contra o gabarito em cache (apps.learning.cache.get_quiz_answer_key)
+e gravadas com um único bulk_create. O número de idas ao banco por envio é
+fixo, independente da quantidade de perguntas.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.common.text import fold
+from apps.learning.cache import get_quiz_answer_key
+from .models import QuestionAnswer, QuizAttempt
+
+
+def grade_answers(answer_key, submitted):
+    """
+    Corrige as respostas enviadas. Retorna a lista de correções, na ordem
+    do envio, com is_correct e points_earned de cada pergunta.
+    """
+    graded = []
+    seen = set()
+    for item in submitted:
+        question_id = item['question_id']
+        entry = answer_key.get(question_id)
+        if entry is None:
+            raise ValidationError({'answers': f'Pergunta {question_id} não pertence a este quiz'})
+        if question_id in seen:
+            raise ValidationError({'answers': f'Pergunta {question_id} respondida mais de uma vez'})
+        seen.add(question_id)
+
+        answer_id = item.get('answer_id')
+        text_answer = item.get('text_answer', '')
+        if answer_id is not None:
+            if answer_id not in entry['answers']:
+                raise ValidationError({'answers': f'Resposta {answer_id} não pertence à pergunta {question_id}'})
+            is_correct = entry['answers'][answer_id]
+        elif text_answer.strip():
+            is_correct = ' '.join(fold(text_answer).split()) in entry['correct_texts']
+        else:
+            is_correct = None
+
+        graded.append({
+            'question_id': question_id,
+            'answer_id': answer_id,
+            'text_answer': text_answer,
+            'time_spent_seconds': item.get('time_spent_seconds', 0),
+            'is_correct': is_correct,
+            'points_earned': entry['points'] if is_correct else 0,
+        })
+    return graded
+
+
+def submit_quiz_attempt(user, quiz, answers, time_spent_seconds=0, attempt_id=None):
+    """
+    Corrige e grava uma tentativa completa em uma única transação.
+
+    Se attempt_id for informado, conclui a tentativa iniciada; caso contrário
+    cria a próxima tentativa do usuário, respeitando quiz.max_attempts.
+    """
+    answer_key = get_quiz_answer_key(quiz)
+    graded = grade_answers(answer_key, answers)
+
+    correct = sum(1 for item in graded if item['is_correct'])
+    wrong = sum(1 for item in graded if item['is_correct'] is False)
+
+    try:
+        with transaction.atomic():
+            if attempt_id is not None:
+                attempt = QuizAttempt.objects.select_for_update().filter(
+                    pk=attempt_id,
+                    user=user,
+                    quiz=quiz,
+                    status='started'
+                ).first()
+                if attempt is None:
+                    raise ValidationError({'attempt_id': 'Tentativa não encontrada ou já concluída'})
+            else:
+                last_number = QuizAttempt.objects.filter(
+                    user=user,
+                    quiz=quiz
+                ).aggregate(last=Max('attempt_number'))['last'] or 0
+                if last_number >= quiz.max_attempts:
+                    raise ValidationError({'non_field_errors': ['Número máximo de tentativas atingido']})
+                attempt = QuizAttempt(user=user, quiz=quiz, attempt_number=last_number + 1)
+
+            attempt.quiz = quiz
+            attempt.status = 'completed'
+            attempt.total_questions = len(answer_key)
+            attempt.correct_answers = correct
+            attempt.wrong_answers = wrong
+            attempt.skipped_answers = len(answer_key) - correct - wrong
+            attempt.time_spent_seconds = time_spent_seconds
+            attempt.completed_at = timezone.now()
+            # calculate_score() grava a tentativa (INSERT ou UPDATE) uma única vez
+            attempt.calculate_score()
+
+            QuestionAnswer.objects.bulk_create([
+                QuestionAnswer(
+                    quiz_attempt=attempt,
+                    question_id=item['question_id'],
+                    selected_answer_id=item['answer_id'],
+                    user_text_answer=item['text_answer'],
+                    is_correct=item['is_correct'],
+                    points_earned=item['points_earned'],
+                    time_spent_seconds=item['time_spent_seconds'],
+                )
+                for item in graded
+            ])
+    except IntegrityError:
+        # Dois envios simultâneos disputando o mesmo número de tentativa
+        raise ValidationError({'non_field_errors': ['Esta tentativa já foi enviada']})
+
+    return attempt, graded
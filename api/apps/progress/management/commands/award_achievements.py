@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from apps.progress.achievements import RuleSet, backfill_rule
+
+
+class Command(BaseCommand):
+    """
+    Concede retroativamente as conquistas a quem já cumpre os requisitos
+    """
+    help = (
+        'Avalia as regras das conquistas ativas sobre todos os usuários, com '
+        'consultas em lote, e grava as conquistas que faltam'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--achievement',
+            action='append',
+            dest='achievement_ids',
+            type=int,
+            help='ID da conquista a avaliar (pode ser repetido)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de conquistas gravadas por lote'
+        )
+
+    def handle(self, *args, **options):
+        rules = RuleSet.load().rules
+        if options.get('achievement_ids'):
+            rules = [rule for rule in rules if rule.achievement_id in options['achievement_ids']]
+
+        self.stdout.write(f'🏆 Avaliando {len(rules)} conquistas...')
+        total = 0
+        for rule in rules:
+            awarded = backfill_rule(rule, batch_size=options['batch_size'])
+            total += awarded
+            if awarded:
+                self.stdout.write(f'  • Conquista {rule.achievement_id}: {awarded} usuários')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {total} conquistas concedidas')
+        )
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from apps.progress.models import UserStatsSnapshot
+
+
+class Command(BaseCommand):
+    """
+    Recria os snapshots de estatísticas do dashboard em lotes
+    """
+    help = (
+        'Cria e recalcula os snapshots de estatísticas (UserStatsSnapshot) a '
+        'partir das tabelas de progresso, em lotes de usuários'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de usuários por lote'
+        )
+        parser.add_argument(
+            '--user-type',
+            default='child',
+            help="Tipo de usuário a processar ('all' para todos)"
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['user_type'] != 'all':
+            users = users.filter(user_type=options['user_type'])
+
+        batch_size = options['batch_size']
+        user_ids = list(users.values_list('pk', flat=True))
+        self.stdout.write(f'📊 Recalculando snapshots de {len(user_ids)} usuários...')
+
+        for start in range(0, len(user_ids), batch_size):
+            UserStatsSnapshot.rebuild(user_ids[start:start + batch_size])
+            self.stdout.write(f'  • {min(start + batch_size, len(user_ids))}/{len(user_ids)}')
+
+        self.stdout.write(
+            self.style.SUCCESS('✅ Snapshots recalculados')
+        )
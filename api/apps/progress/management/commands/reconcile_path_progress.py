@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from apps.learning.models import Lesson
+from apps.progress.models import LearningPathProgress, LessonProgress
+
+
+class Command(BaseCommand):
+    """
+    Corrige divergências nos contadores incrementais de LearningPathProgress
+    """
+    help = (
+        'Recalcula completed_lessons, total_published_lessons e o percentual de '
+        'progresso dos caminhos cujos contadores divergem das lições'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='path_slugs',
+            help='Slug do caminho a reconciliar (pode ser repetido)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas informa as divergências, sem corrigi-las'
+        )
+
+    def handle(self, *args, **options):
+        published_lessons = Lesson.objects.filter(
+            learning_path=OuterRef('learning_path'),
+            is_published=True
+        ).order_by().values('learning_path').annotate(total=Count('pk')).values('total')
+        completed_lessons = LessonProgress.objects.filter(
+            user=OuterRef('user'),
+            lesson__learning_path=OuterRef('learning_path'),
+            lesson__is_published=True,
+            status='completed'
+        ).order_by().values('user').annotate(total=Count('pk')).values('total')
+
+        queryset = LearningPathProgress.objects.all()
+        if options.get('path_slugs'):
+            queryset = queryset.filter(learning_path__slug__in=options['path_slugs'])
+
+        drifted = queryset.annotate(
+            actual_total=Coalesce(Subquery(published_lessons), 0),
+            actual_completed=Coalesce(Subquery(completed_lessons), 0)
+        ).filter(
+            ~Q(total_published_lessons=F('actual_total'))
+            | ~Q(completed_lessons=F('actual_completed'))
+        )
+        drifted_rows = drifted.count()
+        drifted_paths = set(drifted.values_list('learning_path_id', flat=True))
+
+        self.stdout.write(
+            f'🔍 {drifted_rows} progressos divergentes em {len(drifted_paths)} caminhos'
+        )
+        if options['dry_run'] or not drifted_paths:
+            return
+
+        updated = LearningPathProgress.refresh_counters(drifted_paths)
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {updated} progressos recalculados')
+        )
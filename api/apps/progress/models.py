@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Least
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.learning.models import LearningPath, Lesson, Quiz, Question, Answer, Achievement
 import uuid
@@ -59,6 +62,18 @@ class LearningPathProgress(models.Model):
         default=0,
         verbose_name='Tempo total gasto (minutos)'
     )
+    completed_lessons = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Lições publicadas concluídas (mantido incrementalmente)',
+        verbose_name='Lições concluídas'
+    )
+    total_published_lessons = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Lições publicadas do caminho (mantido pelos sinais de Lesson)',
+        verbose_name='Total de lições publicadas'
+    )
     favorite = models.BooleanField(default=False, verbose_name='Favorito')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
@@ -72,34 +87,135 @@ class LearningPathProgress(models.Model):
             models.Index(fields=['user']),
             models.Index(fields=['status']),
             models.Index(fields=['last_activity_at']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.learning_path.title} ({self.progress_percentage}%)"
     
     def update_progress(self):
-        """Atualiza o percentual de progresso baseado nas lições concluídas"""
-        total_lessons = self.learning_path.lessons.filter(is_published=True).count()
-        if total_lessons > 0:
-            completed_lessons = LessonProgress.objects.filter(
-                user=self.user,
-                lesson__learning_path=self.learning_path,
-                status='completed'
-            ).count()
-            self.progress_percentage = int((completed_lessons / total_lessons) * 100)
+        """
+        Recalcula contadores e percentual a partir das lições (recontagem
+        completa; o caminho comum é record_lesson_completed)
+        """
+        published_lessons = self.learning_path.lessons.filter(is_published=True)
+        self.total_published_lessons = published_lessons.count()
+        self.completed_lessons = LessonProgress.objects.filter(
+            user=self.user,
+            lesson__in=published_lessons,
+            status='completed'
+        ).count()
+        
+        if self.total_published_lessons > 0:
+            self.progress_percentage = min(
+                100, int((self.completed_lessons / self.total_published_lessons) * 100)
+            )
             
             if self.progress_percentage == 100:
                 self.status = 'completed'
                 if not self.completed_at:
-                    from django.utils import timezone
                     self.completed_at = timezone.now()
             elif self.progress_percentage > 0:
                 self.status = 'in_progress'
                 if not self.started_at:
-                    from django.utils import timezone
                     self.started_at = timezone.now()
-            
-            self.save()
+        
+        self.save()
+    
+    @classmethod
+    def record_lesson_completed(cls, user, lesson):
+        """
+        Registra a conclusão de uma lição publicada com um único UPDATE atômico
+        (F()), sem recontar as lições do caminho. Linhas inexistentes ou ainda
+        sem contadores (total zerado) caem na recontagem completa.
+        """
+        now = timezone.now()
+        completed = F('completed_lessons') + 1
+        is_complete = Q(completed_lessons__gte=F('total_published_lessons') - 1)
+        
+        updated = 0
+        if lesson.is_published:
+            updated = cls.objects.filter(
+                user=user,
+                learning_path_id=lesson.learning_path_id,
+                total_published_lessons__gt=0
+            ).update(
+                completed_lessons=completed,
+                progress_percentage=Least(
+                    completed * 100 / F('total_published_lessons'), Value(100)
+                ),
+                status=Case(
+                    When(is_complete, then=Value('completed')),
+                    default=Value('in_progress')
+                ),
+                started_at=Coalesce(F('started_at'), Value(now)),
+                completed_at=Case(
+                    When(is_complete, then=Coalesce(F('completed_at'), Value(now))),
+                    default=F('completed_at')
+                ),
+                last_activity_at=now,
+                updated_at=now
+            )
+        
+        if not updated:
+            path_progress, _ = cls.objects.get_or_create(
+                user=user,
+                learning_path_id=lesson.learning_path_id
+            )
+            path_progress.update_progress()
+    
+    @classmethod
+    def refresh_counters(cls, learning_path_ids=None):
+        """
+        Recalcula contadores, percentual e status em lote com dois UPDATEs
+        (lições publicadas/removidas e comando reconcile_path_progress).
+        Caminhos concluídos que ganharam lições (ou ficaram sem nenhuma)
+        voltam a 'in_progress'.
+        """
+        published_lessons = Lesson.objects.filter(
+            learning_path=OuterRef('learning_path'),
+            is_published=True
+        ).order_by().values('learning_path').annotate(total=Count('pk')).values('total')
+        completed_lessons = LessonProgress.objects.filter(
+            user=OuterRef('user'),
+            lesson__learning_path=OuterRef('learning_path'),
+            lesson__is_published=True,
+            status='completed'
+        ).order_by().values('user').annotate(total=Count('pk')).values('total')
+        
+        queryset = cls.objects.all()
+        if learning_path_ids is not None:
+            queryset = queryset.filter(learning_path_id__in=learning_path_ids)
+        
+        updated = queryset.update(
+            total_published_lessons=Coalesce(Subquery(published_lessons), 0),
+            completed_lessons=Coalesce(Subquery(completed_lessons), 0)
+        )
+        
+        now = timezone.now()
+        is_complete = Q(
+            total_published_lessons__gt=0,
+            completed_lessons__gte=F('total_published_lessons')
+        )
+        queryset.update(
+            progress_percentage=Case(
+                When(total_published_lessons=0, then=Value(0)),
+                default=Least(
+                    F('completed_lessons') * 100 / F('total_published_lessons'), Value(100)
+                )
+            ),
+            status=Case(
+                When(is_complete, then=Value('completed')),
+                When(status='completed', then=Value('in_progress')),
+                default=F('status')
+            ),
+            completed_at=Case(
+                When(is_complete, then=Coalesce(F('completed_at'), Value(now))),
+                default=Value(None)
+            ),
+            updated_at=now
+        )
+        return updated
 
 
 class LessonProgress(models.Model):
@@ -176,19 +292,28 @@ class LessonProgress(models.Model):
     
     def mark_completed(self):
         """Marca a lição como concluída"""
+        created = self._state.adding
+        previously_completed = self.status == 'completed' and not created
         self.status = 'completed'
         self.progress_percentage = 100
         if not self.completed_at:
-            from django.utils import timezone
             self.completed_at = timezone.now()
         self.save()
         
-        # Atualiza o progresso do caminho de aprendizado
-        path_progress, _ = LearningPathProgress.objects.get_or_create(
-            user=self.user,
-            learning_path=self.lesson.learning_path
-        )
-        path_progress.update_progress()
+        # Atualiza o progresso do caminho de aprendizado de forma incremental
+        if not previously_completed:
+            LearningPathProgress.record_lesson_completed(self.user, self.lesson)
+            
+            # Linhas novas já foram contadas pelo sinal de post_save
+            UserStatsSnapshot.increment(
+                self.user_id,
+                refresh=['paths_completed'],
+                **({} if created else {'lessons_completed': 1})
+            )
+            
+            # Avaliado após o progresso do caminho para contar caminhos concluídos
+            from .achievements import EVENT_LESSON_COMPLETED, evaluate_achievements
+            evaluate_achievements(self.user_id, EVENT_LESSON_COMPLETED)
 
 
 class QuizAttempt(models.Model):
@@ -450,4 +575,247 @@ class DailyGoal(models.Model):
             streak.update_streak()
             
             return True
-        return False
\ No newline at end of file
+        return False
+
+class TimeTrackingFlush(models.Model):
+    """
+    Registro dos lotes de tempo de estudo já aplicados pelo write-behind
+    (apps.progress.time_tracking), usado para não reaplicar um lote após falhas
+    """
+    batch_id = models.CharField(max_length=32, unique=True, verbose_name='Lote')
+    minutes = models.PositiveIntegerField(default=0, verbose_name='Minutos gravados')
+    flushed_at = models.DateTimeField(auto_now_add=True, verbose_name='Gravado em')
+    
+    class Meta:
+        verbose_name = 'Gravação de Tempo de Estudo'
+        verbose_name_plural = 'Gravações de Tempo de Estudo'
+        db_table = 'time_tracking_flushes'
+        indexes = [
+            models.Index(fields=['flushed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.batch_id} ({self.minutes} min)"
+
+
+class UserStatsSnapshot(models.Model):
+    """
+    Estatísticas do dashboard do usuário (modelo de leitura). Mantido pelos
+    fluxos de progresso com incrementos F() e recontagens em lote; a task
+    reconcile_stats_snapshots corrige periodicamente os snapshots divergentes
+    (alterações pelo admin ou UPDATEs em lote) e o comando
+    rebuild_stats_snapshots recria os snapshots a partir das tabelas.
+    """
+    COUNTER_FIELDS = [
+        'paths_total', 'paths_completed', 'lessons_total', 'lessons_completed',
+        'achievements_total'
+    ]
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats_snapshot',
+        verbose_name='Usuário'
+    )
+    paths_total = models.PositiveIntegerField(default=0, verbose_name='Caminhos iniciados')
+    paths_completed = models.PositiveIntegerField(default=0, verbose_name='Caminhos concluídos')
+    lessons_total = models.PositiveIntegerField(default=0, verbose_name='Lições iniciadas')
+    lessons_completed = models.PositiveIntegerField(default=0, verbose_name='Lições concluídas')
+    achievements_total = models.PositiveIntegerField(default=0, verbose_name='Conquistas')
+    current_streak = models.PositiveIntegerField(default=0, verbose_name='Sequência atual')
+    longest_streak = models.PositiveIntegerField(default=0, verbose_name='Maior sequência')
+    goal_date = models.DateField(null=True, blank=True, verbose_name='Data da meta')
+    goal_minutes = models.PositiveIntegerField(default=0, verbose_name='Meta (minutos)')
+    goal_completed_minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Minutos completados da meta'
+    )
+    goal_achieved = models.BooleanField(default=False, verbose_name='Meta alcançada')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Estatísticas do Usuário'
+        verbose_name_plural = 'Estatísticas dos Usuários'
+        db_table = 'user_stats_snapshots'
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.lessons_completed}/{self.lessons_total} lições"
+    
+    @staticmethod
+    def _count(queryset, user_ref):
+        return Coalesce(Subquery(
+            queryset.filter(user=OuterRef(user_ref)).order_by().values('user').annotate(
+                total=Count('pk')
+            ).values('total')
+        ), 0)
+    
+    @classmethod
+    def metric_expressions(cls, user_ref='user'):
+        """
+        Expressões que recalculam cada contador a partir das tabelas de origem;
+        `user_ref` é o campo da consulta externa com o id do usuário
+        """
+        streak = StudyStreak.objects.filter(user=OuterRef(user_ref))
+        return {
+            'paths_total': cls._count(LearningPathProgress.objects.all(), user_ref),
+            'paths_completed': cls._count(
+                LearningPathProgress.objects.filter(status='completed'), user_ref
+            ),
+            'lessons_total': cls._count(LessonProgress.objects.all(), user_ref),
+            'lessons_completed': cls._count(
+                LessonProgress.objects.filter(status='completed'), user_ref
+            ),
+            'achievements_total': cls._count(UserAchievement.objects.all(), user_ref),
+            'current_streak': Coalesce(Subquery(streak.values('current_streak')[:1]), 0),
+            'longest_streak': Coalesce(Subquery(streak.values('longest_streak')[:1]), 0),
+        }
+    
+    @staticmethod
+    def goal_expressions(day, user_ref='user'):
+        """Expressões com a meta diária do usuário na data informada"""
+        goal = DailyGoal.objects.filter(user=OuterRef(user_ref), date=day)
+        return {
+            'goal_date': Subquery(goal.values('date')[:1]),
+            'goal_minutes': Coalesce(Subquery(goal.values('goal_minutes')[:1]), 0),
+            'goal_completed_minutes': Coalesce(Subquery(goal.values('completed_minutes')[:1]), 0),
+            'goal_achieved': Coalesce(Subquery(goal.values('achieved')[:1]), False),
+        }
+    
+    @staticmethod
+    def progress_changed(user_ids):
+        """Troca os tokens de progresso (caches da família e das recomendações)"""
+        from .tokens import touch_progress
+        touch_progress(user_ids)
+    
+    @classmethod
+    def copy_streak(cls, streak):
+        cls.progress_changed([streak.user_id])
+        return cls.objects.filter(user_id=streak.user_id).update(
+            current_streak=streak.current_streak,
+            longest_streak=streak.longest_streak,
+            updated_at=timezone.now()
+        )
+    
+    @classmethod
+    def increment(cls, user_id, refresh=(), **deltas):
+        """
+        Incrementa contadores do snapshot (e recalcula os campos de `refresh`)
+        com um único UPDATE. Sem snapshot, cria-o já recontado das tabelas,
+        que incluem a alteração sendo contada.
+        """
+        expressions = cls.metric_expressions()
+        cls.progress_changed([user_id])
+        updated = cls.objects.filter(user_id=user_id).update(
+            updated_at=timezone.now(),
+            **{field: expressions[field] for field in refresh},
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated:
+            cls.get_for(user_id)
+        return updated
+    
+    @classmethod
+    def refresh(cls, user_ids, fields=None):
+        """Recalcula contadores dos snapshots existentes com um UPDATE"""
+        expressions = cls.metric_expressions()
+        if fields is not None:
+            expressions = {field: expressions[field] for field in fields}
+        cls.progress_changed(user_ids)
+        return cls.objects.filter(user_id__in=user_ids).update(
+            updated_at=timezone.now(),
+            **expressions
+        )
+    
+    @classmethod
+    def refresh_daily_goal(cls, user_ids, day):
+        """
+        Copia a meta do dia para os snapshots, sem sobrescrever a meta de um
+        dia posterior (gravações atrasadas do tempo de estudo)
+        """
+        cls.progress_changed(user_ids)
+        return cls.objects.filter(user_id__in=user_ids).filter(
+            Q(goal_date__isnull=True) | Q(goal_date__lte=day)
+        ).update(updated_at=timezone.now(), **cls.goal_expressions(day))
+    
+    @classmethod
+    def rebuild(cls, user_ids):
+        """Cria (se necessário) e recalcula por completo os snapshots"""
+        user_ids = list(user_ids)
+        cls.objects.bulk_create([cls(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        cls.refresh(user_ids)
+        cls.refresh_daily_goal(user_ids, timezone.now().date())
+    
+    @classmethod
+    def compute(cls, user_id, day=None):
+        """
+        Calcula as estatísticas direto das tabelas, sem gravar, com três
+        consultas: uma agregação condicional para caminhos, outra para lições
+        e uma leitura do usuário com conquistas, sequência e meta do dia
+        """
+        day = day or timezone.now().date()
+        completed = Q(status='completed')
+        paths = LearningPathProgress.objects.filter(user_id=user_id).aggregate(
+            paths_total=Count('pk'),
+            paths_completed=Count('pk', filter=completed)
+        )
+        lessons = LessonProgress.objects.filter(user_id=user_id).aggregate(
+            lessons_total=Count('pk'),
+            lessons_completed=Count('pk', filter=completed)
+        )
+        expressions = cls.metric_expressions(user_ref='pk')
+        others = User.objects.filter(pk=user_id).values(
+            achievements_total=expressions['achievements_total'],
+            current_streak=expressions['current_streak'],
+            longest_streak=expressions['longest_streak'],
+            **cls.goal_expressions(day, user_ref='pk')
+        ).first() or {}
+        return cls(user_id=user_id, **paths, **lessons, **others)
+    
+    @classmethod
+    def get_for(cls, user_id):
+        """
+        Snapshot do usuário. Sem snapshot gravado, cria a linha, bloqueia-a e
+        só então calcula as estatísticas com compute(), na mesma transação:
+        incrementos concorrentes esperam o lock e são aplicados sobre o
+        resultado, em vez de se perderem entre o cálculo e a gravação
+        """
+        snapshot = cls.objects.filter(user_id=user_id).first()
+        if snapshot is None:
+            with transaction.atomic():
+                cls.objects.bulk_create([cls(user_id=user_id)], ignore_conflicts=True)
+                cls.objects.select_for_update().filter(user_id=user_id).exists()
+                snapshot = cls.compute(user_id)
+                snapshot.save(force_update=True)
+        return snapshot
+    
+    @classmethod
+    def reconcile(cls, batch_size=1000):
+        """
+        Recalcula os snapshots cujos contadores divergem das tabelas de origem,
+        com uma consulta de comparação por lote de usuários. Retorna a
+        quantidade de snapshots corrigidos.
+        """
+        expressions = cls.metric_expressions()
+        actual = {f'actual_{field}': expressions[field] for field in cls.COUNTER_FIELDS}
+        drifted = Q()
+        for field in cls.COUNTER_FIELDS:
+            drifted |= ~Q(**{field: F(f'actual_{field}')})
+        
+        fixed = 0
+        last_user_id = None
+        while True:
+            batch = cls.objects.order_by('user_id')
+            if last_user_id is not None:
+                batch = batch.filter(user_id__gt=last_user_id)
+            user_ids = list(batch.values_list('user_id', flat=True)[:batch_size])
+            if not user_ids:
+                return fixed
+            last_user_id = user_ids[-1]
+            
+            drifted_ids = list(
+                cls.objects.filter(user_id__in=user_ids).annotate(**actual).filter(
+                    drifted
+                ).values_list('user_id', flat=True)
+            )
+            if drifted_ids:
+                fixed += cls.refresh(drifted_ids, cls.COUNTER_FIELDS)
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+from .models import QuizAttempt
+
+
+class QuizSubmissionAnswerSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    answer_id = serializers.IntegerField(required=False, allow_null=True)
+    text_answer = serializers.CharField(required=False, allow_blank=True, default='')
+    time_spent_seconds = serializers.IntegerField(required=False, min_value=0, default=0)
+
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    attempt_id = serializers.UUIDField(required=False, allow_null=True)
+    time_spent_seconds = serializers.IntegerField(required=False, min_value=0, default=0)
+    answers = QuizSubmissionAnswerSerializer(many=True, allow_empty=False)
+
+
+class QuizAttemptResultSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizAttempt
+        fields = [
+            'id', 'attempt_number', 'status', 'score', 'passed',
+            'total_questions', 'correct_answers', 'wrong_answers',
+            'skipped_answers', 'time_spent_seconds', 'started_at',
+            'completed_at'
+        ]
+
+
+class TimeHeartbeatSerializer(serializers.Serializer):
+    lesson_id = serializers.UUIDField()
+    seconds = serializers.IntegerField(min_value=1, max_value=300)
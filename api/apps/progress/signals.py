@@ -0,0 +1,125 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from apps.learning.cache import invalidate_earned_achievements
+from apps.learning.models import Achievement, Lesson
+from .achievements import (
+    EVENT_QUIZ_COMPLETED, EVENT_STREAK_UPDATED, evaluate_achievements, invalidate_rule_set
+)
+from .models import (
+    DailyGoal, LearningPathProgress, LessonProgress, QuizAttempt, StudyStreak,
+    UserAchievement, UserStatsSnapshot
+)
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_previous_publication(sender, instance, **kwargs):
+    """Guarda o status de publicação anterior para detectar mudanças"""
+    instance._previously_published = None
+    if instance.pk and not instance._state.adding:
+        instance._previously_published = Lesson.objects.filter(
+            pk=instance.pk
+        ).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Lesson)
+def refresh_path_progress_on_lesson_save(sender, instance, created, raw=False, **kwargs):
+    """Atualiza o total de lições publicadas no progresso de quem segue o caminho"""
+    if raw:
+        return
+    
+    previously_published = getattr(instance, '_previously_published', None)
+    if previously_published is None:
+        changed = instance.is_published
+    else:
+        changed = previously_published != instance.is_published
+    
+    if changed:
+        LearningPathProgress.refresh_counters([instance.learning_path_id])
+
+
+@receiver(post_delete, sender=Lesson)
+def refresh_path_progress_on_lesson_delete(sender, instance, **kwargs):
+    if instance.is_published:
+        LearningPathProgress.refresh_counters([instance.learning_path_id])
+
+
+@receiver(post_save, sender=QuizAttempt)
+def evaluate_achievements_on_quiz(sender, instance, raw=False, **kwargs):
+    """Avalia as conquistas de quiz quando uma tentativa é concluída"""
+    if raw or instance.status != 'completed':
+        return
+    evaluate_achievements(instance.user_id, EVENT_QUIZ_COMPLETED)
+
+
+@receiver(post_save, sender=StudyStreak)
+def evaluate_achievements_on_streak(sender, instance, raw=False, **kwargs):
+    """Avalia as conquistas de sequência de estudos"""
+    if raw:
+        return
+    evaluate_achievements(instance.user_id, EVENT_STREAK_UPDATED, streak=instance)
+
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def invalidate_achievement_rules(sender, **kwargs):
+    """Recompila as regras das conquistas na próxima avaliação"""
+    invalidate_rule_set()
+
+
+@receiver(post_save, sender=UserAchievement)
+@receiver(post_delete, sender=UserAchievement)
+def invalidate_user_earned_achievements(sender, instance, **kwargs):
+    """Apaga o cache das conquistas obtidas (alterações pelo admin)"""
+    invalidate_earned_achievements([instance.user_id])
+    UserStatsSnapshot.refresh([instance.user_id], ['achievements_total'])
+
+
+@receiver(post_save, sender=LessonProgress)
+def count_lesson_progress_in_snapshot(sender, instance, created, raw=False, **kwargs):
+    """Conta lições iniciadas (as conclusões são contadas por mark_completed)"""
+    if raw or not created:
+        return
+    UserStatsSnapshot.increment(
+        instance.user_id,
+        lessons_total=1,
+        lessons_completed=int(instance.status == 'completed')
+    )
+
+
+@receiver(post_save, sender=LearningPathProgress)
+def count_path_progress_in_snapshot(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        # Percentual, lição atual e favorito aparecem nas recomendações
+        UserStatsSnapshot.progress_changed([instance.user_id])
+        return
+    UserStatsSnapshot.increment(
+        instance.user_id,
+        paths_total=1,
+        paths_completed=int(instance.status == 'completed')
+    )
+
+
+@receiver(post_delete, sender=LessonProgress)
+def recount_lessons_in_snapshot(sender, instance, **kwargs):
+    UserStatsSnapshot.refresh([instance.user_id], ['lessons_total', 'lessons_completed'])
+
+
+@receiver(post_delete, sender=LearningPathProgress)
+def recount_paths_in_snapshot(sender, instance, **kwargs):
+    UserStatsSnapshot.refresh([instance.user_id], ['paths_total', 'paths_completed'])
+
+
+@receiver(post_save, sender=StudyStreak)
+def copy_streak_to_snapshot(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    UserStatsSnapshot.copy_streak(instance)
+
+
+@receiver(post_save, sender=DailyGoal)
+def copy_daily_goal_to_snapshot(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    UserStatsSnapshot.refresh_daily_goal([instance.user_id], instance.date)
@@ -0,0 +1,15 @@
+from celery import shared_task
+from .models import UserStatsSnapshot
+from .time_tracking import flush_pending_time
+
+
+@shared_task(ignore_result=True)
+def flush_time_tracking():
+    """Grava no banco o tempo de estudo acumulado pelos heartbeats"""
+    return flush_pending_time()
+
+
+@shared_task(ignore_result=True)
+def reconcile_stats_snapshots():
+    """Corrige os snapshots do dashboard que divergem das tabelas de progresso"""
+    return UserStatsSnapshot.reconcile()
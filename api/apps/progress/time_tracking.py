@@ -0,0 +1,270 @@
+"""
+Acumulador write-behind para o tempo de estudo enviado pelos heartbeats do
+player.
+
+Cada heartbeat soma segundos em um buffer (hash por usuário no Redis, ou em
+memória quando o cache não é Redis) em vez de atualizar o banco. A task
+flush_time_tracking (Celery beat) aplica periodicamente os totais em
+LessonProgress.time_spent_minutes, LearningPathProgress.total_time_spent_minutes
+e DailyGoal.completed_minutes com UPDATEs em lote com F(). Os segundos que não
+completam um minuto voltam para o buffer. As metas diárias que passam a ser
+cumpridas são avaliadas em seguida (DailyGoal.check_achievement).
+
+Durabilidade: os lotes, o registro em TimeTrackingFlush e a recuperação de
+flushes interrompidos ficam na base apps.common.write_behind; este módulo só
+converte os segundos de cada usuário em minutos e os aplica. O tempo de
+lições, caminhos ou usuários apagados antes do flush é descartado.
+
+Leituras somam os segundos pendentes (get_pending_seconds/get_pending_minutes),
+mantendo a consistência "read-your-writes" para o próprio usuário.
+"""
+from collections import defaultdict
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.common.write_behind import WriteBehind
+
+# Quantidade de condições por UPDATE agrupado
+UPDATE_CHUNK_SIZE = 200
+
+
+def lesson_field(lesson_id):
+    return f'lesson:{lesson_id}'
+
+
+def path_field(learning_path_id):
+    return f'path:{learning_path_id}'
+
+
+def goal_field(day):
+    return f'goal:{day.isoformat()}'
+
+
+class StudyTime(WriteBehind):
+    """Segundos de estudo por usuário, nos campos lesson:/path:/goal:"""
+    name = 'time_tracking'
+    flush_interval_setting = 'TIME_TRACKING_FLUSH_INTERVAL'
+    ledger_model = 'progress.TimeTrackingFlush'
+    ledger_field = 'minutes'
+
+    def prepare(self, deltas):
+        minutes = defaultdict(dict)
+        remainders = defaultdict(dict)
+        for user_id, fields in _drop_missing_references(deltas).items():
+            for field, seconds in fields.items():
+                kind, _, ref = field.partition(':')
+                if seconds >= 60:
+                    minutes[kind][(user_id, ref)] = seconds // 60
+                if seconds % 60:
+                    remainders[user_id][field] = seconds % 60
+
+        total = sum(sum(values.values()) for values in minutes.values())
+        return minutes, total, remainders
+
+    def apply(self, minutes):
+        _apply_minutes(minutes)
+
+
+study_time = StudyTime()
+
+
+def get_time_buffer():
+    return study_time.get_buffer()
+
+
+def record_time(user_id, lesson_id, learning_path_id, seconds, day=None):
+    """Acumula segundos de estudo de uma lição (heartbeat)"""
+    # Mesma data usada pelo dashboard para localizar a DailyGoal do dia
+    day = day or timezone.now().date()
+    study_time.add(user_id, {
+        lesson_field(lesson_id): seconds,
+        path_field(learning_path_id): seconds,
+        goal_field(day): seconds,
+    })
+
+
+def get_pending_seconds(user_id):
+    """Segundos ainda não gravados no banco, por campo (lesson:/path:/goal:)"""
+    return study_time.pending(user_id)
+
+
+def get_pending_minutes(user_id):
+    """
+    Minutos pendentes agrupados por tipo, prontos para somar aos valores do
+    banco: {'lessons': {id: min}, 'paths': {id: min}, 'goals': {data: min}}
+    """
+    grouped = {'lessons': {}, 'paths': {}, 'goals': {}}
+    names = {'lesson': 'lessons', 'path': 'paths', 'goal': 'goals'}
+    for field, seconds in get_pending_seconds(user_id).items():
+        kind, _, ref = field.partition(':')
+        if kind in names and seconds >= 60:
+            grouped[names[kind]][ref] = seconds // 60
+    return grouped
+
+
+def flush_pending_time():
+    """
+    Aplica no banco todo o tempo acumulado (ver WriteBehind.flush). Retorna
+    os minutos gravados.
+    """
+    return study_time.flush()
+
+
+def _drop_missing_references(deltas):
+    """
+    Descarta o tempo de usuários, lições e caminhos apagados depois do
+    heartbeat; gravá-lo violaria as chaves estrangeiras e travaria o lote
+    """
+    from django.contrib.auth import get_user_model
+    from apps.learning.models import LearningPath, Lesson
+
+    refs = defaultdict(set)
+    for fields in deltas.values():
+        for field in fields:
+            kind, _, ref = field.partition(':')
+            refs[kind].add(ref)
+    users = _existing_ids(get_user_model(), deltas)
+    existing = {
+        'lesson': _existing_ids(Lesson, refs['lesson']),
+        'path': _existing_ids(LearningPath, refs['path']),
+    }
+
+    kept = {}
+    for user_id, fields in deltas.items():
+        if str(user_id) not in users:
+            continue
+        kept[user_id] = {}
+        for field, seconds in fields.items():
+            kind, _, ref = field.partition(':')
+            if kind not in existing or ref in existing[kind]:
+                kept[user_id][field] = seconds
+    return kept
+
+
+def _existing_ids(model, ids):
+    ids = [str(pk) for pk in ids]
+    existing = set()
+    for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+        existing.update(
+            str(pk)
+            for pk in model.objects.filter(
+                pk__in=ids[start:start + UPDATE_CHUNK_SIZE]
+            ).values_list('pk', flat=True)
+        )
+    return existing
+
+
+def _apply_minutes(minutes):
+    from apps.accounts.models import UserSettings
+    from .models import DailyGoal, LearningPathProgress, LessonProgress, UserStatsSnapshot
+
+    now = timezone.now()
+
+    lessons = minutes.get('lesson', {})
+    if lessons:
+        existing = _existing_pairs(LessonProgress, 'lesson_id', lessons)
+        _bulk_increment(
+            LessonProgress, 'lesson_id', 'time_spent_minutes', lessons, existing, now
+        )
+        created = LessonProgress.objects.bulk_create([
+            LessonProgress(
+                user_id=user_id, lesson_id=lesson_id, status='in_progress',
+                started_at=now, time_spent_minutes=value
+            )
+            for (user_id, lesson_id), value in lessons.items()
+            if (user_id, lesson_id) not in existing
+        ], ignore_conflicts=True)
+        if created:
+            UserStatsSnapshot.refresh({row.user_id for row in created}, ['lessons_total'])
+
+    paths = minutes.get('path', {})
+    if paths:
+        existing = _existing_pairs(LearningPathProgress, 'learning_path_id', paths)
+        _bulk_increment(
+            LearningPathProgress, 'learning_path_id', 'total_time_spent_minutes', paths,
+            existing, now
+        )
+        created = LearningPathProgress.objects.bulk_create([
+            LearningPathProgress(
+                user_id=user_id, learning_path_id=path_id, status='in_progress',
+                started_at=now, total_time_spent_minutes=value
+            )
+            for (user_id, path_id), value in paths.items()
+            if (user_id, path_id) not in existing
+        ], ignore_conflicts=True)
+        if created:
+            UserStatsSnapshot.refresh({row.user_id for row in created}, ['paths_total'])
+
+    goals = minutes.get('goal', {})
+    if goals:
+        existing = _existing_pairs(DailyGoal, 'date', goals)
+        _bulk_increment(DailyGoal, 'date', 'completed_minutes', goals, existing, now)
+        missing = [pair for pair in goals if pair not in existing]
+        if missing:
+            goal_minutes = {
+                str(user_id): value
+                for user_id, value in UserSettings.objects.filter(
+                    user_id__in={user_id for user_id, _ in missing}
+                ).values_list('user_id', 'daily_goal_minutes')
+            }
+            DailyGoal.objects.bulk_create([
+                DailyGoal(
+                    user_id=user_id, date=day, completed_minutes=goals[(user_id, day)],
+                    goal_minutes=goal_minutes.get(user_id, 15)
+                )
+                for user_id, day in missing
+            ], ignore_conflicts=True)
+
+        # Os UPDATEs em lote não passam por check_achievement: avalia apenas as
+        # metas que acabaram de atingir o tempo e as lições exigidos
+        for condition in _pair_conditions(goals, 'date'):
+            for goal in DailyGoal.objects.filter(condition).filter(
+                achieved=False,
+                completed_minutes__gte=F('goal_minutes'),
+                lessons_completed__gte=F('lessons_goal')
+            ).select_related('user'):
+                goal.check_achievement()
+
+        # Os UPDATEs em lote não disparam sinais: copia as metas para os snapshots
+        users_by_day = defaultdict(set)
+        for user_id, day in goals:
+            users_by_day[day].add(user_id)
+        for day, user_ids in users_by_day.items():
+            UserStatsSnapshot.refresh_daily_goal(user_ids, day)
+
+
+def _pair_conditions(pairs, ref_field):
+    pairs = list(pairs)
+    for start in range(0, len(pairs), UPDATE_CHUNK_SIZE):
+        condition = Q()
+        for user_id, ref in pairs[start:start + UPDATE_CHUNK_SIZE]:
+            condition |= Q(user_id=user_id, **{ref_field: ref})
+        yield condition
+
+
+def _existing_pairs(model, ref_field, values):
+    existing = set()
+    for condition in _pair_conditions(values, ref_field):
+        existing.update(
+            (str(user_id), str(ref))
+            for user_id, ref in model.objects.filter(condition).values_list('user_id', ref_field)
+        )
+    return existing
+
+
+def _bulk_increment(model, ref_field, target_field, values, existing, now):
+    """
+    Um UPDATE com F() para cada valor distinto de incremento (em blocos).
+    updated_at é gravado junto: os ETags de progresso dependem dele.
+    """
+    by_delta = defaultdict(list)
+    for pair, delta in values.items():
+        if pair in existing:
+            by_delta[delta].append(pair)
+
+    for delta, pairs in by_delta.items():
+        for condition in _pair_conditions(pairs, ref_field):
+            model.objects.filter(condition).update(
+                **{target_field: F(target_field) + delta}, updated_at=now
+            )
@@ -0,0 +1,33 @@
+"""
+Tokens de progresso por usuário, trocados sempre que o progresso muda (ver
+UserStatsSnapshot.progress_changed). Caches derivados do progresso, como a
+visão geral da família e as recomendações, incluem o token na chave e por isso
+não precisam ser apagados um a um.
+"""
+import uuid
+
+from django.core.cache import cache
+
+
+def _progress_token_key(user_id):
+    return f'progress:token:{user_id}'
+
+
+def touch_progress(user_ids):
+    """Marca o progresso dos usuários como alterado (uma escrita no cache)"""
+    token = uuid.uuid4().hex
+    cache.set_many(
+        {_progress_token_key(user_id): token for user_id in user_ids},
+        timeout=None
+    )
+
+
+def get_progress_tokens(user_ids):
+    """Tokens atuais por usuário ('' para quem ainda não tem token)"""
+    keys = {_progress_token_key(user_id): user_id for user_id in user_ids}
+    tokens = cache.get_many(list(keys))
+    return {user_id: tokens.get(key, '') for key, user_id in keys.items()}
+
+
+def get_progress_token(user_id):
+    return get_progress_tokens([user_id])[user_id]
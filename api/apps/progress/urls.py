@@ -1,8 +1,12 @@
 from django.urls import path
+from . import views
 
 app_name = 'progress'
 
 urlpatterns = [
-    # URLs para progresso (tracking de lições, quizzes, conquistas)
-    # TODO: Implementar views para o app de progresso
-]
\ No newline at end of file
+    # Quizzes
+    path('lessons/<uuid:lesson_id>/quiz/submit/', views.QuizSubmitView.as_view(), name='quiz_submit'),
+    
+    # Tempo de estudo
+    path('heartbeat/', views.TimeHeartbeatView.as_view(), name='time_heartbeat'),
+]
@@ -0,0 +1,124 @@
+from rest_framework import generics, status, permissions
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema, OpenApiExample
+from drf_spectacular.openapi import OpenApiTypes
+from apps.learning.cache import get_lesson_path_id, get_quiz_answer_key
+from apps.learning.models import Quiz
+from .grading import submit_quiz_attempt
+from .serializers import (
+    QuizSubmissionSerializer, QuizAttemptResultSerializer, TimeHeartbeatSerializer
+)
+from .time_tracking import get_pending_seconds, lesson_field, record_time
+
+
+@extend_schema(
+    tags=['progress'],
+    summary='Enviar respostas de um quiz',
+    description='''
+    Envia todas as respostas de uma tentativa de quiz de uma só vez.
+    
+    As respostas são corrigidas no servidor e gravadas em lote. Sem `attempt_id`
+    uma nova tentativa é criada (respeitando o máximo de tentativas do quiz).
+    Perguntas não enviadas contam como puladas.
+    ''',
+    request=QuizSubmissionSerializer,
+    responses={201: QuizAttemptResultSerializer},
+    examples=[
+        OpenApiExample(
+            'Envio de respostas',
+            value={
+                'time_spent_seconds': 95,
+                'answers': [
+                    {'question_id': 1, 'answer_id': 3},
+                    {'question_id': 2, 'text_answer': 'Noé'}
+                ]
+            },
+            request_only=True
+        )
+    ]
+)
+class QuizSubmitView(APIView):
+    """
+    Envio em lote das respostas de uma tentativa de quiz
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, lesson_id):
+        quiz = generics.get_object_or_404(
+            Quiz,
+            lesson_id=lesson_id,
+            lesson__is_published=True
+        )
+        
+        serializer = QuizSubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        attempt, graded = submit_quiz_attempt(
+            request.user,
+            quiz,
+            data['answers'],
+            time_spent_seconds=data['time_spent_seconds'],
+            attempt_id=data.get('attempt_id')
+        )
+        
+        result = QuizAttemptResultSerializer(attempt).data
+        result['results'] = [{
+            'question_id': item['question_id'],
+            'is_correct': item['is_correct'],
+            'points_earned': item['points_earned'],
+        } for item in graded]
+        
+        if quiz.show_correct_answers:
+            answer_key = get_quiz_answer_key(quiz)
+            for item in result['results']:
+                item['correct_answer_ids'] = [
+                    answer_id
+                    for answer_id, is_correct in answer_key[item['question_id']]['answers'].items()
+                    if is_correct
+                ]
+        
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    tags=['progress'],
+    summary='Heartbeat de tempo de estudo',
+    description='''
+    Registra segundos de estudo em uma lição (até 300 por chamada).
+    
+    O tempo é acumulado fora do banco e gravado periodicamente em lote no
+    progresso da lição, do caminho e na meta diária. As leituras de progresso
+    do próprio usuário já somam o tempo pendente.
+    ''',
+    request=TimeHeartbeatSerializer,
+    responses={202: OpenApiTypes.OBJECT}
+)
+class TimeHeartbeatView(APIView):
+    """
+    Acumula o tempo de estudo enviado pelo player
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = TimeHeartbeatSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lesson_id = str(serializer.validated_data['lesson_id'])
+        
+        learning_path_id = get_lesson_path_id(lesson_id)
+        if learning_path_id is None:
+            raise NotFound('Lição não encontrada')
+        
+        record_time(
+            request.user.pk,
+            lesson_id,
+            str(learning_path_id),
+            serializer.validated_data['seconds']
+        )
+        
+        return Response({
+            'lesson_id': lesson_id,
+            'pending_seconds': get_pending_seconds(request.user.pk).get(lesson_field(lesson_id), 0)
+        }, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,73 @@
+"""
+Análise de texto para a busca: normalização, tokenização, stopwords e um
+stemmer leve para português (redução de plural, gênero, diminutivos e
+advérbios, no estilo do RSLP).
+
+Documentos e consultas passam pelo mesmo analisador, por isso os termos
+gravados em SearchDocument já estão normalizados e os backends só precisam
+comparar termos exatos.
+"""
+import re
+
+from apps.common.text import fold
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset(fold(word) for word in '''
+    a ao aos aquela aquelas aquele aqueles aquilo as até com como da das de
+    dela delas dele deles depois do dos e ela elas ele eles em entre era essa
+    essas esse esses esta estas este estes eu isso isto já lhe lhes mais mas
+    me mesmo meu meus minha minhas muito na nas nem no nos nossa nossas nosso
+    nossos num numa o os ou para pela pelas pelo pelos por qual quando que
+    quem se sem seu seus só sua suas também te teu tu tua um uma umas uns
+    você vocês vos
+'''.split())
+
+# (sufixo, substituição, tamanho mínimo do radical), aplicados na ordem
+PLURAL_RULES = [
+    ('oes', 'ao', 1), ('aes', 'ao', 1), ('ais', 'al', 1), ('eis', 'el', 2),
+    ('ois', 'ol', 1), ('ns', 'm', 1), ('res', 'r', 2), ('zes', 'z', 2),
+    ('ses', 's', 2), ('is', 'il', 2), ('s', '', 2),
+]
+FEMININE_RULES = [
+    ('ona', 'ao', 2), ('ora', 'or', 2), ('osa', 'oso', 2), ('iva', 'ivo', 2),
+    ('ada', 'ado', 2), ('ida', 'ido', 2), ('ica', 'ico', 2), ('eira', 'eiro', 2),
+]
+DIMINUTIVE_RULES = [
+    ('zinhos', '', 2), ('zinhas', '', 2), ('zinho', '', 2), ('zinha', '', 2),
+    ('inho', 'o', 3), ('inha', 'a', 3), ('issimo', '', 3), ('issima', '', 3),
+]
+ADVERB_RULES = [('mente', '', 4)]
+
+
+def _apply_first(word, rules):
+    for suffix, replacement, min_stem in rules:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def stem(word):
+    """Reduz uma palavra (já normalizada) ao seu radical aproximado"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if not word.endswith(('ss', 'us')):
+        word = _apply_first(word, PLURAL_RULES)
+    word = _apply_first(word, ADVERB_RULES)
+    word = _apply_first(word, DIMINUTIVE_RULES)
+    word = _apply_first(word, FEMININE_RULES)
+    return word
+
+
+def analyze(text):
+    """Converte um texto na lista de termos indexáveis"""
+    return [
+        stem(token)
+        for token in TOKEN_RE.findall(fold(text))
+        if token not in STOPWORDS
+    ]
+
+
+def analyze_to_string(*texts):
+    """Termos de vários textos concatenados, no formato gravado em SearchDocument"""
+    return ' '.join(term for text in texts for term in analyze(text))
@@ -0,0 +1,287 @@
+"""
+Backends de busca sobre a tabela SearchDocument.
+
+- PostgresSearchBackend: tsvector ponderado (A/B/C) sobre os termos já
+  analisados, com índice GIN de expressão e ranking por ts_rank.
+- InMemorySearchBackend: índice invertido em memória (fallback para SQLite e
+  testes offline), com os mesmos pesos do ts_rank.
+
+Os dois recebem termos já normalizados por apps.search.analysis e aplicam
+semântica E (todos os termos precisam aparecer no documento).
+
+Para as listagens (FullTextSearchFilter), annotate_rank() filtra e anota um
+queryset com a relevância: no PostgreSQL o ranking fica no banco (subconsultas
+em SearchDocument), sem trazer os ids para o Python; o índice em memória só
+consegue informar os ids, então anota os SEARCH_FILTER_MAX_RESULTS mais
+relevantes.
+"""
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (
+    BooleanField, CharField, F, FloatField, Func, OuterRef, Subquery, Value
+)
+from django.db.models.functions import Cast, Concat, StrIndex
+
+from .models import SearchDocument
+
+# Pesos padrão do ts_rank do PostgreSQL para A, B e C
+FIELD_WEIGHTS = (1.0, 0.4, 0.2)
+
+RESULT_FIELDS = ['kind', 'object_id', 'title', 'slug', 'parent_slug']
+
+VECTOR_TEMPLATE = (
+    "(setweight(to_tsvector('simple', {}), 'A') || "
+    "setweight(to_tsvector('simple', {}), 'B') || "
+    "setweight(to_tsvector('simple', {}), 'C'))"
+)
+
+
+class WeightedVector(Func):
+    """
+    tsvector ponderado dos termos de SearchDocument. Compila as colunas com o
+    alias da consulta, o que permite usá-lo também dentro de subconsultas.
+    """
+    output_field = CharField()
+
+    def __init__(self):
+        super().__init__(F('terms_a'), F('terms_b'), F('terms_c'))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        columns, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            columns.append(sql)
+            params.extend(expression_params)
+        return VECTOR_TEMPLATE.format(*columns), params
+
+
+class TsQuery(Func):
+    template = "to_tsquery('simple', %(expressions)s)"
+    output_field = CharField()
+
+
+class TsMatch(Func):
+    arg_joiner = ' @@ '
+    template = '(%(expressions)s)'
+    output_field = BooleanField()
+
+
+class TsRank(Func):
+    function = 'ts_rank'
+    output_field = FloatField()
+
+
+class PostgresSearchBackend:
+    """
+    Busca com tsvector. WeightedVector é a mesma expressão do índice GIN criado
+    por ensure_index(), o que permite ao planner usá-lo.
+    """
+    GIN_INDEX_NAME = 'search_documents_vector_gin'
+    VECTOR_SQL = VECTOR_TEMPLATE.format('"terms_a"', '"terms_b"', '"terms_c"')
+
+    def ensure_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {self.GIN_INDEX_NAME} '
+                f'ON search_documents USING gin ({self.VECTOR_SQL})'
+            )
+
+    def _matching(self, terms, kinds=None):
+        """Documentos publicados com todos os termos, anotados com o ts_rank"""
+        tsquery = TsQuery(Value(' & '.join(terms)))
+        queryset = SearchDocument.objects.filter(
+            TsMatch(WeightedVector(), tsquery), is_published=True
+        ).annotate(rank=TsRank(WeightedVector(), tsquery))
+        if kinds:
+            queryset = queryset.filter(kind__in=kinds)
+        return queryset
+
+    def search(self, terms, kinds=None, limit=20):
+        return list(
+            self._matching(terms, kinds).order_by('-rank', 'title').values(
+                *RESULT_FIELDS, 'rank'
+            )[:limit]
+        )
+
+    def annotate_rank(self, queryset, terms, kind, annotation):
+        """
+        Filtra o queryset pelos documentos encontrados (subconsulta que usa o
+        índice GIN) e anota o ts_rank negado, de modo que a ordem crescente
+        da anotação vá do mais relevante ao menos relevante
+        """
+        documents = self._matching(terms, kinds=[kind])
+        pk_field = queryset.model._meta.pk.__class__()
+        object_rank = documents.filter(
+            object_id=Cast(OuterRef('pk'), output_field=CharField())
+        ).values('rank')[:1]
+        return queryset.filter(
+            pk__in=documents.values(object_pk=Cast('object_id', output_field=pk_field))
+        ).annotate(**{annotation: -Subquery(object_rank, output_field=FloatField())})
+
+    def document_changed(self, document):
+        pass
+
+    def document_removed(self, kind, object_id):
+        pass
+
+
+class InMemorySearchBackend:
+    """
+    Índice invertido em memória: termo -> {documento: (tf_a, tf_b, tf_c)}.
+    Carregado sob demanda a partir de SearchDocument, mantido pelos sinais do
+    próprio processo e recarregado a cada SEARCH_INDEX_TTL segundos.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self._document_terms = {}
+        self._built_at = None
+
+    def ensure_index(self):
+        self.rebuild()
+
+    def rebuild(self):
+        postings = defaultdict(dict)
+        documents = {}
+        document_terms = {}
+        for row in SearchDocument.objects.filter(is_published=True).values(
+            *RESULT_FIELDS, 'terms_a', 'terms_b', 'terms_c'
+        ).iterator():
+            self._add(postings, documents, document_terms, row)
+
+        with self._lock:
+            self._postings = postings
+            self._documents = documents
+            self._document_terms = document_terms
+            self._built_at = time.monotonic()
+
+    @staticmethod
+    def _add(postings, documents, document_terms, row):
+        key = (row['kind'], row['object_id'])
+        documents[key] = {field: row[field] for field in RESULT_FIELDS}
+        counters = [Counter(row[field].split()) for field in ('terms_a', 'terms_b', 'terms_c')]
+        terms = set().union(*counters)
+        document_terms[key] = terms
+        for term in terms:
+            postings[term][key] = tuple(counter[term] for counter in counters)
+
+    def _remove(self, key):
+        self._documents.pop(key, None)
+        for term in self._document_terms.pop(key, ()):
+            entries = self._postings.get(term)
+            if entries is not None:
+                entries.pop(key, None)
+                if not entries:
+                    del self._postings[term]
+
+    def document_changed(self, document):
+        with self._lock:
+            if self._built_at is None:
+                return
+            key = (document.kind, document.object_id)
+            self._remove(key)
+            if document.is_published:
+                self._add(self._postings, self._documents, self._document_terms, {
+                    'kind': document.kind,
+                    'object_id': document.object_id,
+                    'title': document.title,
+                    'slug': document.slug,
+                    'parent_slug': document.parent_slug,
+                    'terms_a': document.terms_a,
+                    'terms_b': document.terms_b,
+                    'terms_c': document.terms_c,
+                })
+
+    def document_removed(self, kind, object_id):
+        with self._lock:
+            if self._built_at is not None:
+                self._remove((kind, object_id))
+
+    def _ensure_fresh(self):
+        ttl = getattr(settings, 'SEARCH_INDEX_TTL', 300)
+        if self._built_at is None or time.monotonic() - self._built_at > ttl:
+            self.rebuild()
+
+    def search(self, terms, kinds=None, limit=20):
+        self._ensure_fresh()
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in dict.fromkeys(terms)]
+            if not postings or not all(postings):
+                return []
+
+            total = len(self._documents)
+            candidates = set(min(postings, key=len))
+            for entries in postings:
+                candidates &= entries.keys()
+
+            results = []
+            for key in candidates:
+                if kinds and key[0] not in kinds:
+                    continue
+                score = 0.0
+                for entries in postings:
+                    idf = math.log(1 + total / len(entries))
+                    score += idf * sum(
+                        weight * tf / (tf + 1.2)
+                        for weight, tf in zip(FIELD_WEIGHTS, entries[key])
+                    )
+                results.append(dict(self._documents[key], rank=score))
+
+        results.sort(key=lambda result: (-result['rank'], result['title']))
+        return results[:limit]
+
+    def annotate_rank(self, queryset, terms, kind, annotation):
+        """
+        Filtra o queryset pelos SEARCH_FILTER_MAX_RESULTS documentos mais
+        relevantes e anota a posição de cada um em uma lista dos ids em ordem
+        de relevância (StrIndex), que cresce do mais ao menos relevante. O
+        limite mantém os parâmetros do SQL pequenos; este backend atende
+        desenvolvimento e testes, não produção.
+        """
+        limit = getattr(settings, 'SEARCH_FILTER_MAX_RESULTS', 200)
+        pk_field = queryset.model._meta.pk
+        object_pks = [
+            pk_field.to_python(result['object_id'])
+            for result in self.search(terms, kinds=[kind], limit=limit)
+        ]
+        if not object_pks:
+            return queryset.none()
+        # Mesma representação do CAST da chave primária no banco
+        ranked_ids = ','.join(
+            str(pk_field.get_db_prep_value(pk, connection)) for pk in object_pks
+        )
+        rank = StrIndex(
+            Value(f',{ranked_ids},'),
+            Concat(Value(','), Cast('pk', output_field=CharField()), Value(','))
+        )
+        return queryset.filter(pk__in=object_pks).annotate(**{annotation: rank})
+
+_backends = {}
+
+
+def get_search_backend():
+    """
+    Retorna o backend configurado em SEARCH_BACKEND ('postgres' ou 'memory');
+    sem configuração, usa PostgreSQL quando disponível
+    """
+    name = getattr(settings, 'SEARCH_BACKEND', '') or (
+        'postgres' if connection.vendor == 'postgresql' else 'memory'
+    )
+    if name not in _backends:
+        _backends[name] = (
+            PostgresSearchBackend() if name == 'postgres' else InMemorySearchBackend()
+        )
+    return _backends[name]
+
+
+def search(terms, kinds=None, limit=20):
+    if not terms:
+        return []
+    return get_search_backend().search(terms, kinds=kinds, limit=limit)
@@ -0,0 +1,187 @@
+"""
+Registro dos tipos de conteúdo pesquisáveis e construção dos SearchDocument.
+
+Cada tipo define quais campos entram em cada peso:
+A (título), B (resumo, tags, descrição) e C (corpo do conteúdo).
+"""
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from .analysis import analyze_to_string
+from .models import SearchDocument
+
+
+def _text(value):
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return value or ''
+
+
+def _learning_path_fields(path):
+    return {
+        'title': path.title,
+        'slug': path.slug,
+        'parent_slug': '',
+        'is_published': path.is_published,
+        'a': [path.title],
+        'b': [path.description, path.tags],
+        'c': [_text(path.objectives)],
+    }
+
+
+def _lesson_fields(lesson):
+    return {
+        'title': lesson.title,
+        'slug': lesson.slug,
+        'parent_slug': lesson.learning_path.slug,
+        'is_published': lesson.is_published and lesson.learning_path.is_published,
+        'a': [lesson.title],
+        'b': [lesson.description, _text(lesson.key_concepts)],
+        'c': [lesson.content],
+    }
+
+
+def _story_fields(story):
+    return {
+        'title': story.title,
+        'slug': story.slug,
+        'parent_slug': '',
+        'is_published': story.is_published,
+        'a': [story.title],
+        'b': [story.summary, story.tags, story.moral_lesson],
+        'c': [story.content],
+    }
+
+
+def _prayer_fields(prayer):
+    return {
+        'title': prayer.title,
+        'slug': '',
+        'parent_slug': '',
+        'is_published': prayer.is_published,
+        'a': [prayer.title],
+        'b': [prayer.get_prayer_type_display()],
+        'c': [prayer.text],
+    }
+
+
+def _song_fields(song):
+    return {
+        'title': song.title,
+        'slug': song.slug,
+        'parent_slug': '',
+        'is_published': song.is_published,
+        'a': [song.title],
+        'b': [song.artist, song.teaching_notes],
+        'c': [song.lyrics],
+    }
+
+
+def _activity_fields(activity):
+    return {
+        'title': activity.title,
+        'slug': activity.slug,
+        'parent_slug': '',
+        'is_published': activity.is_published,
+        'a': [activity.title],
+        'b': [activity.description, activity.bible_connection],
+        'c': [activity.instructions],
+    }
+
+
+# kind -> (modelo, função de campos, select_related)
+DOCUMENT_TYPES = {
+    'learning_path': ('learning.LearningPath', _learning_path_fields, []),
+    'lesson': ('learning.Lesson', _lesson_fields, ['learning_path']),
+    'story': ('content.Story', _story_fields, []),
+    'prayer': ('content.Prayer', _prayer_fields, []),
+    'song': ('content.Song', _song_fields, []),
+    'activity': ('content.Activity', _activity_fields, []),
+}
+
+
+def kind_for_model(model):
+    label = model._meta.label
+    for kind, (model_label, _, _) in DOCUMENT_TYPES.items():
+        if model_label == label:
+            return kind
+    return None
+
+
+def build_document(kind, instance):
+    """Monta (sem salvar) o SearchDocument de um objeto"""
+    fields = DOCUMENT_TYPES[kind][1](instance)
+    return SearchDocument(
+        kind=kind,
+        object_id=str(instance.pk),
+        title=fields['title'][:200],
+        slug=fields['slug'],
+        parent_slug=fields['parent_slug'],
+        is_published=fields['is_published'],
+        terms_a=analyze_to_string(*fields['a']),
+        terms_b=analyze_to_string(*fields['b']),
+        terms_c=analyze_to_string(*fields['c']),
+        updated_at=timezone.now(),
+    )
+
+
+DOCUMENT_FIELDS = [
+    'title', 'slug', 'parent_slug', 'is_published',
+    'terms_a', 'terms_b', 'terms_c', 'updated_at'
+]
+
+
+def index_objects(kind, instances):
+    """Cria ou atualiza os documentos de vários objetos do mesmo tipo em lote"""
+    from .backends import get_search_backend
+
+    documents = [build_document(kind, instance) for instance in instances]
+    if not documents:
+        return 0
+
+    with transaction.atomic():
+        existing = dict(
+            SearchDocument.objects.filter(
+                kind=kind,
+                object_id__in=[document.object_id for document in documents]
+            ).values_list('object_id', 'pk')
+        )
+        to_update = []
+        to_create = []
+        for document in documents:
+            document.pk = existing.get(document.object_id)
+            (to_update if document.pk else to_create).append(document)
+
+        SearchDocument.objects.bulk_create(to_create)
+        SearchDocument.objects.bulk_update(to_update, DOCUMENT_FIELDS)
+
+    backend = get_search_backend()
+    for document in documents:
+        backend.document_changed(document)
+    return len(documents)
+
+
+def index_object(kind, instance):
+    return index_objects(kind, [instance])
+
+
+def remove_object(kind, object_id):
+    from .backends import get_search_backend
+
+    SearchDocument.objects.filter(kind=kind, object_id=str(object_id)).delete()
+    get_search_backend().document_removed(kind, str(object_id))
+
+
+def iter_indexable(kind, batch_size=500):
+    """Percorre todos os objetos de um tipo em lotes, prontos para indexação"""
+    model_label, _, related = DOCUMENT_TYPES[kind]
+    queryset = apps.get_model(model_label).objects.select_related(*related).order_by('pk')
+    batch = []
+    for instance in queryset.iterator(chunk_size=batch_size):
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
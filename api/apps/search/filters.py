@@ -0,0 +1,43 @@
+from rest_framework.filters import BaseFilterBackend
+
+from .analysis import analyze
+from .backends import get_search_backend
+
+# Anotação de relevância; em ordem crescente, do mais ao menos relevante
+SEARCH_RANK = 'search_rank'
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Substitui o SearchFilter (ILIKE) pela busca textual do app de busca.
+    A view informa o tipo de documento em `search_document_kind`.
+
+    O backend de busca filtra o queryset e o anota com a relevância
+    (`search_rank`); sem `ordering` explícito, a KeysetPagination ordena a
+    página por essa anotação.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        terms = analyze(query)
+        if not terms:
+            return queryset.none()
+
+        return get_search_backend().annotate_rank(
+            queryset, terms, view.search_document_kind, SEARCH_RANK
+        ).order_by(SEARCH_RANK)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Busca textual (com radicais e sem acentos)',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from apps.search.backends import get_search_backend
+from apps.search.documents import DOCUMENT_TYPES, index_objects, iter_indexable
+from apps.search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói a tabela de documentos de busca e o índice do backend
+    """
+    help = 'Reindexa caminhos, lições, histórias, orações, cânticos e atividades'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de objetos indexados por lote'
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(DOCUMENT_TYPES),
+            dest='kinds',
+            help='Tipo de conteúdo a reindexar (pode ser repetido)'
+        )
+
+    def handle(self, *args, **options):
+        kinds = options.get('kinds') or list(DOCUMENT_TYPES)
+
+        for kind in kinds:
+            self.stdout.write(f'🔎 Indexando {kind}...')
+            indexed_ids = set()
+            for batch in iter_indexable(kind, options['batch_size']):
+                index_objects(kind, batch)
+                indexed_ids.update(str(instance.pk) for instance in batch)
+
+            removed = self.remove_orphans(kind, indexed_ids, options['batch_size'])
+            self.stdout.write(f'   ✓ {len(indexed_ids)} documentos, {removed} órfãos removidos')
+
+        get_search_backend().ensure_index()
+        self.stdout.write(self.style.SUCCESS('✅ Índice de busca reconstruído'))
+
+    def remove_orphans(self, kind, indexed_ids, batch_size):
+        """
+        Apaga, em lotes, os documentos cujos objetos não existem mais (um único
+        `NOT IN` com todos os ids excederia o limite de parâmetros do SQLite)
+        """
+        orphans = [
+            object_id
+            for object_id in SearchDocument.objects.filter(kind=kind).values_list(
+                'object_id', flat=True
+            ).iterator(chunk_size=batch_size)
+            if object_id not in indexed_ids
+        ]
+        removed = 0
+        for start in range(0, len(orphans), batch_size):
+            deleted, _ = SearchDocument.objects.filter(
+                kind=kind, object_id__in=orphans[start:start + batch_size]
+            ).delete()
+            removed += deleted
+        return removed
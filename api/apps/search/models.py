@@ -0,0 +1,44 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Documento de busca desnormalizado, um por objeto pesquisável
+    (caminhos, lições, histórias, orações, cânticos e atividades)
+    """
+    KINDS = [
+        ('learning_path', 'Caminho de aprendizado'),
+        ('lesson', 'Lição'),
+        ('story', 'História'),
+        ('prayer', 'Oração'),
+        ('song', 'Cântico'),
+        ('activity', 'Atividade'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KINDS, verbose_name='Tipo')
+    object_id = models.CharField(max_length=36, verbose_name='ID do objeto')
+    title = models.CharField(max_length=200, verbose_name='Título')
+    slug = models.CharField(max_length=200, blank=True, verbose_name='Slug')
+    parent_slug = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text='Slug do caminho de aprendizado (apenas para lições)',
+        verbose_name='Slug do pai'
+    )
+    is_published = models.BooleanField(default=False, verbose_name='Publicado')
+    terms_a = models.TextField(blank=True, verbose_name='Termos (peso A)')
+    terms_b = models.TextField(blank=True, verbose_name='Termos (peso B)')
+    terms_c = models.TextField(blank=True, verbose_name='Termos (peso C)')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Documento de Busca'
+        verbose_name_plural = 'Documentos de Busca'
+        db_table = 'search_documents'
+        unique_together = ['kind', 'object_id']
+        indexes = [
+            models.Index(fields=['kind', 'is_published']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
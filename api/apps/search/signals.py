@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.content.models import Activity, Prayer, Song, Story
+from apps.learning.models import LearningPath, Lesson
+from .documents import index_object, index_objects, kind_for_model, remove_object
+
+SEARCHABLE_MODELS = [LearningPath, Lesson, Story, Prayer, Song, Activity]
+
+
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Reindexa o objeto salvo na tabela de busca"""
+    if raw:
+        return
+    index_object(kind_for_model(sender), instance)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    remove_object(kind_for_model(sender), instance.pk)
+
+
+for model in SEARCHABLE_MODELS:
+    post_save.connect(update_search_document, sender=model, dispatch_uid=f'search_save_{model._meta.label}')
+    post_delete.connect(remove_search_document, sender=model, dispatch_uid=f'search_delete_{model._meta.label}')
+
+
+@receiver(post_save, sender=LearningPath)
+def reindex_path_lessons(sender, instance, created, raw=False, **kwargs):
+    """A visibilidade e o slug do caminho fazem parte dos documentos das lições"""
+    if raw or created:
+        return
+    index_objects('lesson', instance.lessons.select_related('learning_path'))
@@ -0,0 +1,61 @@
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.openapi import OpenApiTypes
+from .analysis import analyze
+from .backends import search
+from .documents import DOCUMENT_TYPES
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+@extend_schema(
+    summary="Busca textual",
+    description="""
+    Busca em caminhos, lições, histórias, orações, cânticos e atividades.
+    
+    Os termos são normalizados (sem acentos, sem stopwords e reduzidos ao
+    radical) e todos precisam aparecer no documento. Os resultados são
+    ordenados por relevância, com peso maior para o título.
+    """,
+    tags=['search'],
+    parameters=[
+        OpenApiParameter('q', OpenApiTypes.STR, description='Texto da busca', required=True),
+        OpenApiParameter('types', OpenApiTypes.STR, description='Tipos separados por vírgula (ex: learning_path,story)'),
+        OpenApiParameter('limit', OpenApiTypes.INT, description=f'Máximo de resultados (até {MAX_LIMIT})'),
+    ]
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def search_content(request):
+    """
+    Busca textual em todo o conteúdo publicado
+    """
+    query = request.query_params.get('q', '').strip()
+    
+    kinds = [
+        kind.strip()
+        for kind in request.query_params.get('types', '').split(',')
+        if kind.strip()
+    ]
+    invalid_kinds = [kind for kind in kinds if kind not in DOCUMENT_TYPES]
+    if invalid_kinds:
+        return Response(
+            {'error': f'Tipos inválidos: {", ".join(invalid_kinds)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    limit = max(1, min(limit, MAX_LIMIT))
+    
+    results = search(analyze(query), kinds=kinds or None, limit=limit)
+    
+    return Response({
+        'query': query,
+        'results': results
+    })
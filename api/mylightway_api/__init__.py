@@ -0,0 +1,4 @@
+# Garante que o app do Celery seja carregado junto com o Django (shared_task)
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
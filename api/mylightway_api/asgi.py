@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mylightway_api.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+application = get_asgi_application()
+
+# Aquece o índice de sugestões de busca fora do caminho das requisições
+from apps.learning.suggestions import suggestion_index  # noqa: E402
+
+suggestion_index.refresh_in_background()
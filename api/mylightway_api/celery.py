@@ -0,0 +1,12 @@
+"""
+Celery application for MyLightWay API project.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mylightway_api.settings')
+
+app = Celery('mylightway_api')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -40,6 +40,7 @@ LOCAL_APPS = [
     'apps.learning',
     'apps.content',
     'apps.progress',
+    'apps.search',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -243,6 +244,10 @@ SPECTACULAR_SETTINGS = {
         {
             'name': 'content',
             'description': 'Histórias, orações, cânticos e atividades'
+        },
+        {
+            'name': 'search',
+            'description': 'Busca textual em caminhos, lições e conteúdo'
         }
     ],
     'EXTERNAL_DOCS': {
@@ -286,6 +291,38 @@ CACHES = {
     }
 }
 
+# Tempo de vida das respostas públicas do catálogo (invalidadas por versão)
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=60 * 15, cast=int)
+
+# Detalhes de histórias, orações, cânticos e atividades (apagados ao salvar o objeto)
+CONTENT_CACHE_TIMEOUT = config('CONTENT_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Intervalo de reconstrução completa do índice de sugestões de busca (segundos)
+SEARCH_SUGGESTIONS_INDEX_TTL = config('SEARCH_SUGGESTIONS_INDEX_TTL', default=300, cast=int)
+
+# Busca textual: 'postgres' (tsvector + GIN) ou 'memory' (índice invertido);
+# vazio escolhe pelo banco configurado
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='')
+SEARCH_INDEX_TTL = config('SEARCH_INDEX_TTL', default=300, cast=int)
+# Resultados da busca nas listagens com o backend em memória, que ordena pelos
+# ids no SQL (no PostgreSQL o ranking fica no banco e não há limite)
+SEARCH_FILTER_MAX_RESULTS = config('SEARCH_FILTER_MAX_RESULTS', default=200, cast=int)
+
+# Tempo de vida das recomendações por usuário (também invalidadas a cada progresso)
+RECOMMENDATIONS_CACHE_TIMEOUT = config('RECOMMENDATIONS_CACHE_TIMEOUT', default=60 * 10, cast=int)
+
+# Vizinhos guardados por caminho no índice de similaridade e intervalos (segundos)
+# entre as atualizações incrementais e os recálculos completos; o recálculo
+# completo recupera as inscrições confirmadas depois da margem da marca d'água
+PATH_SIMILARITY_TOP_K = config('PATH_SIMILARITY_TOP_K', default=10, cast=int)
+PATH_SIMILARITY_INTERVAL = config('PATH_SIMILARITY_INTERVAL', default=60 * 60, cast=int)
+PATH_SIMILARITY_FULL_INTERVAL = config(
+    'PATH_SIMILARITY_FULL_INTERVAL', default=60 * 60 * 24, cast=int
+)
+
+# Intervalo (segundos) entre os recálculos de popularidade e tendência dos caminhos
+PATH_POPULARITY_INTERVAL = config('PATH_POPULARITY_INTERVAL', default=60 * 30, cast=int)
+
 # Session Configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
@@ -298,6 +335,42 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Intervalo (segundos) entre as gravações do tempo de estudo acumulado pelos heartbeats
+TIME_TRACKING_FLUSH_INTERVAL = config('TIME_TRACKING_FLUSH_INTERVAL', default=60, cast=int)
+
+# Intervalo (segundos) entre as gravações das reproduções de cânticos e usos de orações
+CONTENT_COUNTERS_FLUSH_INTERVAL = config('CONTENT_COUNTERS_FLUSH_INTERVAL', default=60, cast=int)
+
+# Intervalo (segundos) entre as correções dos snapshots de estatísticas divergentes
+STATS_SNAPSHOT_RECONCILE_INTERVAL = config('STATS_SNAPSHOT_RECONCILE_INTERVAL', default=60 * 60, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-time-tracking': {
+        'task': 'apps.progress.tasks.flush_time_tracking',
+        'schedule': TIME_TRACKING_FLUSH_INTERVAL,
+    },
+    'flush-content-counters': {
+        'task': 'apps.content.tasks.flush_content_counters',
+        'schedule': CONTENT_COUNTERS_FLUSH_INTERVAL,
+    },
+    'update-path-similarity': {
+        'task': 'apps.learning.tasks.update_path_similarity',
+        'schedule': PATH_SIMILARITY_INTERVAL,
+    },
+    'rebuild-path-similarity': {
+        'task': 'apps.learning.tasks.rebuild_path_similarity',
+        'schedule': PATH_SIMILARITY_FULL_INTERVAL,
+    },
+    'refresh-path-popularity': {
+        'task': 'apps.learning.tasks.refresh_path_popularity',
+        'schedule': PATH_POPULARITY_INTERVAL,
+    },
+    'reconcile-stats-snapshots': {
+        'task': 'apps.progress.tasks.reconcile_stats_snapshots',
+        'schedule': STATS_SNAPSHOT_RECONCILE_INTERVAL,
+    },
+}
+
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='')
@@ -21,6 +21,7 @@ urlpatterns = [
     path('api/v1/learning/', include('apps.learning.urls')),
     path('api/v1/content/', include('apps.content.urls')),
     path('api/v1/progress/', include('apps.progress.urls')),
+    path('api/v1/search/', include('apps.search.urls')),
 ]
 
 # Serve media files in development
@@ -0,0 +1,39 @@
+"""
+Benchmarks com o pytest-benchmark (requirements.txt). Rodam com a suíte, mas
+os números só são comparáveis entre execuções na mesma máquina:
+
+    pytest tests/benchmarks --benchmark-only --benchmark-json=bench.json
+
+Os volumes padrão são pequenos para não atrasar a suíte; BENCHMARK_SCALE
+multiplica os dados semeados (ex: BENCHMARK_SCALE=20 para 100 mil caminhos).
+"""
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def benchmark_scale():
+    return int(os.environ.get('BENCHMARK_SCALE', 1))
+
+
+@pytest.fixture
+def latency(request):
+    """
+    Mede a função com o pytest-benchmark e retorna (e registra no extra_info)
+    os percentis p50/p99 em milissegundos; None com --benchmark-disable
+    """
+    benchmark = request.getfixturevalue('benchmark')
+
+    def measure(function, *args, **kwargs):
+        benchmark(function, *args, **kwargs)
+        if benchmark.stats is None:
+            return None
+        timings = benchmark.stats.stats.sorted_data
+        percentiles = {
+            name: timings[min(int(len(timings) * fraction), len(timings) - 1)] * 1000
+            for name, fraction in (('p50', 0.50), ('p99', 0.99))
+        }
+        benchmark.extra_info.update(percentiles)
+        return percentiles
+    return measure
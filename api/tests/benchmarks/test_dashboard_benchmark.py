@@ -0,0 +1,78 @@
+import pytest
+
+from apps.learning.models import Category, LearningPath, Lesson
+from apps.progress.models import LearningPathProgress, LessonProgress, UserStatsSnapshot
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+LESSONS_PER_PATH = 5
+
+
+@pytest.fixture
+def busy_child(make_user, benchmark_scale):
+    """Criança com 200 caminhos e mil lições por unidade de escala, metade concluída"""
+    child = make_user()
+    category = Category.objects.create(name='Histórias')
+    paths = LearningPath.objects.bulk_create(
+        LearningPath(
+            title=f'Caminho {i}', slug=f'caminho-{i}', description='d', category=category,
+            age_group='6-8', difficulty_level='beginner', estimated_duration_minutes=10,
+            is_published=True
+        )
+        for i in range(200 * benchmark_scale)
+    )
+    lessons = Lesson.objects.bulk_create(
+        (
+            Lesson(
+                learning_path=path, title=f'Lição {j}', slug=f'licao-{j}', order=j,
+                is_published=True
+            )
+            for path in paths
+            for j in range(LESSONS_PER_PATH)
+        ),
+        batch_size=2000
+    )
+    LearningPathProgress.objects.bulk_create(
+        (
+            LearningPathProgress(
+                user=child, learning_path=path, status='completed' if i % 2 else 'in_progress'
+            )
+            for i, path in enumerate(paths)
+        ),
+        batch_size=2000
+    )
+    LessonProgress.objects.bulk_create(
+        (
+            LessonProgress(
+                user=child, lesson=lesson, status='completed' if i % 2 else 'in_progress'
+            )
+            for i, lesson in enumerate(lessons)
+        ),
+        batch_size=2000
+    )
+    UserStatsSnapshot.rebuild([child.pk])
+    return child
+
+
+def counters(stats):
+    return {field: getattr(stats, field) for field in UserStatsSnapshot.COUNTER_FIELDS}
+
+
+@pytest.mark.benchmark(group='dashboard-stats')
+@pytest.mark.parametrize('strategy', ['snapshot', 'compute'])
+def test_snapshot_read_vs_recompute(busy_child, latency, strategy):
+    """Leitura do snapshot materializado contra o recálculo por agregação (compute)"""
+    read = UserStatsSnapshot.get_for if strategy == 'snapshot' else UserStatsSnapshot.compute
+
+    latency(read, busy_child.pk)
+
+    n_paths = LearningPath.objects.count()
+    assert counters(read(busy_child.pk)) == {
+        'paths_total': n_paths,
+        'paths_completed': n_paths // 2,
+        'lessons_total': n_paths * LESSONS_PER_PATH,
+        'lessons_completed': n_paths * LESSONS_PER_PATH // 2,
+        'achievements_total': 0,
+    }
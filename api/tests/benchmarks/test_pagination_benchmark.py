@@ -0,0 +1,82 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.common.pagination import KeysetPagination
+from apps.learning.models import Category, LearningPath
+from apps.learning.views import LearningPathListView
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+PAGE_SIZE = 20
+
+
+class ListView:
+    """A KeysetPagination só lê a ordenação e os filtros da view"""
+    filter_backends = []
+    ordering = LearningPathListView.ordering
+
+
+@pytest.fixture
+def paths(db, benchmark_scale):
+    """5 mil caminhos por unidade de escala (BENCHMARK_SCALE=20 para 100 mil)"""
+    category = Category.objects.create(name='Histórias')
+    LearningPath.objects.bulk_create(
+        (
+            LearningPath(
+                title=f'Caminho {i}', slug=f'caminho-{i}', description='d', category=category,
+                age_group='6-8', difficulty_level='beginner', estimated_duration_minutes=10,
+                is_published=True, is_featured=i % 50 == 0, order=i % 100
+            )
+            for i in range(5000 * benchmark_scale)
+        ),
+        batch_size=2000
+    )
+    return LearningPath.objects.order_by(*LearningPathListView.ordering, 'pk')
+
+
+def request_for(**params):
+    return Request(APIRequestFactory().get('/api/v1/learning/paths/', params))
+
+
+def page_number_page(queryset, page):
+    paginator = PageNumberPagination()
+    paginator.page_size = PAGE_SIZE
+    return [path.pk for path in paginator.paginate_queryset(queryset, request_for(page=page))]
+
+
+def keyset_page(queryset, cursor):
+    paginator = KeysetPagination()
+    paginator.page_size = PAGE_SIZE
+    return [
+        path.pk
+        for path in paginator.paginate_queryset(queryset, request_for(cursor=cursor), ListView())
+    ]
+
+
+def cursor_after(queryset, offset):
+    """Cursor que o cliente teria recebido ao chegar na linha `offset`"""
+    paginator = KeysetPagination()
+    paginator.paginate_queryset(queryset, request_for(), ListView())
+    link = paginator.encode_cursor(queryset[offset - 1], reverse=False)
+    return parse_qs(urlparse(link).query)['cursor'][0]
+
+
+@pytest.mark.benchmark(group='deep-page')
+@pytest.mark.parametrize('strategy', ['page_number', 'keyset'])
+def test_deep_page_latency(paths, latency, strategy):
+    last_page = paths.count() // PAGE_SIZE
+    offset = (last_page - 1) * PAGE_SIZE
+    if strategy == 'page_number':
+        fetch, position = page_number_page, last_page
+    else:
+        fetch, position = keyset_page, cursor_after(paths, offset)
+
+    latency(fetch, paths, position)
+
+    assert fetch(paths, position) == [path.pk for path in paths[offset:offset + PAGE_SIZE]]
@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.learning.models import Answer, Question
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=[10, 50], ids=lambda n: f'{n}-questions')
+def quiz_lesson(request, make_paths):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    lesson = path.lessons.get()
+    quiz = lesson.quiz
+    for k in range(3, request.param):
+        question = Question.objects.create(quiz=quiz, question_text='?', order=k)
+        Answer.objects.bulk_create(
+            Answer(question=question, answer_text=str(m), is_correct=m == 0, order=m)
+            for m in range(3)
+        )
+    # Cada rodada do benchmark é uma nova tentativa
+    quiz.max_attempts = 10 ** 6
+    quiz.save()
+    return lesson
+
+
+@pytest.mark.benchmark(group='quiz-submit')
+def test_submission_latency_and_round_trips(quiz_lesson, auth_client, benchmark, latency):
+    client = auth_client()
+    url = f'/api/v1/progress/lessons/{quiz_lesson.pk}/quiz/submit/'
+    answers = [
+        {'question_id': question.pk, 'answer_id': question.answers.get(is_correct=True).pk}
+        for question in quiz_lesson.quiz.questions.all()
+    ]
+
+    def submit():
+        return client.post(url, {'answers': answers}, format='json')
+
+    latency(submit)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = submit()
+    round_trips = len([query for query in queries if 'SAVEPOINT' not in query['sql']])
+    benchmark.extra_info['round_trips'] = round_trips
+
+    assert response.status_code == 201
+    assert response.data['correct_answers'] == len(answers)
+    # Quiz, número da tentativa, INSERT da tentativa e INSERT das respostas
+    assert round_trips == 4
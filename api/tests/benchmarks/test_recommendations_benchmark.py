@@ -0,0 +1,83 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.learning.models import Category, LearningPath
+from apps.learning.recommendations import build_recommendations
+from apps.learning.similarity import update_similarity_index
+from apps.progress.models import LearningPathProgress
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+RECOMMENDATIONS_URL = '/api/v1/learning/recommendations/'
+
+N_PATHS = 200
+PATHS_PER_USER = 4
+
+
+@pytest.fixture
+def population(db, benchmark_scale):
+    """
+    Mil crianças por unidade de escala (BENCHMARK_SCALE=50 para 50 mil), cada
+    uma inscrita em quatro caminhos vizinhos, com a similaridade calculada
+    """
+    categories = Category.objects.bulk_create(
+        Category(name=f'Categoria {i}', slug=f'categoria-{i}') for i in range(10)
+    )
+    paths = LearningPath.objects.bulk_create(
+        LearningPath(
+            title=f'Caminho {i}', slug=f'caminho-{i}', description='d',
+            category=categories[i % len(categories)],
+            age_group=[code for code, _ in LearningPath.AGE_GROUPS][i % 4],
+            difficulty_level=[code for code, _ in LearningPath.DIFFICULTY_LEVELS][i % 3],
+            estimated_duration_minutes=10, is_published=True
+        )
+        for i in range(N_PATHS)
+    )
+    users = get_user_model().objects.bulk_create(
+        (
+            get_user_model()(
+                email=f'crianca{i}@example.com', username=f'crianca{i}@example.com',
+                user_type='child'
+            )
+            for i in range(1000 * benchmark_scale)
+        ),
+        batch_size=2000
+    )
+    LearningPathProgress.objects.bulk_create(
+        (
+            LearningPathProgress(
+                user=user, learning_path=paths[(i * 7 + k) % N_PATHS],
+                status='completed' if k < 2 else 'in_progress'
+            )
+            for i, user in enumerate(users)
+            for k in range(PATHS_PER_USER)
+        ),
+        batch_size=2000
+    )
+    update_similarity_index(full=True)
+    return users
+
+
+@pytest.mark.benchmark(group='recommendations')
+def test_cold_recommendation_latency(population, latency):
+    """Cálculo completo, sem cache: progresso, candidatos pontuados e caminhos em andamento"""
+    user = population[len(population) // 2]
+
+    latency(build_recommendations, user)
+
+    recommendations = build_recommendations(user)
+    assert len(recommendations['recommended']) == 6
+    assert recommendations['similar_to_completed']
+
+
+@pytest.mark.benchmark(group='recommendations')
+def test_warm_recommendation_latency(population, auth_client, latency):
+    """Resposta do endpoint com as recomendações em cache"""
+    client = auth_client(population[len(population) // 2])
+    client.get(RECOMMENDATIONS_URL)
+
+    latency(client.get, RECOMMENDATIONS_URL)
+
+    assert len(client.get(RECOMMENDATIONS_URL).data['recommended']) == 6
@@ -0,0 +1,90 @@
+import pytest
+
+from apps.learning.models import Category, LearningPath
+from apps.search.analysis import analyze
+from apps.search.backends import search
+from apps.search.documents import index_objects
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+PATHS_URL = '/api/v1/learning/paths/'
+
+# Caminhos julgados: (título, descrição, tags)
+JUDGED_PATHS = [
+    ('Jonas e a baleia', 'Jonas fugiu de Deus e foi engolido por um grande peixe', 'Jonas, Profetas'),
+    ('A arca de Noé', 'Noé construiu a arca e salvou os animais do dilúvio', 'Noé, Obediência'),
+    ('Davi e Golias', 'O pequeno pastor venceu o gigante com fé', 'Davi, Coragem'),
+    ('Orações para dormir', 'Aprenda a conversar com Deus antes de dormir', 'Oração'),
+    ('Cânticos de louvor', 'Músicas para cantar em família', 'Louvor, Música'),
+    ('O bom samaritano', 'Uma parábola sobre cuidar do próximo', 'Parábolas, Amor'),
+]
+
+# Consulta -> título que deve aparecer no topo
+JUDGMENTS = [
+    ('jonas', 'Jonas e a baleia'),
+    ('baleia', 'Jonas e a baleia'),
+    ('arca noe', 'A arca de Noé'),
+    ('diluvio', 'A arca de Noé'),
+    ('davi', 'Davi e Golias'),
+    ('gigante', 'Davi e Golias'),
+    ('oracao dormir', 'Orações para dormir'),
+    ('canticos', 'Cânticos de louvor'),
+    ('parabolas', 'O bom samaritano'),
+    ('proximo', 'O bom samaritano'),
+]
+
+# Relevância mínima (MRR@10) e orçamento folgado de latência da listagem
+MIN_MRR = 0.9
+P99_BUDGET_MS = 100
+
+
+@pytest.fixture
+def corpus(db):
+    """Os caminhos julgados entre 2000 caminhos que citam os mesmos personagens"""
+    category = Category.objects.create(name='Histórias')
+    rows = [
+        (title, description, tags) for title, description, tags in JUDGED_PATHS
+    ] + [
+        (f'Caminho {i}', f'Histórias de Jonas, Davi e Noé para a turma {i}', 'Bíblia')
+        for i in range(2000)
+    ]
+    paths = LearningPath.objects.bulk_create(
+        LearningPath(
+            title=title, slug=f'caminho-{i}', description=description, tags=tags,
+            category=category, age_group='6-8', difficulty_level='beginner',
+            estimated_duration_minutes=10, is_published=True
+        )
+        for i, (title, description, tags) in enumerate(rows)
+    )
+    index_objects('learning_path', paths)
+    search(['jona'], kinds=['learning_path'])
+
+
+def mean_reciprocal_rank():
+    total = 0.0
+    for query, expected in JUDGMENTS:
+        titles = [
+            result['title']
+            for result in search(analyze(query), kinds=['learning_path'], limit=10)
+        ]
+        if expected in titles:
+            total += 1 / (titles.index(expected) + 1)
+    return total / len(JUDGMENTS)
+
+
+def test_relevance_of_judged_queries(corpus, benchmark):
+    mrr = benchmark(mean_reciprocal_rank)
+
+    benchmark.extra_info['mrr'] = mrr
+    assert mrr >= MIN_MRR
+
+
+@pytest.mark.parametrize('query', ['jonas', 'arca noe', 'canticos'])
+def test_search_listing_latency(corpus, api_client, latency, query):
+    percentiles = latency(api_client.get, PATHS_URL, {'search': query})
+
+    assert api_client.get(PATHS_URL, {'search': query}).data['results']
+    if percentiles:
+        assert percentiles['p99'] < P99_BUDGET_MS
@@ -0,0 +1,39 @@
+import pytest
+
+from apps.learning.models import Category, LearningPath
+from apps.learning.suggestions import suggestion_index
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+WORDS = ['Caminho', 'Jornada', 'História', 'Oração', 'Coragem', 'Criação']
+
+# Orçamento folgado: o objetivo é pegar regressões de ordem de grandeza
+P99_BUDGET_MS = 20
+
+
+@pytest.fixture
+def large_index(db):
+    categories = Category.objects.bulk_create(
+        Category(name=f'Categoria {i}', slug=f'categoria-{i}') for i in range(30)
+    )
+    LearningPath.objects.bulk_create(
+        LearningPath(
+            title=f'{WORDS[i % len(WORDS)]} {i}', slug=f'caminho-{i}', description='d',
+            category=categories[i % len(categories)], age_group='6-8',
+            difficulty_level='beginner', estimated_duration_minutes=10, is_published=True
+        )
+        for i in range(3000)
+    )
+    suggestion_index.rebuild()
+    return suggestion_index
+
+
+@pytest.mark.parametrize('query', ['c', 'cr', 'caminho 1', 'oracao 2997'])
+def test_lookup_latency(large_index, latency, query):
+    percentiles = latency(large_index.lookup, query)
+
+    assert large_index.lookup(query)
+    if percentiles:
+        assert percentiles['p99'] < P99_BUDGET_MS
@@ -0,0 +1,57 @@
+import pytest
+
+from apps.learning.models import Category, LearningPath, LearningPathTag, Tag
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+PATHS_URL = '/api/v1/learning/paths/'
+
+N_TAGS = 50
+
+
+@pytest.fixture(params=[500, 5000], ids=lambda n: f'{n}x')
+def tagged_paths(request, db, benchmark_scale):
+    """
+    Caminhos com duas tags cada; BENCHMARK_SCALE=20 reproduz os volumes do
+    pedido (10 mil e 100 mil caminhos)
+    """
+    category = Category.objects.create(name='Histórias')
+    tags = Tag.objects.bulk_create(Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(N_TAGS))
+    paths = LearningPath.objects.bulk_create(
+        (
+            LearningPath(
+                title=f'Caminho {i}', slug=f'caminho-{i}', description='d', category=category,
+                age_group='6-8', difficulty_level='beginner', estimated_duration_minutes=10,
+                is_published=True
+            )
+            for i in range(request.param * benchmark_scale)
+        ),
+        batch_size=2000
+    )
+    LearningPathTag.objects.bulk_create(
+        (
+            LearningPathTag(learning_path=path, tag=tags[(i * step) % N_TAGS])
+            for i, path in enumerate(paths)
+            for step in (1, 7)
+        ),
+        batch_size=2000,
+        ignore_conflicts=True
+    )
+    return tags
+
+
+@pytest.mark.benchmark(group='tag-filter')
+def test_tag_filter_latency(tagged_paths, api_client, latency):
+    latency(api_client.get, PATHS_URL, {'tags': 'Tag 3'})
+
+    response = api_client.get(PATHS_URL, {'tags': 'Tag 3'})
+    tagged = {
+        str(path_id)
+        for path_id in LearningPathTag.objects.filter(tag__slug='tag-3').values_list(
+            'learning_path_id', flat=True
+        )
+    }
+    assert len(response.data['results']) == 20
+    assert {row['id'] for row in response.data['results']} <= tagged
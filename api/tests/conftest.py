@@ -0,0 +1,113 @@
+"""
+Fixtures compartilhadas dos testes da API.
+
+Os testes usam o banco SQLite de teste do pytest-django e o cache em memória
+(LocMemCache), então não dependem de PostgreSQL nem de Redis.
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.learning.models import Answer, Category, LearningPath, Lesson, Question, Quiz
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+    cache.clear()
+
+    # Buffers escolhidos pelo backend de cache na primeira utilização e regras
+    # de conquistas versionadas por uma chave do cache
+    from apps.content import counters
+    from apps.progress import achievements, time_tracking
+    counters.content_counters.reset_buffer()
+    time_tracking.study_time.reset_buffer()
+    achievements._rule_set = None
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def empty_process_indexes():
+    # Índices em memória do processo: cada teste parte de índices vazios
+    from apps.learning.suggestions import suggestion_index
+    from apps.search import backends
+    suggestion_index.clear()
+    backends._backends.clear()
+    yield
+    suggestion_index.clear()
+    backends._backends.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def make_user(db):
+    counter = iter(range(1, 100000))
+
+    def make(user_type='child', **kwargs):
+        number = next(counter)
+        email = kwargs.pop('email', f'user{number}@example.com')
+        return get_user_model().objects.create_user(
+            email=email,
+            username=kwargs.pop('username', email),
+            password='senha-segura-123',
+            user_type=user_type,
+            **kwargs
+        )
+    return make
+
+
+@pytest.fixture
+def auth_client(make_user):
+    """Cliente autenticado como uma criança; o usuário fica em `client.user`"""
+    def make(user=None):
+        client = APIClient()
+        client.user = user or make_user()
+        client.force_authenticate(client.user)
+        # O cache anônimo do catálogo é ignorado quando há Authorization
+        client.credentials(HTTP_AUTHORIZATION='Bearer test')
+        return client
+    return make
+
+
+@pytest.fixture
+def make_paths(db):
+    """Cria caminhos publicados com lições (a primeira com um quiz de 3 perguntas)"""
+    def make(n_paths=5, n_lessons=3, category=None, **path_kwargs):
+        category = category or Category.objects.create(name=f'Categoria {Category.objects.count()}')
+        paths = []
+        offset = LearningPath.objects.count()
+        for i in range(n_paths):
+            path = LearningPath.objects.create(
+                title=f'Caminho {offset + i}',
+                description='Descrição',
+                category=category,
+                age_group=path_kwargs.get('age_group', '6-8'),
+                difficulty_level=path_kwargs.get('difficulty_level', 'beginner'),
+                estimated_duration_minutes=10,
+                is_published=True,
+                is_featured=path_kwargs.get('is_featured', False),
+                tags=path_kwargs.get('tags', 'fé, oração')
+            )
+            for j in range(n_lessons):
+                lesson = Lesson.objects.create(
+                    learning_path=path, title=f'Lição {j}', order=j, is_published=True
+                )
+                if j == 0:
+                    quiz = Quiz.objects.create(lesson=lesson, title='Quiz')
+                    for k in range(3):
+                        question = Question.objects.create(quiz=quiz, question_text='?', order=k)
+                        for m in range(3):
+                            Answer.objects.create(
+                                question=question, answer_text=str(m), is_correct=m == 0, order=m
+                            )
+            paths.append(path)
+        return paths
+    return make
@@ -0,0 +1,69 @@
+import pytest
+
+from apps.learning.models import Achievement
+from apps.progress.models import UserAchievement
+
+pytestmark = pytest.mark.django_db
+
+ACHIEVEMENTS_URL = '/api/v1/learning/achievements/'
+
+
+@pytest.fixture
+def achievements(db):
+    return {
+        achievement.slug: achievement
+        for achievement in Achievement.objects.bulk_create([
+            Achievement(
+                name=name, slug=name.lower(), description='-', achievement_type=kind,
+                icon='star', requirements={'lessons_completed': 1}, is_hidden=hidden
+            )
+            for name, kind, hidden in [
+                ('Leitor', 'progress', False),
+                ('Constante', 'streak', False),
+                ('Secreta', 'special', True),
+                ('Oculta', 'special', True),
+            ]
+        ])
+    }
+
+
+def names(response):
+    return [row['name'] for row in response.data['results']]
+
+
+def test_list_hides_unearned_secret_achievements(auth_client, achievements):
+    client = auth_client()
+    UserAchievement.objects.create(
+        user=client.user, achievement=achievements['secreta'], progress_data={'lessons_completed': 1}
+    )
+
+    response = client.get(ACHIEVEMENTS_URL)
+
+    assert names(response) == ['Leitor', 'Secreta', 'Constante']
+    earned = {row['name']: row['earned_info'] for row in response.data['results']}
+    assert earned['Secreta']['earned'] is True
+    assert earned['Secreta']['progress_data'] == {'lessons_completed': 1}
+    assert earned['Leitor'] == {'earned': False, 'earned_at': None, 'progress_data': {}}
+
+
+def test_list_filters_by_type(auth_client, achievements):
+    client = auth_client()
+
+    assert names(client.get(ACHIEVEMENTS_URL, {'achievement_type': 'streak'})) == ['Constante']
+    assert names(client.get(ACHIEVEMENTS_URL, {'achievement_type': 'special'})) == []
+    assert client.get(ACHIEVEMENTS_URL, {'achievement_type': 'outro'}).status_code == 400
+
+
+def test_warm_list_runs_no_queries(auth_client, achievements, django_assert_num_queries):
+    client = auth_client()
+    client.get(ACHIEVEMENTS_URL)
+
+    with django_assert_num_queries(0):
+        response = client.get(ACHIEVEMENTS_URL)
+    assert response.status_code == 200
+
+    # Uma nova conquista invalida apenas o cache do usuário
+    UserAchievement.objects.create(user=client.user, achievement=achievements['oculta'])
+    with django_assert_num_queries(1):
+        response = client.get(ACHIEVEMENTS_URL)
+    assert 'Oculta' in names(response)
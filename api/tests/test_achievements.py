@@ -0,0 +1,169 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.learning.models import Achievement
+from apps.progress.achievements import (
+    EVENT_LESSON_COMPLETED, EVENT_STREAK_UPDATED, LessonCountPredicate, PerfectQuizPredicate,
+    StreakPredicate, backfill_rule, compile_requirements, evaluate_achievements, get_rule_set
+)
+from apps.progress.models import LessonProgress, QuizAttempt, StudyStreak, UserAchievement
+
+pytestmark = pytest.mark.django_db
+
+
+def make_achievements(n, offset=0):
+    """Metade das conquistas por lições concluídas, metade por sequência de dias"""
+    return Achievement.objects.bulk_create([
+        Achievement(
+            name=f'Conquista {i}', slug=f'conquista-{i}', description='-',
+            achievement_type='progress', icon='star',
+            requirements=(
+                {'lessons_completed': i % 5 + 1} if i % 2 else {'streak_days': i % 7 + 1}
+            )
+        )
+        for i in range(offset, offset + n)
+    ])
+
+
+def complete_lessons(user, path, n):
+    for lesson in path.lessons.order_by('order')[:n]:
+        LessonProgress.objects.create(user=user, lesson=lesson, status='completed')
+
+
+def test_compile_requirements_formats():
+    first, second = compile_requirements({'lessons_completed': 5, 'streak_days': 7})
+    assert (type(first), first.threshold) == (LessonCountPredicate, 5)
+    assert (type(second), second.threshold) == (StreakPredicate, 7)
+
+    predicate, = compile_requirements({'type': 'perfect_score', 'target': 3})
+    assert (type(predicate), predicate.threshold) == (PerfectQuizPredicate, 3)
+
+    assert len(compile_requirements([
+        {'type': 'quiz_score', 'target': 80}, {'paths_completed': 1}
+    ])) == 2
+    assert compile_requirements([]) is None
+
+
+@pytest.mark.parametrize('requirements', [
+    {'unknown': 1},
+    {'type': 'lessons_completed', 'target': 2, 'category': 'oração'},
+    {'lessons_completed': 'cinco'},
+    {'streak_days': 0},
+    ['lessons_completed'],
+])
+def test_invalid_requirements_are_rejected(requirements):
+    with pytest.raises(ValidationError):
+        compile_requirements(requirements)
+
+    achievement = Achievement(
+        name='Inválida', description='-', achievement_type='progress', icon='star',
+        requirements=requirements
+    )
+    with pytest.raises(ValidationError) as excinfo:
+        achievement.full_clean()
+    assert 'requirements' in excinfo.value.message_dict
+
+
+def test_invalid_requirements_are_skipped_by_the_rule_set():
+    valid, = make_achievements(1)
+    Achievement.objects.create(
+        name='Por categoria', description='-', achievement_type='progress', icon='star',
+        requirements={'type': 'lessons_completed', 'target': 1, 'category': 'oração'}
+    )
+
+    assert [rule.achievement_id for rule in get_rule_set().rules] == [valid.pk]
+
+
+def test_perfect_score_counts_distinct_perfect_quizzes(make_user, make_paths):
+    first, second = (path.lessons.get().quiz for path in make_paths(n_paths=2, n_lessons=1))
+    achievement = Achievement.objects.create(
+        name='Dois quizzes perfeitos', description='-', achievement_type='quiz', icon='star',
+        requirements={'type': 'perfect_score', 'target': 2}
+    )
+    user = make_user()
+
+    def complete(quiz, attempt_number, score):
+        QuizAttempt.objects.create(
+            user=user, quiz=quiz, attempt_number=attempt_number, status='completed',
+            score=score, total_questions=3
+        )
+        return UserAchievement.objects.filter(user=user, achievement=achievement).exists()
+
+    assert not complete(first, 1, 100)
+    assert not complete(first, 2, 100)
+    assert not complete(second, 1, 90)
+    assert complete(second, 2, 100)
+
+    rule, = get_rule_set().rules
+    other = make_user()
+    QuizAttempt.objects.bulk_create([
+        QuizAttempt(
+            user=other, quiz=quiz, attempt_number=1, status='completed', score=100,
+            total_questions=3
+        )
+        for quiz in (first, second)
+    ])
+    assert backfill_rule(rule) == 1
+
+
+def test_event_awards_only_matching_rules(make_user, make_paths):
+    make_achievements(10)
+    user = make_user()
+    path, = make_paths(n_paths=1, n_lessons=3)
+    complete_lessons(user, path, 3)
+
+    awarded = evaluate_achievements(user.pk, EVENT_LESSON_COMPLETED)
+
+    expected = set(Achievement.objects.filter(
+        requirements__lessons_completed__lte=3
+    ).values_list('pk', flat=True))
+    assert set(awarded) == expected
+    assert set(UserAchievement.objects.filter(user=user).values_list(
+        'achievement_id', flat=True
+    )) == expected
+    # Já obtidas: o mesmo evento não concede de novo
+    assert evaluate_achievements(user.pk, EVENT_LESSON_COMPLETED) == []
+
+
+def test_evaluation_queries_do_not_grow_with_rules(make_user, make_paths):
+    path, = make_paths(n_paths=1, n_lessons=5)
+    counts = []
+    for offset, n_achievements in ((0, 10), (10, 100)):
+        make_achievements(n_achievements, offset)
+        get_rule_set()
+        user = make_user()
+        complete_lessons(user, path, 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            awarded = evaluate_achievements(user.pk, EVENT_LESSON_COMPLETED)
+        assert awarded
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
+
+
+def test_streak_event_skips_lesson_metrics(make_user):
+    make_achievements(20)
+    get_rule_set()
+    user = make_user()
+    streak = StudyStreak(user=user, current_streak=3, longest_streak=3)
+
+    # A sequência vem do evento: nenhuma métrica de lições é carregada
+    with CaptureQueriesContext(connection) as queries:
+        awarded = evaluate_achievements(user.pk, EVENT_STREAK_UPDATED, streak=streak)
+
+    assert awarded
+    assert 'lesson_progress' not in ' '.join(query['sql'] for query in queries)
+
+
+def test_backfill_awards_existing_users(make_user, make_paths):
+    path, = make_paths(n_paths=1, n_lessons=2)
+    qualified, _ = make_user(), make_user()
+    complete_lessons(qualified, path, 2)
+    achievement, = make_achievements(1, offset=1)
+    rule, = [rule for rule in get_rule_set().rules if rule.achievement_id == achievement.pk]
+
+    assert backfill_rule(rule) == 1
+    assert list(UserAchievement.objects.values_list('user_id', flat=True)) == [qualified.pk]
@@ -0,0 +1,48 @@
+import pytest
+
+from apps.learning.cache import get_catalog_cache_stats
+from apps.learning.popularity import refresh_path_popularity
+from apps.progress.models import LearningPathProgress
+
+pytestmark = pytest.mark.django_db
+
+FEATURED_URL = '/api/v1/learning/featured/'
+
+
+def test_anonymous_catalog_response_is_served_from_cache(api_client, make_paths,
+                                                          django_assert_num_queries):
+    make_paths(n_paths=3)
+
+    first = api_client.get(FEATURED_URL)
+    with django_assert_num_queries(0):
+        second = api_client.get(FEATURED_URL)
+
+    assert first['X-Catalog-Cache'] == 'MISS'
+    assert second['X-Catalog-Cache'] == 'HIT'
+    assert second.content == first.content
+    stats = get_catalog_cache_stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_catalog_change_invalidates_cached_response(api_client, make_paths):
+    path = make_paths(n_paths=1, is_featured=True)[0]
+    api_client.get(FEATURED_URL)
+
+    path.title = 'Título novo'
+    path.save()
+    response = api_client.get(FEATURED_URL)
+
+    assert response['X-Catalog-Cache'] == 'MISS'
+    assert response.json()['featured_paths'][0]['title'] == 'Título novo'
+
+
+def test_popularity_refresh_invalidates_featured_response(api_client, make_paths, make_user):
+    paths = make_paths(n_paths=2)
+    assert api_client.get(FEATURED_URL).json()['trending_paths'] == []
+
+    LearningPathProgress.objects.create(user=make_user(), learning_path=paths[1])
+    refresh_path_popularity()
+    response = api_client.get(FEATURED_URL)
+
+    assert response['X-Catalog-Cache'] == 'MISS'
+    assert [row['id'] for row in response.json()['trending_paths']] == [str(paths[1].pk)]
@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.learning.models import Category
+
+pytestmark = pytest.mark.django_db
+
+
+def published_counts(*categories):
+    return [
+        Category.objects.get(pk=category.pk).published_paths_count for category in categories
+    ]
+
+
+def test_counter_follows_publish_unpublish_and_delete(make_paths):
+    first, second = make_paths(n_paths=2, n_lessons=1)
+    category = first.category
+    assert published_counts(category) == [2]
+
+    first.is_published = False
+    first.save()
+    assert published_counts(category) == [1]
+
+    first.is_published = True
+    first.save()
+    assert published_counts(category) == [2]
+
+    second.delete()
+    assert published_counts(category) == [1]
+
+
+def test_counter_follows_category_moves(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    source = path.category
+    target = Category.objects.create(name='Destino')
+
+    path.category = target
+    path.save()
+
+    assert published_counts(source, target) == [0, 1]
+
+
+def test_unrelated_saves_do_not_recount(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    path.title = 'Outro título'
+
+    with CaptureQueriesContext(connection) as queries:
+        path.save()
+
+    assert not [query for query in queries if query['sql'].startswith('UPDATE "categories"')]
+    assert published_counts(path.category) == [1]
+
+
+def test_recount_command_repairs_drift(make_paths):
+    first, = make_paths(n_paths=1, n_lessons=1)
+    second, = make_paths(n_paths=1, n_lessons=1)
+    Category.objects.update(published_paths_count=7)
+
+    out = StringIO()
+    call_command('recount_category_paths', category_ids=[first.category_id], stdout=out)
+    assert published_counts(first.category, second.category) == [1, 7]
+
+    call_command('recount_category_paths', stdout=out)
+    assert published_counts(first.category, second.category) == [1, 1]
+    assert '1 categorias recalculadas' in out.getvalue()
@@ -0,0 +1,183 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.content.models import Activity, BibleBook, BibleVerse, Prayer, Song, Story
+from apps.content.views import absolute_file_urls
+from apps.learning.models import Tag
+
+pytestmark = pytest.mark.django_db
+
+CONTENT_URL = '/api/v1/content/'
+
+
+@pytest.fixture
+def make_content(db):
+    """Cria `n` itens publicados de cada tipo, com arquivos e referências bíblicas"""
+    def make(n=3):
+        book, _ = BibleBook.objects.get_or_create(
+            abbreviation='Gn', defaults={
+                'name': 'Gênesis', 'testament': 'old', 'order': 1, 'chapters_count': 50
+            }
+        )
+        offset = Story.objects.count()
+        created = {'story': [], 'prayer': [], 'song': [], 'activity': []}
+        for i in range(offset, offset + n):
+            verse = BibleVerse.objects.create(
+                book=book, chapter=1, verse=i + 1, text='No princípio'
+            )
+            story = Story.objects.create(
+                title=f'História {i}', summary='s', content='c', age_group='6-8',
+                moral_lesson='m', cover_image=f'stories/capa{i}.png', is_published=True,
+                tags='Fé'
+            )
+            story.bible_references.add(verse)
+            song = Song.objects.create(
+                title=f'Cântico {i}', song_type='worship', age_group='6-8', lyrics='l',
+                audio_file=f'songs/audio{i}.mp3'
+            )
+            song.bible_references.add(verse)
+            created['story'].append(story)
+            created['song'].append(song)
+            created['prayer'].append(Prayer.objects.create(
+                title=f'Oração {i}', prayer_type='morning', age_group='6-8', text='t'
+            ))
+            created['activity'].append(Activity.objects.create(
+                title=f'Atividade {i}', description='d', activity_type='craft',
+                age_group='6-8', instructions='i', estimated_time_minutes=10
+            ))
+        return created
+    return make
+
+
+def content_queries(queries):
+    return [query for query in queries if 'SAVEPOINT' not in query['sql']]
+
+
+@pytest.mark.parametrize('n', [2, 6])
+@pytest.mark.parametrize('kind, expected', [
+    ('stories', 2), ('prayers', 1), ('songs', 2), ('activities', 1),
+])
+def test_list_queries_do_not_grow(api_client, make_content, n, kind, expected):
+    make_content(n)
+
+    # Página e, quando há, as referências bíblicas em uma consulta
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f'{CONTENT_URL}{kind}/')
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == n
+    assert len(content_queries(queries)) == expected
+
+
+@pytest.mark.parametrize('kind, path, expected', [
+    ('story', 'stories/{obj.slug}/', 2),
+    ('prayer', 'prayers/{obj.pk}/', 1),
+    ('song', 'songs/{obj.slug}/', 2),
+    ('activity', 'activities/{obj.slug}/', 1),
+])
+def test_detail_is_cached(api_client, make_content, kind, path, expected,
+                          django_assert_num_queries):
+    url = CONTENT_URL + path.format(obj=make_content(1)[kind][0])
+
+    with CaptureQueriesContext(connection) as queries:
+        cold = api_client.get(url)
+    assert cold.status_code == 200
+    assert len(content_queries(queries)) == expected
+
+    with django_assert_num_queries(0):
+        warm = api_client.get(url)
+    assert warm.data == cold.data
+
+
+@pytest.mark.parametrize('kind, path, target', [
+    ('song', 'songs/{obj.slug}/play/', 'play_count'),
+    ('prayer', 'prayers/{obj.pk}/use/', 'usage_count'),
+])
+def test_counter_views_use_cached_detail(api_client, make_content, kind, path, target,
+                                         django_assert_num_queries):
+    url = CONTENT_URL + path.format(obj=make_content(1)[kind][0])
+    api_client.post(url)
+
+    with django_assert_num_queries(0):
+        response = api_client.post(url)
+
+    assert response.data == {target: 2}
+
+
+def test_detail_file_urls_follow_request_host(api_client, make_content, settings):
+    settings.ALLOWED_HOSTS = ['app.example.com', 'admin.example.com']
+    story = make_content(1)['story'][0]
+    url = f'{CONTENT_URL}stories/{story.slug}/'
+
+    first = api_client.get(url, HTTP_HOST='app.example.com')
+    second = api_client.get(url, HTTP_HOST='admin.example.com')
+
+    assert first.data['cover_image'] == 'http://app.example.com/media/stories/capa0.png'
+    assert second.data['cover_image'] == 'http://admin.example.com/media/stories/capa0.png'
+
+
+def test_nested_file_urls_are_made_absolute(settings):
+    class PageSerializer(serializers.Serializer):
+        image = serializers.ImageField()
+
+    class BookSerializer(serializers.Serializer):
+        cover = serializers.ImageField()
+        pages = PageSerializer(many=True)
+
+    class ActivitySerializer(serializers.Serializer):
+        title = serializers.CharField()
+        book = BookSerializer()
+
+    settings.ALLOWED_HOSTS = ['app.example.com']
+    request = Request(APIRequestFactory().get('/', HTTP_HOST='app.example.com'))
+    data = {
+        'title': '/nao/e/arquivo',
+        'book': {
+            'cover': '/media/capa.png',
+            'pages': [{'image': '/media/p1.png'}, {'image': None}],
+        },
+    }
+
+    assert absolute_file_urls(ActivitySerializer().fields, data, request) == {
+        'title': '/nao/e/arquivo',
+        'book': {
+            'cover': 'http://app.example.com/media/capa.png',
+            'pages': [{'image': 'http://app.example.com/media/p1.png'}, {'image': None}],
+        },
+    }
+    assert data['book']['cover'] == '/media/capa.png'
+
+
+def test_reverse_clear_invalidates_details(api_client, make_content):
+    created = make_content(1)
+    story, song = created['story'][0], created['song'][0]
+    urls = [f'{CONTENT_URL}stories/{story.slug}/', f'{CONTENT_URL}songs/{song.slug}/']
+    for url in urls:
+        assert len(api_client.get(url).data['bible_references']) == 1
+
+    verse = story.bible_references.get()
+    verse.story_set.clear()
+    verse.song_set.clear()
+
+    for url in urls:
+        assert api_client.get(url).data['bible_references'] == []
+
+
+def test_story_tags_synced_only_when_changed(make_content, monkeypatch):
+    story = make_content(1)['story'][0]
+    synced = []
+    monkeypatch.setattr(
+        Tag, 'sync_for', classmethod(lambda cls, instance: synced.append(instance))
+    )
+
+    story.title = 'Outro título'
+    story.save()
+    assert synced == []
+
+    story.tags = 'Fé, Coragem'
+    story.save()
+    assert synced == [story]
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+from django.db import IntegrityError
+
+from apps.common.write_behind import LocalBuffer
+from apps.content import counters
+from apps.content.counters import flush_content_counters, get_counter_buffer, increment
+from apps.content.models import ContentCounterFlush, Prayer, Song
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_background_flush(monkeypatch):
+    # Os testes chamam flush_content_counters() explicitamente
+    monkeypatch.setattr(LocalBuffer, '_flush_periodically', lambda self: None)
+
+
+@pytest.fixture
+def song(db):
+    return Song.objects.create(title='Cântico', song_type='worship', age_group='6-8', lyrics='l')
+
+
+def test_increment_never_writes_to_the_database(song, settings, django_assert_num_queries):
+    settings.CONTENT_COUNTERS_FLUSH_INTERVAL = 0
+
+    with django_assert_num_queries(0):
+        for _ in range(3):
+            increment('song', song.pk)
+
+    assert counters.get_pending_counts('song', [song.pk]) == {str(song.pk): 3}
+
+
+def test_replayed_batch_is_skipped(song, monkeypatch):
+    prayer = Prayer.objects.create(
+        title='Oração', prayer_type='morning', age_group='6-8', text='t'
+    )
+    increment('song', song.pk, 2)
+    increment('prayer', prayer.pk)
+
+    # O worker morre depois do commit, antes de apagar o lote
+    buffer = get_counter_buffer()
+    close_batch = buffer.close_batch
+    monkeypatch.setattr(buffer, 'close_batch', lambda *args: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        flush_content_counters()
+    monkeypatch.setattr(buffer, 'close_batch', close_batch)
+
+    assert flush_content_counters() == 0
+    assert buffer.recover_batches() == []
+    assert ContentCounterFlush.objects.get().increments == 3
+    song.refresh_from_db()
+    prayer.refresh_from_db()
+    assert (song.play_count, prayer.usage_count) == (2, 1)
+
+
+def test_failed_apply_keeps_the_batch_for_the_next_flush(song, monkeypatch):
+    increment('song', song.pk, 2)
+    apply = counters.ContentCounters.apply
+
+    def fail(self, changes):
+        raise IntegrityError('falha no UPDATE')
+
+    monkeypatch.setattr(counters.ContentCounters, 'apply', fail)
+    with pytest.raises(IntegrityError):
+        flush_content_counters()
+    assert not ContentCounterFlush.objects.exists()
+
+    monkeypatch.setattr(counters.ContentCounters, 'apply', apply)
+    assert flush_content_counters() == 2
+    song.refresh_from_db()
+    assert song.play_count == 2
+
+
+def test_concurrent_increments_survive_flushes(song):
+    n_threads, per_thread = 8, 250
+    start = threading.Barrier(n_threads + 1)
+
+    def play():
+        start.wait()
+        for _ in range(per_thread):
+            increment('song', song.pk)
+
+    threads = [threading.Thread(target=play) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+
+    flushed = 0
+    while any(thread.is_alive() for thread in threads):
+        flushed += flush_content_counters()
+    for thread in threads:
+        thread.join()
+    flushed += flush_content_counters()
+
+    song.refresh_from_db()
+    assert flushed == song.play_count == n_threads * per_thread
+    assert counters.get_pending_counts('song', [song.pk]) == {}
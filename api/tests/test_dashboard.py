@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import ParentChildRelationship
+from apps.progress.models import LearningPathProgress, LessonProgress, UserStatsSnapshot
+
+pytestmark = pytest.mark.django_db
+
+DASHBOARD_URL = '/api/v1/auth/dashboard/'
+
+
+@pytest.fixture
+def child_progress(make_paths, make_user):
+    """Criança com 2 caminhos (1 concluído) e 3 lições (2 concluídas)"""
+    child = make_user()
+    first, second = make_paths(n_paths=2, n_lessons=2)
+    LearningPathProgress.objects.bulk_create([
+        LearningPathProgress(user=child, learning_path=first, status='completed'),
+        LearningPathProgress(user=child, learning_path=second, status='in_progress'),
+    ])
+    lessons = list(first.lessons.all()) + [second.lessons.first()]
+    LessonProgress.objects.bulk_create([
+        LessonProgress(user=child, lesson=lesson, status='completed' if i < 2 else 'in_progress')
+        for i, lesson in enumerate(lessons)
+    ])
+    return child
+
+
+def test_compute_is_three_queries(child_progress, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        stats = UserStatsSnapshot.compute(child_progress.pk)
+
+    assert (stats.paths_total, stats.paths_completed) == (2, 1)
+    assert (stats.lessons_total, stats.lessons_completed) == (3, 2)
+
+
+def test_child_dashboard(auth_client, child_progress, django_assert_num_queries):
+    client = auth_client(child_progress)
+
+    with CaptureQueriesContext(connection) as queries:
+        cold = client.get(DASHBOARD_URL)
+    # Sem snapshot: leitura, INSERT, lock da linha, compute() (3) e UPDATE
+    assert len([query for query in queries if 'SAVEPOINT' not in query['sql']]) == 7
+
+    with django_assert_num_queries(1):
+        warm = client.get(DASHBOARD_URL)
+
+    assert cold.data == warm.data
+    assert warm.data['learning_paths'] == {'total': 2, 'completed': 1, 'in_progress': 1}
+    assert warm.data['lessons']['total'] == 3
+    assert warm.data['lessons']['completed'] == 2
+
+
+def test_parent_dashboard_queries(auth_client, child_progress, make_user,
+                                  django_assert_max_num_queries):
+    parent = make_user(user_type='parent')
+    ParentChildRelationship.objects.create(parent=parent, child=child_progress)
+    ParentChildRelationship.objects.create(parent=parent, child=make_user())
+    client = auth_client(parent)
+
+    with django_assert_max_num_queries(3):
+        response = client.get(DASHBOARD_URL)
+
+    assert response.data['children'] == {'total': 2, 'active': 1}
+    assert response.data['overview'] == {'total_learning_paths': 2}
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import ParentChildRelationship
+from apps.progress.models import LearningPathProgress, LessonProgress
+
+pytestmark = pytest.mark.django_db
+
+OVERVIEW_URL = '/api/v1/auth/children/overview/'
+
+
+@pytest.fixture
+def family(make_paths, make_user):
+    """Cria um responsável com `n_children` crianças, cada uma com um caminho iniciado"""
+    path, = make_paths(n_paths=1, n_lessons=2)
+
+    def make(n_children):
+        parent = make_user(user_type='parent')
+        for _ in range(n_children):
+            child = make_user()
+            ParentChildRelationship.objects.create(parent=parent, child=child)
+            LearningPathProgress.objects.create(user=child, learning_path=path, status='in_progress')
+            LessonProgress.objects.create(
+                user=child, lesson=path.lessons.first(), status='completed'
+            )
+        return parent
+    return make
+
+
+def count_queries(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(OVERVIEW_URL)
+    assert response.status_code == 200
+    return len(queries), response.data
+
+
+def test_query_count_does_not_grow_with_children(auth_client, family):
+    small, small_data = count_queries(auth_client(family(1)))
+    large, large_data = count_queries(auth_client(family(6)))
+
+    # Relacionamentos e cinco consultas agrupadas por criança
+    assert small == large == 6
+    assert (small_data['total_children'], large_data['total_children']) == (1, 6)
+    assert large_data['active_children'] == 6
+    assert all(
+        child['lessons'] == {'total': 1, 'completed': 1, 'completion_rate': 100}
+        for child in large_data['children']
+    )
+
+
+def test_child_progress_refreshes_the_cached_overview(auth_client, family,
+                                                      django_assert_num_queries):
+    parent = family(2)
+    client = auth_client(parent)
+    client.get(OVERVIEW_URL)
+
+    # Em cache: só a leitura dos relacionamentos
+    with django_assert_num_queries(1):
+        cached = client.get(OVERVIEW_URL).data
+
+    child = ParentChildRelationship.objects.filter(parent=parent).first().child
+    progress = LessonProgress.objects.get(user=child)
+    lesson = progress.lesson.learning_path.lessons.exclude(pk=progress.lesson_id).get()
+    LessonProgress.objects.create(user=child, lesson=lesson, status='in_progress')
+
+    fresh = client.get(OVERVIEW_URL).data
+    lessons = {row['id']: row['lessons']['total'] for row in fresh['children']}
+    assert lessons[child.pk] == 2
+    assert {row['id']: row['lessons']['total'] for row in cached['children']}[child.pk] == 1
@@ -0,0 +1,108 @@
+import pytest
+
+from apps.progress.models import LearningPathProgress, LessonProgress
+
+pytestmark = pytest.mark.django_db
+
+# ETag (1) + caminho (1) + lições com Exists do quiz (1) + progresso das lições (1)
+# + progresso do caminho (1)
+AUTHENTICATED_QUERIES = 5
+
+
+def detail_url(path):
+    return f'/api/v1/learning/paths/{path.slug}/'
+
+
+@pytest.mark.parametrize('n_lessons', [3, 30])
+def test_detail_queries_do_not_grow_with_lessons(
+    auth_client, make_paths, django_assert_num_queries, n_lessons
+):
+    path, = make_paths(n_paths=1, n_lessons=n_lessons)
+    client = auth_client()
+    LearningPathProgress.objects.create(user=client.user, learning_path=path)
+    first, second = path.lessons.order_by('order')[:2]
+    LessonProgress.objects.create(user=client.user, lesson=first, status='completed')
+
+    with django_assert_num_queries(AUTHENTICATED_QUERIES):
+        response = client.get(detail_url(path))
+
+    assert response.status_code == 200
+    lessons = response.data['lessons']
+    assert len(lessons) == n_lessons
+    assert [lesson['has_quiz'] for lesson in lessons[:2]] == [True, False]
+    assert lessons[0]['progress_info']['status'] == 'completed'
+    assert lessons[1]['progress_info']['status'] == 'not_started'
+
+
+def test_anonymous_detail_is_served_from_the_catalog_cache(
+    api_client, make_paths, django_assert_max_num_queries, django_assert_num_queries
+):
+    path, = make_paths(n_paths=1, n_lessons=30)
+
+    with django_assert_max_num_queries(AUTHENTICATED_QUERIES):
+        first = api_client.get(detail_url(path))
+    with django_assert_num_queries(0):
+        second = api_client.get(detail_url(path))
+
+    assert (first['X-Catalog-Cache'], second['X-Catalog-Cache']) == ('MISS', 'HIT')
+    assert second.content == first.content
+    assert len(first.json()['lessons']) == 30
+
+
+def lesson_url(lesson):
+    return f'/api/v1/learning/paths/{lesson.learning_path.slug}/lessons/{lesson.slug}/'
+
+
+def test_detail_revalidates_with_one_query(auth_client, make_paths, django_assert_num_queries):
+    path, = make_paths(n_paths=1, n_lessons=3)
+    client = auth_client()
+
+    etag = client.get(detail_url(path))['ETag']
+    assert etag
+
+    with django_assert_num_queries(1):
+        response = client.get(detail_url(path), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+
+@pytest.mark.parametrize('edit', ['path', 'lesson', 'progress'])
+def test_detail_etag_changes_after_edits(auth_client, make_paths, edit):
+    path, = make_paths(n_paths=1, n_lessons=3)
+    client = auth_client()
+    etag = client.get(detail_url(path))['ETag']
+
+    if edit == 'path':
+        path.title = 'Novo título'
+        path.save()
+    elif edit == 'lesson':
+        lesson = path.lessons.order_by('order').last()
+        lesson.title = 'Nova lição'
+        lesson.save()
+    else:
+        LearningPathProgress.objects.create(user=client.user, learning_path=path)
+
+    response = client.get(detail_url(path), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+def test_lesson_detail_revalidates_with_one_query(auth_client, make_paths,
+                                                  django_assert_num_queries):
+    path, = make_paths(n_paths=1, n_lessons=2)
+    lesson = path.lessons.order_by('order').first()
+    client = auth_client()
+    etag = client.get(lesson_url(lesson))['ETag']
+
+    with django_assert_num_queries(1):
+        assert client.get(lesson_url(lesson), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    quiz = lesson.quiz
+    quiz.title = 'Outro quiz'
+    quiz.save()
+
+    response = client.get(lesson_url(lesson), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
@@ -0,0 +1,65 @@
+import pytest
+
+from apps.learning.models import LearningPath
+from apps.learning.serializers import LearningPathListSerializer
+from apps.progress.models import LearningPathProgress
+
+pytestmark = pytest.mark.django_db
+
+PATHS_URL = '/api/v1/learning/paths/'
+
+
+@pytest.mark.parametrize('page_size', [5, 20])
+def test_path_list_page_cost_is_constant(auth_client, make_paths, page_size,
+                                         django_assert_num_queries):
+    """Caminhos + progresso do usuário em lote, independente do tamanho da página"""
+    client = auth_client()
+    paths = make_paths(n_paths=25)
+    for path in paths[:15]:
+        LearningPathProgress.objects.create(
+            user=client.user, learning_path=path, status='in_progress',
+            current_lesson=path.lessons.first()
+        )
+
+    with django_assert_num_queries(2):
+        response = client.get(PATHS_URL, {'page_size': page_size})
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == page_size
+
+
+def test_path_list_progress_info_comes_from_batch(auth_client, make_paths):
+    client = auth_client()
+    path = make_paths(n_paths=1)[0]
+    LearningPathProgress.objects.create(
+        user=client.user, learning_path=path, status='in_progress', progress_percentage=40
+    )
+
+    result = client.get(PATHS_URL).data['results'][0]
+
+    assert result['progress_info']['status'] == 'in_progress'
+    assert result['progress_info']['progress_percentage'] == 40
+
+
+def test_anonymous_path_list_has_no_progress_query(api_client, make_paths,
+                                                   django_assert_num_queries):
+    make_paths(n_paths=10)
+
+    with django_assert_num_queries(1):
+        response = api_client.get(PATHS_URL)
+
+    assert response.status_code == 200
+    assert all(row['progress_info'] is None for row in response.data['results'])
+
+
+def test_total_lessons_counts_published_lessons_with_or_without_stats(api_client, make_paths):
+    path, = make_paths(n_paths=1, n_lessons=3)
+    path.lessons.filter(order=2).update(is_published=False)
+
+    annotated = LearningPath.objects.with_stats().get(pk=path.pk)
+    plain = LearningPath.objects.get(pk=path.pk)
+
+    assert annotated.total_lessons == plain.total_lessons == 2
+    assert LearningPathListSerializer(plain).data['total_lessons'] == 2
+    assert api_client.get(PATHS_URL).data['results'][0]['total_lessons'] == 2
+    assert api_client.get(f'{PATHS_URL}{path.slug}/').data['total_lessons'] == 2
@@ -0,0 +1,63 @@
+import pytest
+
+from apps.learning.cache import get_lesson_sequence
+
+pytestmark = pytest.mark.django_db
+
+
+def lesson_url(lesson):
+    return f'/api/v1/learning/paths/{lesson.learning_path.slug}/lessons/{lesson.slug}/'
+
+
+def slugs(sequence):
+    return [slug for _, _, slug in sequence]
+
+
+@pytest.fixture
+def lessons(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=4)
+    return list(path.lessons.order_by('order'))
+
+
+def test_navigation_skips_unpublished_lessons(api_client, lessons):
+    first, hidden, third, last = lessons
+    hidden.is_published = False
+    hidden.save()
+
+    first_data = api_client.get(lesson_url(first)).data
+    third_data = api_client.get(lesson_url(third)).data
+
+    assert first_data['previous_lesson'] is None
+    assert first_data['next_lesson']['slug'] == third.slug
+    assert third_data['previous_lesson']['slug'] == first.slug
+    assert third_data['next_lesson']['slug'] == last.slug
+    assert api_client.get(lesson_url(hidden)).status_code == 404
+
+
+def test_sequence_is_invalidated_on_lesson_save_and_delete(lessons, django_assert_num_queries):
+    first, second, third, last = lessons
+    path_id = first.learning_path_id
+    assert slugs(get_lesson_sequence(path_id)) == [first.slug, second.slug, third.slug, last.slug]
+
+    with django_assert_num_queries(0):
+        get_lesson_sequence(path_id)
+
+    first.order = 10
+    first.save()
+    assert slugs(get_lesson_sequence(path_id)) == [second.slug, third.slug, last.slug, first.slug]
+
+    second.delete()
+    assert slugs(get_lesson_sequence(path_id)) == [third.slug, last.slug, first.slug]
+
+
+def test_lesson_detail_costs_one_query(api_client, lessons, django_assert_num_queries):
+    lesson = lessons[1]
+    api_client.get(lesson_url(lesson))
+
+    # Marca d'água do ETag e a lição; as vizinhas saem da sequência em cache
+    with django_assert_num_queries(2):
+        response = api_client.get(lesson_url(lesson))
+
+    assert response.status_code == 200
+    assert response.data['previous_lesson']['slug'] == lessons[0].slug
+    assert response.data['next_lesson']['slug'] == lessons[2].slug
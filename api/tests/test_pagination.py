@@ -0,0 +1,76 @@
+import base64
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+PATHS_URL = '/api/v1/learning/paths/'
+
+
+def _cursor(values, reverse=False):
+    payload = json.dumps({'v': values, 'r': int(reverse)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def _walk(client, url, params):
+    pages = []
+    response = client.get(url, params)
+    while True:
+        pages.append([row['id'] for row in response.data['results']])
+        if not response.data['next']:
+            return pages, response
+        response = client.get(response.data['next'])
+
+
+def test_keyset_pages_cover_every_row_once(api_client, make_paths):
+    paths = make_paths(n_paths=12, n_lessons=1)
+    for path in paths[::3]:
+        path.is_featured = True
+        path.save()
+
+    pages, last = _walk(api_client, PATHS_URL, {'page_size': 5})
+    ids = [path_id for page in pages for path_id in page]
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert sorted(ids) == sorted(str(path.pk) for path in paths)
+    assert ids[:4] == [str(path.pk) for path in sorted(
+        paths[::3], key=lambda path: (path.order, -path.created_at.timestamp())
+    )]
+
+    previous = api_client.get(last.data['previous'])
+    assert [row['id'] for row in previous.data['results']] == pages[1]
+
+
+def test_deep_page_costs_one_query_without_offset_or_count(api_client, make_paths):
+    make_paths(n_paths=30, n_lessons=1)
+    response = api_client.get(PATHS_URL, {'page_size': 5})
+    for _ in range(4):
+        response = api_client.get(response.data['next'])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(response.data['next'])
+
+    assert response.status_code == 200
+    assert len(queries) == 1
+    sql = queries[0]['sql'].upper()
+    assert 'OFFSET' not in sql
+    assert 'COUNT(*)' not in sql
+
+
+@pytest.mark.parametrize('cursor', [
+    'não-é-base64',
+    _cursor(['x']),
+    _cursor([False, 0, '2024-01-01T00:00:00+00:00', 'não-é-uuid']),
+    _cursor([False, 0, {'a': 1}, '1d3c1f3e-8d8b-4c1f-9a55-2f1c3f8e0b6a']),
+    _cursor([False, 'zero', '2024-01-01T00:00:00+00:00', '1d3c1f3e-8d8b-4c1f-9a55-2f1c3f8e0b6a']),
+    _cursor([False, 0, 'ontem', '1d3c1f3e-8d8b-4c1f-9a55-2f1c3f8e0b6a']),
+])
+def test_invalid_cursor_returns_not_found(api_client, make_paths, cursor):
+    make_paths(n_paths=2, n_lessons=1)
+
+    response = api_client.get(PATHS_URL, {'cursor': cursor})
+
+    assert response.status_code == 404
@@ -0,0 +1,63 @@
+import pytest
+
+from apps.learning.models import Lesson
+from apps.progress.models import LearningPathProgress, LessonProgress
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def completed_path(make_paths, make_user):
+    """Caminho com 2 lições concluídas por um usuário"""
+    path, = make_paths(n_paths=1, n_lessons=2)
+    user = make_user()
+    for lesson in path.lessons.all():
+        LessonProgress.objects.create(user=user, lesson=lesson, status='completed')
+    progress = LearningPathProgress.objects.create(user=user, learning_path=path)
+    LearningPathProgress.refresh_counters([path.pk])
+    progress.refresh_from_db()
+    assert (progress.status, progress.progress_percentage) == ('completed', 100)
+    assert progress.completed_at is not None
+    return path, progress
+
+
+def test_new_lesson_reverts_completed_path_to_in_progress(completed_path):
+    path, progress = completed_path
+
+    new_lesson = Lesson.objects.create(learning_path=path, title='Nova', order=9, is_published=True)
+    progress.refresh_from_db()
+    assert (progress.status, progress.progress_percentage) == ('in_progress', 66)
+    assert progress.completed_at is None
+
+    new_lesson.is_published = False
+    new_lesson.save()
+    progress.refresh_from_db()
+    assert (progress.status, progress.progress_percentage) == ('completed', 100)
+    assert progress.completed_at is not None
+
+
+def test_path_without_lessons_drops_stale_percentage(completed_path):
+    path, progress = completed_path
+
+    Lesson.objects.filter(learning_path=path).update(is_published=False)
+    LearningPathProgress.refresh_counters([path.pk])
+    progress.refresh_from_db()
+
+    assert (progress.total_published_lessons, progress.progress_percentage) == (0, 0)
+    assert progress.status == 'in_progress'
+    assert progress.completed_at is None
+
+
+def test_refresh_counters_is_two_updates(make_paths, make_user, django_assert_num_queries):
+    path, = make_paths(n_paths=1, n_lessons=2)
+    LearningPathProgress.objects.bulk_create([
+        LearningPathProgress(user=make_user(), learning_path=path) for _ in range(20)
+    ])
+
+    with django_assert_num_queries(2):
+        updated = LearningPathProgress.refresh_counters([path.pk])
+
+    assert updated == 20
+    assert set(
+        LearningPathProgress.objects.values_list('total_published_lessons', flat=True)
+    ) == {2}
@@ -0,0 +1,81 @@
+import pytest
+
+from apps.learning.cache import get_compiled_questions, get_quiz_version, shuffle_questions
+from apps.learning.models import Answer, Question
+from apps.progress.models import QuizAttempt
+
+pytestmark = pytest.mark.django_db
+
+
+def quiz_url(lesson):
+    return f'/api/v1/learning/lessons/{lesson.pk}/quiz/'
+
+
+def order_of(questions):
+    return [
+        (question['id'], [answer['id'] for answer in question['answers']])
+        for question in questions
+    ]
+
+
+@pytest.fixture
+def quiz(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    quiz = path.lessons.get().quiz
+    for k in range(3, 8):
+        question = Question.objects.create(quiz=quiz, question_text='?', order=k)
+        for m in range(3):
+            Answer.objects.create(question=question, answer_text=str(m), is_correct=m == 0, order=m)
+    quiz.randomize_questions = True
+    quiz.save()
+    return quiz
+
+
+def expected_order(quiz, user, attempt_number):
+    seed = f'{quiz.pk}:{user.pk}:{attempt_number}'
+    return order_of(shuffle_questions(get_compiled_questions(quiz), seed))
+
+
+def test_shuffle_is_stable_per_user_and_attempt(auth_client, quiz):
+    first, second = auth_client(), auth_client()
+    url = quiz_url(quiz.lesson)
+
+    order = order_of(first.get(url).data['questions'])
+    assert order == order_of(first.get(url).data['questions'])
+    assert order == expected_order(quiz, first.user, 1)
+    assert order_of(second.get(url).data['questions']) == expected_order(quiz, second.user, 1)
+
+    # A tentativa em andamento mantém a ordem; a seguinte recebe outra semente
+    attempt = QuizAttempt.objects.create(
+        user=first.user, quiz=quiz, attempt_number=1, total_questions=8
+    )
+    assert order_of(first.get(url).data['questions']) == order
+
+    attempt.status = 'completed'
+    attempt.save()
+    assert order_of(first.get(url).data['questions']) == expected_order(quiz, first.user, 2)
+
+
+def test_question_and_answer_edits_bump_quiz_version(quiz):
+    question = quiz.questions.order_by('order').first()
+    answer = question.answers.order_by('order').first()
+    version = get_quiz_version(quiz.pk)
+    get_compiled_questions(quiz)
+
+    question.question_text = 'Quem construiu a arca?'
+    question.save()
+    assert get_quiz_version(quiz.pk) == version + 1
+
+    answer.answer_text = 'Noé'
+    answer.save()
+    assert get_quiz_version(quiz.pk) == version + 2
+
+    compiled = {row['id']: row for row in get_compiled_questions(quiz)}
+    assert compiled[question.pk]['question_text'] == 'Quem construiu a arca?'
+    assert compiled[question.pk]['answers'][0]['answer_text'] == 'Noé'
+
+    answer.delete()
+    assert get_quiz_version(quiz.pk) == version + 3
+    question.delete()
+    assert get_quiz_version(quiz.pk) > version + 3
+    assert question.pk not in {row['id'] for row in get_compiled_questions(quiz)}
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.learning.models import Answer, Question
+from apps.progress.models import QuestionAnswer, QuizAttempt
+
+pytestmark = pytest.mark.django_db
+
+
+def submit_url(lesson):
+    return f'/api/v1/progress/lessons/{lesson.pk}/quiz/submit/'
+
+
+def quiz_lesson(make_paths, n_questions=3):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    lesson = path.lessons.get()
+    for k in range(3, n_questions):
+        question = Question.objects.create(quiz=lesson.quiz, question_text='?', order=k)
+        for m in range(3):
+            Answer.objects.create(question=question, answer_text=str(m), is_correct=m == 0, order=m)
+    return lesson
+
+
+def answers_for(lesson, correct=True):
+    answers = []
+    for question in lesson.quiz.questions.order_by('order').prefetch_related('answers'):
+        choice = [answer for answer in question.answers.all() if answer.is_correct == correct][0]
+        answers.append({'question_id': question.pk, 'answer_id': choice.pk})
+    return answers
+
+
+def test_submission_grades_every_answer(auth_client, make_paths):
+    lesson = quiz_lesson(make_paths)
+    client = auth_client()
+    answers = answers_for(lesson)
+    answers[-1] = answers_for(lesson, correct=False)[-1]
+
+    response = client.post(submit_url(lesson), {'answers': answers}, format='json')
+
+    assert response.status_code == 201
+    assert (response.data['correct_answers'], response.data['wrong_answers']) == (2, 1)
+    assert [item['is_correct'] for item in response.data['results']] == [True, True, False]
+    attempt = QuizAttempt.objects.get(user=client.user)
+    assert attempt.status == 'completed'
+    assert QuestionAnswer.objects.filter(quiz_attempt=attempt).count() == 3
+
+
+def test_submission_queries_do_not_grow_with_questions(auth_client, make_paths):
+    counts = []
+    for n_questions in (3, 30):
+        lesson = quiz_lesson(make_paths, n_questions)
+        client = auth_client()
+        answers = answers_for(lesson)
+        # Gabarito já em cache: mede apenas a correção e a gravação
+        client.post(submit_url(lesson), {'answers': answers}, format='json')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(submit_url(lesson), {'answers': answers}, format='json')
+        assert response.status_code == 201
+        assert response.data['correct_answers'] == n_questions
+        counts.append(len([
+            query for query in queries if 'SAVEPOINT' not in query['sql']
+        ]))
+
+    # Quiz, número da tentativa, INSERT da tentativa e INSERT das respostas
+    assert counts == [4, 4]
+    inserts = [
+        query for query in queries
+        if query['sql'].startswith('INSERT INTO "question_answers"')
+    ]
+    assert len(inserts) == 1
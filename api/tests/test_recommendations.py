@@ -0,0 +1,92 @@
+import pytest
+
+from apps.learning.models import PathPopularity
+from apps.learning.popularity import get_popularity_rankings, refresh_path_popularity
+from apps.progress.models import LearningPathProgress
+from apps.progress.tokens import touch_progress
+
+pytestmark = pytest.mark.django_db
+
+RECOMMENDATIONS_URL = '/api/v1/learning/recommendations/'
+
+
+def test_recommendations_endpoint(auth_client, make_paths):
+    client = auth_client()
+    started, *others = make_paths(n_paths=4, n_lessons=1)
+    LearningPathProgress.objects.create(
+        user=client.user, learning_path=started, status='in_progress'
+    )
+
+    response = client.get(RECOMMENDATIONS_URL)
+
+    assert response.status_code == 200
+    assert set(response.data) == {'recommended', 'age_based', 'in_progress', 'similar_to_completed'}
+    assert {path['id'] for path in response.data['recommended']} == {str(path.pk) for path in others}
+    assert response.data['in_progress'][0]['learning_path']['id'] == str(started.pk)
+
+
+@pytest.mark.parametrize('n_paths', [4, 12])
+def test_recommendations_queries(auth_client, make_paths, n_paths, django_assert_num_queries):
+    client = auth_client()
+    completed, started, *_ = make_paths(n_paths=n_paths, n_lessons=2)
+    LearningPathProgress.objects.bulk_create([
+        LearningPathProgress(user=client.user, learning_path=completed, status='completed'),
+        LearningPathProgress(user=client.user, learning_path=started, status='in_progress'),
+    ])
+
+    # Progresso, candidatos pontuados e caminhos em andamento, qualquer que
+    # seja o tamanho do catálogo
+    with django_assert_num_queries(3):
+        cold = client.get(RECOMMENDATIONS_URL)
+
+    with django_assert_num_queries(0):
+        warm = client.get(RECOMMENDATIONS_URL)
+    assert cold.data == warm.data
+
+    touch_progress([client.user.pk])
+    with django_assert_num_queries(3):
+        client.get(RECOMMENDATIONS_URL)
+
+
+def test_cached_recommendations_use_the_host_of_each_request(auth_client, make_paths, settings):
+    settings.ALLOWED_HOSTS = ['a.example', 'b.example']
+    client = auth_client()
+    path, = make_paths(n_paths=1, n_lessons=1)
+    path.cover_image = 'learning_paths/arca.png'
+    path.save()
+
+    first = client.get(RECOMMENDATIONS_URL, HTTP_HOST='a.example')
+    second = client.get(RECOMMENDATIONS_URL, HTTP_HOST='b.example')
+
+    assert first.data['recommended'][0]['cover_image'] == (
+        'http://a.example/media/learning_paths/arca.png'
+    )
+    assert second.data['recommended'][0]['cover_image'] == (
+        'http://b.example/media/learning_paths/arca.png'
+    )
+
+
+def test_path_progress_updates_refresh_the_cache(auth_client, make_paths):
+    client = auth_client()
+    started, _ = make_paths(n_paths=2, n_lessons=1)
+    progress = LearningPathProgress.objects.create(
+        user=client.user, learning_path=started, status='in_progress'
+    )
+    assert client.get(RECOMMENDATIONS_URL).data['in_progress'][0]['progress_percentage'] == 0
+
+    progress.progress_percentage = 50
+    progress.save()
+
+    assert client.get(RECOMMENDATIONS_URL).data['in_progress'][0]['progress_percentage'] == 50
+
+
+def test_featured_ranking_follows_popularity(make_paths, make_user):
+    quiet, popular = make_paths(n_paths=2, n_lessons=1, is_featured=True)
+    LearningPathProgress.objects.bulk_create([
+        LearningPathProgress(user=make_user(), learning_path=popular) for _ in range(2)
+    ])
+
+    refresh_path_popularity()
+
+    assert PathPopularity.objects.get(learning_path=popular).popularity > 0
+    assert get_popularity_rankings()['featured'] == [popular.pk, quiet.pk]
@@ -0,0 +1,91 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.learning.models import Category, LearningPath
+from apps.search.backends import search
+from apps.search.documents import index_objects
+from apps.search.models import SearchDocument
+
+pytestmark = pytest.mark.django_db
+
+PATHS_URL = '/api/v1/learning/paths/'
+
+
+def _walk(client, params):
+    """Segue os links `next` e retorna os títulos na ordem recebida"""
+    titles = []
+    response = client.get(PATHS_URL, params)
+    while True:
+        assert response.status_code == 200
+        titles.extend(row['title'] for row in response.data['results'])
+        if not response.data['next']:
+            return titles
+        response = client.get(response.data['next'])
+
+
+def test_search_results_keep_relevance_order(api_client, make_paths):
+    title_match, description_match, objective_match = make_paths(n_paths=3, n_lessons=0)
+    LearningPath.objects.filter(pk=title_match.pk).update(title='Jonas e a baleia')
+    LearningPath.objects.filter(pk=description_match.pk).update(description='A história de Jonas')
+    LearningPath.objects.filter(pk=objective_match.pk).update(objectives=['Conhecer Jonas'])
+    # Insere na ordem inversa da relevância para não depender da ordem padrão
+    index_objects('learning_path', LearningPath.objects.order_by('-title'))
+
+    titles = _walk(api_client, {'search': 'jonas', 'page_size': 1})
+
+    assert titles == ['Jonas e a baleia', description_match.title, objective_match.title]
+
+
+def test_explicit_ordering_overrides_relevance(api_client, make_paths):
+    make_paths(n_paths=3, n_lessons=0, tags='Jonas')
+
+    titles = _walk(api_client, {'search': 'jonas', 'ordering': '-title'})
+
+    assert titles == ['Caminho 2', 'Caminho 1', 'Caminho 0']
+
+
+def test_memory_backend_ranks_a_fixed_number_of_results(api_client, settings):
+    settings.SEARCH_FILTER_MAX_RESULTS = 100
+    category = Category.objects.create(name='Histórias')
+    paths = LearningPath.objects.bulk_create([
+        LearningPath(
+            title=f'Jonas {i:04d}', slug=f'jonas-{i:04d}', description='Descrição',
+            category=category, age_group='6-8', difficulty_level='beginner',
+            estimated_duration_minutes=10, is_published=True
+        )
+        for i in range(105)
+    ])
+    index_objects('learning_path', paths)
+    search(['jona'], kinds=['learning_path'])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(PATHS_URL, {'search': 'jonas', 'page_size': 100})
+    assert len(queries) == 1
+
+    # Empates de relevância são desfeitos pelo título
+    titles = _walk(api_client, {'search': 'jonas', 'page_size': 100})
+    assert titles == [f'Jonas {i:04d}' for i in range(100)]
+    assert response.status_code == 200
+
+
+def test_rebuild_removes_orphans_in_batches(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=0)
+    SearchDocument.objects.bulk_create([
+        SearchDocument(kind='learning_path', object_id=f'orfao-{i}', title='Órfão', is_published=True)
+        for i in range(1200)
+    ])
+    output = StringIO()
+
+    with CaptureQueriesContext(connection) as queries:
+        call_command('rebuild_search_index', kind=['learning_path'], batch_size=500, stdout=output)
+
+    assert list(
+        SearchDocument.objects.filter(kind='learning_path').values_list('object_id', flat=True)
+    ) == [str(path.pk)]
+    assert '1200 órfãos removidos' in output.getvalue()
+    deletes = [query for query in queries if query['sql'].startswith('DELETE')]
+    assert len(deletes) == 3
@@ -0,0 +1,117 @@
+import pytest
+
+from apps.learning.models import (
+    CountedEnrollment, PathCoEnrollment, PathEnrollmentCount, PathSimilarity
+)
+from apps.learning.similarity import WATERMARK_OVERLAP, update_similarity_index
+from apps.progress.models import LearningPathProgress
+
+pytestmark = pytest.mark.django_db
+
+
+def enroll(user, *paths):
+    return [LearningPathProgress.objects.create(user=user, learning_path=path) for path in paths]
+
+
+def index_state():
+    return (
+        {
+            (row.learning_path_id, row.other_path_id): row.count
+            for row in PathCoEnrollment.objects.all()
+        },
+        dict(PathEnrollmentCount.objects.values_list('learning_path_id', 'total')),
+        sorted(
+            (str(row.learning_path_id), row.rank, str(row.similar_path_id), round(row.score, 6))
+            for row in PathSimilarity.objects.all()
+        ),
+    )
+
+
+def full_rebuild_state():
+    update_similarity_index(full=True)
+    return index_state()
+
+
+@pytest.fixture
+def paths(make_paths):
+    return make_paths(n_paths=4, n_lessons=1)
+
+
+def test_incremental_matches_full_rebuild(paths, make_user):
+    a, b, c, d = paths
+    users = [make_user() for _ in range(4)]
+    enroll(users[0], a, b)
+    enroll(users[1], a, b, c)
+    first = update_similarity_index()
+    assert first.full_rebuild and first.new_enrollments == 5
+
+    enroll(users[2], a, b, d)
+    enroll(users[0], c)
+    run = update_similarity_index()
+
+    assert not run.full_rebuild
+    assert run.new_enrollments == 4
+    incremental = index_state()
+    assert incremental[0][(a.pk, b.pk)] == 3
+    assert incremental[1] == {a.pk: 3, b.pk: 3, c.pk: 2, d.pk: 1}
+    assert incremental == full_rebuild_state()
+
+
+def test_late_commit_inside_overlap_is_counted_once(paths, make_user):
+    a, b, *_ = paths
+    first_user, late_user = make_user(), make_user()
+    enroll(first_user, a, b)
+    run = update_similarity_index()
+
+    # Criada antes da marca d'água, mas confirmada depois da execução anterior
+    late = enroll(late_user, a, b)
+    LearningPathProgress.objects.filter(pk__in=[row.pk for row in late]).update(
+        created_at=run.watermark - WATERMARK_OVERLAP / 2
+    )
+    assert update_similarity_index().new_enrollments == 2
+    assert update_similarity_index().new_enrollments == 0
+
+    state = index_state()
+    assert state[0][(a.pk, b.pk)] == 2
+    assert state[1] == {a.pk: 2, b.pk: 2}
+    assert CountedEnrollment.objects.count() == 4
+    assert state == full_rebuild_state()
+
+
+def test_deleted_enrollments_are_discounted(paths, make_user):
+    a, b, c, _ = paths
+    users = [make_user() for _ in range(3)]
+    for user in users:
+        enroll(user, a, b, c)
+    update_similarity_index()
+
+    LearningPathProgress.objects.filter(user=users[0], learning_path__in=[a, b]).delete()
+    users[1].delete()
+    enroll(users[2], paths[3])
+    run = update_similarity_index()
+
+    state = index_state()
+    assert run.new_enrollments == 1
+    assert state[0][(a.pk, b.pk)] == 1
+    assert state[0][(a.pk, c.pk)] == 1
+    assert state[1] == {a.pk: 1, b.pk: 1, c.pk: 2, paths[3].pk: 1}
+    assert not CountedEnrollment.objects.filter(removed=True).exists()
+    assert state == full_rebuild_state()
+
+
+def test_incremental_run_does_not_depend_on_history(paths, make_user, django_assert_num_queries):
+    a, b, c, _ = paths
+    for _ in range(20):
+        enroll(make_user(), a, b, c)
+    update_similarity_index()
+    user = make_user()
+    enroll(user, a, b)
+
+    # Última execução, inscrições contadas do usuário, inscrições novas,
+    # registro, matriz (leitura e escrita), diagonal (leitura e escrita),
+    # vizinhos (leitura, diagonal, remoção e escrita), a execução e o savepoint
+    with django_assert_num_queries(15):
+        update_similarity_index()
+
+    # Os vizinhos dos caminhos não afetados só são renormalizados no recálculo completo
+    assert index_state()[:2] == full_rebuild_state()[:2]
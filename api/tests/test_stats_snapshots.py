@@ -0,0 +1,54 @@
+import pytest
+
+from apps.progress.models import LessonProgress, UserStatsSnapshot
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lessons(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=3)
+    return list(path.lessons.order_by('order'))
+
+
+def test_first_change_creates_a_recounted_snapshot(make_user, lessons):
+    user = make_user()
+    assert not UserStatsSnapshot.objects.filter(user=user).exists()
+
+    # O incremento sem snapshot cria a linha recontada (sem contar duas vezes)
+    LessonProgress.objects.create(user=user, lesson=lessons[0], status='completed')
+    snapshot = UserStatsSnapshot.objects.get(user=user)
+    assert (snapshot.lessons_total, snapshot.lessons_completed) == (1, 1)
+
+    LessonProgress.objects.create(user=user, lesson=lessons[1])
+    snapshot.refresh_from_db()
+    assert (snapshot.lessons_total, snapshot.lessons_completed) == (2, 1)
+
+
+def test_get_for_recounts_and_later_increments_apply(make_user, lessons):
+    user = make_user()
+    LessonProgress.objects.bulk_create([
+        LessonProgress(user=user, lesson=lesson, status='completed') for lesson in lessons[:2]
+    ])
+
+    snapshot = UserStatsSnapshot.get_for(user.pk)
+    assert (snapshot.lessons_total, snapshot.lessons_completed) == (2, 2)
+
+    LessonProgress(user=user, lesson=lessons[2]).mark_completed()
+    snapshot.refresh_from_db()
+    assert (snapshot.lessons_total, snapshot.lessons_completed) == (3, 3)
+
+
+def test_reconcile_fixes_bulk_status_changes(make_user, lessons, django_assert_num_queries):
+    users = [make_user() for _ in range(3)]
+    for user in users:
+        LessonProgress.objects.create(user=user, lesson=lessons[0])
+    LessonProgress.objects.filter(user=users[0]).update(status='completed')
+
+    # Lotes de 2 usuários: 2 lotes com comparação (2 consultas cada), 1 vazio
+    # e 1 UPDATE para o snapshot divergente
+    with django_assert_num_queries(6):
+        assert UserStatsSnapshot.reconcile(batch_size=2) == 1
+
+    assert UserStatsSnapshot.objects.get(user=users[0]).lessons_completed == 1
+    assert UserStatsSnapshot.reconcile() == 0
@@ -0,0 +1,146 @@
+import threading
+
+import pytest
+from django.db import transaction
+
+from apps.learning.models import Category, LearningPath
+from apps.learning.suggestions import suggestion_index
+from apps.progress.models import LearningPathProgress
+
+pytestmark = pytest.mark.django_db
+
+SUGGESTIONS_URL = '/api/v1/learning/search-suggestions/'
+
+
+def test_warm_lookup_does_not_query_the_database(api_client, make_paths, django_assert_num_queries):
+    make_paths(n_paths=3, n_lessons=1, tags='Fé, Oração')
+    suggestion_index.rebuild()
+
+    with django_assert_num_queries(0):
+        response = api_client.get(SUGGESTIONS_URL, {'q': 'cam'})
+
+    assert response.status_code == 200
+    assert response.data['suggestions'] == ['Caminho 0', 'Caminho 1', 'Caminho 2']
+
+
+def test_suggestions_are_ranked_by_enrolments(make_paths, make_user):
+    first, second = make_paths(n_paths=2, n_lessons=1)
+    LearningPathProgress.objects.create(user=make_user(), learning_path=second)
+    suggestion_index.rebuild()
+
+    assert suggestion_index.lookup('caminho') == ['Caminho 1', 'Caminho 0']
+
+
+def test_popular_match_is_found_past_many_alphabetical_keys(make_paths, make_user):
+    Category.objects.bulk_create(
+        Category(name=f'Cat {i:03}', slug=f'cat-{i:03}') for i in range(600)
+    )
+    popular = Category.objects.create(name='Cat zz', slug='cat-zz')
+    path, = make_paths(n_paths=1, n_lessons=1, category=popular)
+    LearningPathProgress.objects.create(user=make_user(), learning_path=path)
+    suggestion_index.rebuild()
+
+    assert suggestion_index.lookup('cat') == ['Cat zz', 'Cat 000', 'Cat 001']
+
+
+def test_short_prefix_results_follow_updates(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    suggestion_index.rebuild()
+    assert suggestion_index.lookup('ca') == ['Caminho 0', 'Categoria 0']
+
+    suggestion_index.upsert_path(path.pk, 'Jornada', [])
+
+    assert suggestion_index.lookup('ca') == ['Categoria 0']
+    assert suggestion_index.lookup('j') == ['Jornada']
+
+
+def test_unpublishing_a_path_drops_its_unused_tags(make_paths, django_capture_on_commit_callbacks):
+    shared, only = make_paths(n_paths=2, n_lessons=1, tags='Fé')
+    only.tags = 'Fé, Jonas'
+    only.save()
+    suggestion_index.rebuild()
+    assert 'Jonas' in suggestion_index.lookup('jonas')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        only.is_published = False
+        only.save()
+
+    assert suggestion_index.lookup('jonas') == []
+    assert suggestion_index.lookup('caminho') == ['Caminho 0']
+    # "Fé" continua em uso por outro caminho publicado
+    assert suggestion_index.lookup('fe') == ['Fé']
+
+
+def test_changed_tags_leave_the_index(make_paths, django_capture_on_commit_callbacks):
+    path, = make_paths(n_paths=1, n_lessons=1, tags='Fé, Jonas')
+    suggestion_index.rebuild()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        path.tags = 'Fé, Noé'
+        path.save()
+
+    assert suggestion_index.lookup('jonas') == []
+    assert suggestion_index.lookup('noe') == ['Noé']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        LearningPath.objects.get(pk=path.pk).delete()
+    assert suggestion_index.lookup('noe') == []
+
+
+def test_rolled_back_save_does_not_reach_the_index(make_paths, django_capture_on_commit_callbacks):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    suggestion_index.rebuild()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            path.title = 'Caminho fantasma'
+            path.save()
+            raise RuntimeError
+
+    assert suggestion_index.lookup('caminho') == ['Caminho 0']
+
+
+def test_changes_made_during_a_rebuild_are_reapplied(make_paths, monkeypatch):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    read_snapshot = suggestion_index._read_snapshot
+
+    def read_then_rename():
+        # O banco já foi lido quando o sinal de outra requisição chega
+        snapshot = read_snapshot()
+        suggestion_index.upsert_path(path.pk, 'Caminho renomeado', [('jonas', 'Jonas')])
+        return snapshot
+
+    monkeypatch.setattr(suggestion_index, '_read_snapshot', read_then_rename)
+    suggestion_index.rebuild()
+
+    assert suggestion_index.lookup('caminho') == ['Caminho renomeado']
+    assert suggestion_index.lookup('jonas') == ['Jonas']
+    assert suggestion_index._changes == []
+
+
+def test_lookups_are_consistent_during_updates(make_paths):
+    paths = make_paths(n_paths=2, n_lessons=1)
+    suggestion_index.rebuild()
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                result = suggestion_index.lookup('caminho')
+                assert 'Caminho 0' in result
+        except Exception as exc:
+            errors.append(exc)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        suggestion_index.upsert_path(paths[1].pk, f'Caminho extra {i}', [(f'tag-{i}', f'Tag {i}')])
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert suggestion_index.lookup('tag 19') == ['Tag 199']
+    assert suggestion_index.lookup('tag 1') == ['Tag 199']
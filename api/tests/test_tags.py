@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.content.models import Story
+from apps.learning.models import LearningPathTag, Tag
+
+pytestmark = pytest.mark.django_db
+
+PATHS_URL = '/api/v1/learning/paths/'
+
+
+def test_tag_filter_matches_whole_tags_only(api_client, make_paths):
+    faith = make_paths(n_paths=2, n_lessons=1, tags='Fé, Família')
+    make_paths(n_paths=2, n_lessons=1, tags='Café da manhã, Oração')
+
+    response = api_client.get(PATHS_URL, {'tags': 'fe'})
+
+    assert sorted(row['id'] for row in response.data['results']) == sorted(
+        str(path.pk) for path in faith
+    )
+
+
+def test_tag_filter_is_a_single_indexed_join(api_client, make_paths):
+    make_paths(n_paths=10, n_lessons=1, tags='Fé, Oração')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(PATHS_URL, {'tags': 'fé,oração'})
+
+    assert response.status_code == 200
+    assert len(queries) == 1
+    sql = queries[0]['sql']
+    assert 'learning_path_tags' in sql
+    assert 'LIKE' not in sql.upper()
+
+
+def test_tags_are_synced_on_save_only_when_changed(make_paths):
+    path = make_paths(n_paths=1, n_lessons=1, tags='Fé, Amor')[0]
+    assert sorted(path.normalized_tags.values_list('slug', flat=True)) == ['amor', 'fe']
+
+    path.tags = 'Amor, Esperança'
+    path.save()
+    assert sorted(path.normalized_tags.values_list('slug', flat=True)) == ['amor', 'esperanca']
+
+    links = LearningPathTag.objects.count()
+    path.title = 'Outro título'
+    path.save()
+    assert LearningPathTag.objects.count() == links
+
+
+def test_rebuild_tag_index_restores_links(make_paths):
+    path = make_paths(n_paths=1, n_lessons=1, tags='Fé, Amor')[0]
+    story = Story.objects.create(
+        title='Davi', summary='s', content='c', age_group='6-8', moral_lesson='m',
+        tags='Coragem'
+    )
+    LearningPathTag.objects.all().delete()
+    story.normalized_tags.clear()
+
+    call_command('rebuild_tag_index', stdout=StringIO())
+
+    assert sorted(path.normalized_tags.values_list('slug', flat=True)) == ['amor', 'fe']
+    assert list(story.normalized_tags.values_list('slug', flat=True)) == ['coragem']
+    assert Tag.objects.count() == 3
@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.common.write_behind import LocalBuffer
+from apps.progress import time_tracking
+from apps.progress.models import (
+    DailyGoal, LearningPathProgress, LessonProgress, StudyStreak, TimeTrackingFlush
+)
+from apps.progress.time_tracking import flush_pending_time, record_time
+
+pytestmark = pytest.mark.django_db
+
+HEARTBEAT_URL = '/api/v1/progress/heartbeat/'
+
+
+@pytest.fixture(autouse=True)
+def no_background_flush(monkeypatch):
+    # Os testes chamam flush_pending_time() explicitamente
+    monkeypatch.setattr(LocalBuffer, '_flush_periodically', lambda self: None)
+
+
+@pytest.fixture
+def lesson(make_paths):
+    path, = make_paths(n_paths=1, n_lessons=1)
+    return path.lessons.get()
+
+
+def record(user, lesson, seconds):
+    record_time(user.pk, str(lesson.pk), str(lesson.learning_path_id), seconds)
+
+
+def test_heartbeat_never_writes_to_the_database(auth_client, lesson, settings):
+    settings.TIME_TRACKING_FLUSH_INTERVAL = 0
+    client = auth_client()
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(3):
+            response = client.post(
+                HEARTBEAT_URL, {'lesson_id': str(lesson.pk), 'seconds': 120}, format='json'
+            )
+
+    assert response.status_code == 202
+    assert response.data['pending_seconds'] == 360
+    assert not [query for query in queries if not query['sql'].startswith('SELECT')]
+
+    assert flush_pending_time() == 18
+    assert LessonProgress.objects.get(user=client.user).time_spent_minutes == 6
+
+
+def test_flush_marks_daily_goal_achieved(make_user, lesson):
+    user = make_user()
+    goal = DailyGoal.objects.create(
+        user=user, date=timezone.now().date(), goal_minutes=15, lessons_completed=1
+    )
+    record(user, lesson, 14 * 60)
+    flush_pending_time()
+    goal.refresh_from_db()
+    assert (goal.completed_minutes, goal.achieved) == (14, False)
+
+    record(user, lesson, 60)
+    flush_pending_time()
+    goal.refresh_from_db()
+
+    assert (goal.completed_minutes, goal.achieved, goal.bonus_points) == (15, True, 50)
+    assert StudyStreak.objects.get(user=user).current_streak == 1
+
+
+def test_goal_without_lessons_is_not_achieved(make_user, lesson):
+    user = make_user()
+    record(user, lesson, 30 * 60)
+
+    flush_pending_time()
+
+    goal = DailyGoal.objects.get(user=user)
+    assert (goal.completed_minutes, goal.achieved) == (30, False)
+    assert not StudyStreak.objects.filter(user=user).exists()
+
+
+def test_flush_bumps_updated_at(make_user, lesson):
+    user = make_user()
+    record(user, lesson, 60)
+    flush_pending_time()
+    stale = timezone.now() - timedelta(days=1)
+    LessonProgress.objects.filter(user=user).update(updated_at=stale)
+    DailyGoal.objects.filter(user=user).update(updated_at=stale)
+
+    record(user, lesson, 60)
+    flush_pending_time()
+
+    assert LessonProgress.objects.get(user=user).updated_at > stale
+    assert DailyGoal.objects.get(user=user).updated_at > stale
+
+
+def test_flush_queries_do_not_grow_with_users(make_user, lesson):
+    counts = []
+    for n_users in (5, 20):
+        users = [make_user() for _ in range(n_users)]
+        for user in users:
+            record(user, lesson, 60)
+        flush_pending_time()
+        for user in users:
+            record(user, lesson, 120)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert flush_pending_time() == 3 * 2 * n_users
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
+    assert TimeTrackingFlush.objects.count() == 4
+
+
+def test_deleted_lesson_does_not_block_the_batch(make_user, make_paths):
+    path, = make_paths(n_paths=1, n_lessons=2)
+    kept, deleted = path.lessons.order_by('order')
+    user = make_user()
+    record(user, kept, 120)
+    record(user, deleted, 180)
+
+    deleted.delete()
+
+    assert flush_pending_time() == 2 + 5 + 5
+    assert list(LessonProgress.objects.values_list('lesson_id', 'time_spent_minutes')) == [
+        (kept.pk, 2)
+    ]
+    assert LearningPathProgress.objects.get(user=user).total_time_spent_minutes == 5
+    assert time_tracking.get_time_buffer().recover_batches() == []
+
+
+def test_failed_apply_keeps_the_batch_for_the_next_flush(make_user, lesson, monkeypatch):
+    user = make_user()
+    record(user, lesson, 120)
+    apply_minutes = time_tracking._apply_minutes
+
+    def fail(minutes):
+        raise IntegrityError('violação de chave estrangeira')
+
+    monkeypatch.setattr(time_tracking, '_apply_minutes', fail)
+    with pytest.raises(IntegrityError):
+        flush_pending_time()
+    assert not TimeTrackingFlush.objects.exists()
+
+    monkeypatch.setattr(time_tracking, '_apply_minutes', apply_minutes)
+    assert flush_pending_time() == 6
+    assert LessonProgress.objects.get(user=user).time_spent_minutes == 2